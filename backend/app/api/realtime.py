@@ -0,0 +1,16 @@
+from fastapi import APIRouter, WebSocket
+
+from app.core.config import settings
+from app.services.task_service import TaskService
+from app.services.ws_hub import WebSocketHub
+
+router = APIRouter()
+
+# One hub serves all WebSocket clients
+hub = WebSocketHub(TaskService(), outbox_size=settings.ws_outbox_size)
+
+
+@router.websocket("/ws")
+async def realtime_socket(websocket: WebSocket):
+    """Multiplexed channel for task logs, task status and the task list"""
+    await hub.serve(websocket)
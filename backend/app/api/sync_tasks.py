@@ -1,6 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException
-
-from app.models.schemas import APIResponse, SyncTaskCreate, SyncTaskUpdate
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from app.models.schemas import (
+    APIResponse,
+    BatchTaskCreate,
+    BatchTaskIds,
+    SyncTaskCreate,
+    SyncTaskUpdate,
+)
 from app.services.task_service import TaskService
 
 router = APIRouter()
@@ -21,6 +30,99 @@ async def get_sync_tasks(service: TaskService = Depends(get_task_service)):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/recovery", response_model=APIResponse)
+async def get_recovery_progress(service: TaskService = Depends(get_task_service)):
+    """Get the progress of the startup recovery of interrupted tasks"""
+    return APIResponse(data=service.recovery_progress)
+
+
+@router.get("/queue", response_model=APIResponse)
+async def get_start_queue(service: TaskService = Depends(get_task_service)):
+    """Get the start queue in admission order"""
+    try:
+        return APIResponse(
+            data={"queue": service.scheduler.queue(), **service.scheduler.stats()}
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/realtime-status", response_model=APIResponse)
+async def get_tasks_realtime_status(
+    ids: Optional[List[str]] = Query(
+        None, description="Task IDs, repeated or comma separated"
+    ),
+    service: TaskService = Depends(get_task_service),
+):
+    """Get Redis-Shake real-time status of many tasks, all running by default"""
+    try:
+        task_ids = None
+        if ids:
+            task_ids = [
+                task_id for value in ids for task_id in value.split(",") if task_id
+            ]
+        results = await service.get_realtime_statuses(task_ids)
+        return APIResponse(
+            data=results, message="Real-time status retrieved successfully"
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/batch/create", response_model=APIResponse)
+async def create_sync_tasks(
+    batch: BatchTaskCreate, service: TaskService = Depends(get_task_service)
+):
+    """Create many sync tasks, none unless all configurations are valid"""
+    try:
+        result = await service.create_tasks(batch.tasks)
+        if not result["created"]:
+            return APIResponse(
+                success=False, data=result, message="Batch has invalid tasks"
+            )
+        return APIResponse(data=result, message="Tasks created successfully")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/batch/start", response_model=APIResponse)
+async def start_sync_tasks(
+    batch: BatchTaskIds, service: TaskService = Depends(get_task_service)
+):
+    """Start many sync tasks concurrently"""
+    try:
+        results = await service.start_tasks(batch.task_ids)
+        return APIResponse(data=results, message="Task start commands sent")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/batch/stop", response_model=APIResponse)
+async def stop_sync_tasks_batch(
+    batch: BatchTaskIds, service: TaskService = Depends(get_task_service)
+):
+    """Stop many sync tasks in parallel, queued ones leave the start queue"""
+    try:
+        results = await service.stop_tasks(batch.task_ids)
+        return APIResponse(data=results, message="Task stop commands sent")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/batch/delete", response_model=APIResponse)
+async def delete_sync_tasks(
+    batch: BatchTaskIds, service: TaskService = Depends(get_task_service)
+):
+    """Delete many non-running sync tasks"""
+    try:
+        results = await service.delete_tasks(batch.task_ids)
+        return APIResponse(data=results, message="Tasks deleted")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/{task_id}", response_model=APIResponse)
 async def get_sync_task(task_id: str, service: TaskService = Depends(get_task_service)):
     """Get specific sync task"""
@@ -181,6 +283,37 @@ async def get_task_realtime_status(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/{task_id}/metrics", response_model=APIResponse)
+async def get_task_metrics(
+    task_id: str,
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    step: Optional[int] = Query(None, ge=1, description="Seconds per point"),
+    service: TaskService = Depends(get_task_service),
+):
+    """Get task throughput and resource history
+
+    ``from`` and ``to`` take ISO datetimes or Unix timestamps, the default is
+    the last hour with at most 500 points.
+    """
+    try:
+        if not await service.get_task(task_id):
+            raise HTTPException(status_code=404, detail="Task not found")
+        metrics = await service.get_task_metrics(
+            task_id,
+            start.timestamp() if start else None,
+            end.timestamp() if end else None,
+            step,
+        )
+        return APIResponse(data=metrics, message="Metrics retrieved successfully")
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/statistics/overview", response_model=APIResponse)
 async def get_tasks_statistics(service: TaskService = Depends(get_task_service)):
     """Get task statistics"""
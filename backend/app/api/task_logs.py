@@ -1,12 +1,13 @@
 import asyncio
-import json
+from datetime import datetime
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
 from fastapi.responses import StreamingResponse
 
 from app.models.schemas import APIResponse, TaskLogCreate
 from app.services.log_service import LogService
+from app.services.sse import MAX_FRAMES_PER_WRITE, encode_event, to_frame
 from app.services.task_service import TaskService
 
 router = APIRouter()
@@ -30,7 +31,7 @@ async def get_all_logs(
 ):
     """Get all task logs"""
     try:
-        logs = service.get_all_logs(limit=limit, level=level, task_id=task_id)
+        logs = await service.get_all_logs(limit=limit, level=level, task_id=task_id)
         return APIResponse(data=logs)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -45,7 +46,7 @@ async def get_task_logs(
 ):
     """Get specifictask"""
     try:
-        logs = service.get_logs_by_task(task_id, limit=limit, level=level)
+        logs = await service.get_logs_by_task(task_id, limit=limit, level=level)
         return APIResponse(data=logs)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -57,7 +58,7 @@ async def add_log(
 ):
     """Add task log"""
     try:
-        log = service.add_log(log_create)
+        log = await service.add_log_durable(log_create)
         return APIResponse(data=log, message="successfully")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -67,21 +68,38 @@ async def add_log(
 async def search_logs(
     keyword: str = Query(..., description="Search keyword"),
     limit: int = Query(100, description="Log count limit"),
+    task_id: Optional[str] = Query(None, description="Task ID filter"),
+    level: Optional[str] = Query(None, description="Log level filter"),
+    start_time: Optional[datetime] = Query(None, description="Earliest log time"),
+    end_time: Optional[datetime] = Query(None, description="Latest log time"),
     service: LogService = Depends(get_log_service),
 ):
-    """"""
+    """Search logs containing all keyword terms"""
     try:
-        logs = service.search_logs(keyword, limit)
+        logs = await service.search_logs(
+            keyword,
+            limit,
+            task_id=task_id,
+            level=level,
+            start_time=start_time,
+            end_time=end_time,
+        )
         return APIResponse(data=logs)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/metrics", response_model=APIResponse)
+async def get_log_writer_metrics(service: LogService = Depends(get_log_service)):
+    """Get log writer queue depth, batch size and flush latency"""
+    return APIResponse(data=service.writer_metrics())
+
+
 @router.delete("/task/{task_id}", response_model=APIResponse)
 async def clear_task_logs(task_id: str, service: LogService = Depends(get_log_service)):
     """Clear logs for specified task"""
     try:
-        success = service.clear_logs_by_task(task_id)
+        success = await service.clear_logs_by_task(task_id)
         if success:
             return APIResponse(message="tasksuccessfully")
         else:
@@ -94,7 +112,7 @@ async def clear_task_logs(task_id: str, service: LogService = Depends(get_log_se
 async def clear_all_logs(service: LogService = Depends(get_log_service)):
     """"""
     try:
-        success = service.clear_all_logs()
+        success = await service.clear_all_logs()
         if success:
             return APIResponse(message="successfully")
         else:
@@ -103,43 +121,64 @@ async def clear_all_logs(service: LogService = Depends(get_log_service)):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/stream/stats", response_model=APIResponse)
+async def get_stream_stats(
+    task_id: Optional[str] = Query(None, description="Task ID filter"),
+    task_service: TaskService = Depends(get_task_service),
+):
+    """Get lag and drop counters of live log stream subscribers"""
+    return APIResponse(data=task_service.get_log_subscriber_stats(task_id))
+
+
 @router.get("/task/{task_id}/stream")
 async def stream_task_logs(
-    task_id: str, task_service: TaskService = Depends(get_task_service)
+    task_id: str,
+    since: Optional[int] = Query(
+        None, description="Resume after this log sequence number"
+    ),
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+    task_service: TaskService = Depends(get_task_service),
 ):
-    """Stream real-time Redis-Shake process logs using Server-Sent Events"""
+    """Stream real-time Redis-Shake process logs using Server-Sent Events
+
+    Every log event carries its sequence number as the SSE id. A client that
+    reconnects with ``Last-Event-ID`` (or ``since``) only receives the lines
+    it missed.
+    """
+    if last_event_id and last_event_id.isdigit():
+        since = int(last_event_id)
 
     async def event_generator():
         """Generate SSE events for Redis-Shake process logs"""
-        log_queue = asyncio.Queue()
+        subscription = None
 
         try:
             # Send initial connection event
             connection_msg = {
-                'type': 'connected',
-                'message': 'Connected to Redis-Shake log stream'
+                "type": "connected",
+                "message": "Connected to Redis-Shake log stream",
             }
-            yield f"data: {json.dumps(connection_msg)}\n\n"
+            yield encode_event(connection_msg)
 
             # Subscribe to task logs
-            task_service.subscribe_to_logs(task_id, log_queue)
+            subscription = await task_service.subscribe_to_logs(task_id, since)
 
             # Check if task is running
             task = await task_service.get_task(task_id)
             if not task:
-                error_msg = {'type': 'error', 'message': 'Task not found'}
-                yield f"data: {json.dumps(error_msg)}\n\n"
+                error_msg = {"type": "error", "message": "Task not found"}
+                yield encode_event(error_msg)
                 return
 
             if task.status != "running":
                 info_msg = {
-                    'type': 'info',
-                    'message': (
-                        f'Task is {task.status}. '
-                        'Start the task to see real-time logs.'
-                    )
+                    "type": "info",
+                    "message": (
+                        f"Task is {task.status}. "
+                        "Start the task to see real-time logs."
+                    ),
                 }
-                yield f"data: {json.dumps(info_msg)}\n\n"
+                yield encode_event(info_msg)
                 # Still continue to listen in case task gets started
 
             # Stream logs in real-time
@@ -148,38 +187,35 @@ async def stream_task_logs(
                 try:
                     # Wait for log with timeout for heartbeat
                     try:
-                        log_line = await asyncio.wait_for(log_queue.get(), timeout=5.0)
-
-                        # Send log event
-                        log_data = {
-                            "type": "log",
-                            "timestamp": log_line["timestamp"],
-                            "level": log_line["level"],
-                            "message": log_line["message"],
-                            "source": log_line.get("source", "redis-shake"),
-                            "task_id": task_id,
-                        }
-                        yield f"data: {json.dumps(log_data)}\n\n"
+                        item = await asyncio.wait_for(subscription.get(), timeout=5.0)
+
+                        # Send the pre-encoded log events, together with any
+                        # others already queued, in one write
+                        frames = [to_frame(task_id, item)]
+                        while len(frames) < MAX_FRAMES_PER_WRITE:
+                            item = subscription.get_nowait()
+                            if item is None:
+                                break
+                            frames.append(to_frame(task_id, item))
+                        yield b"".join(frames)
 
                     except asyncio.TimeoutError:
                         # Send heartbeat every 5 seconds if no logs
                         heartbeat_counter += 1
                         heartbeat_data = {
                             "type": "heartbeat",
-                            "timestamp": str(
-                                asyncio.get_event_loop().time()
-                            ),
+                            "timestamp": str(asyncio.get_event_loop().time()),
                             "count": heartbeat_counter,
                         }
-                        yield f"data: {json.dumps(heartbeat_data)}\n\n"
+                        yield encode_event(heartbeat_data)
 
                 except asyncio.CancelledError:
                     # Client disconnected
                     disconnect_msg = {
-                        'type': 'disconnected',
-                        'message': 'Stream disconnected'
+                        "type": "disconnected",
+                        "message": "Stream disconnected",
                     }
-                    yield f"data: {json.dumps(disconnect_msg)}\n\n"
+                    yield encode_event(disconnect_msg)
                     break
                 except Exception as e:
                     # Send error event
@@ -187,19 +223,17 @@ async def stream_task_logs(
                         "type": "error",
                         "message": f"Stream error: {str(e)}",
                     }
-                    yield f"data: {json.dumps(error_data)}\n\n"
+                    yield encode_event(error_data)
                     await asyncio.sleep(5)  # Wait before retry
 
         except Exception as e:
             # Send final error event
             error_data = {"type": "error", "message": f"Fatal stream error: {str(e)}"}
-            yield f"data: {json.dumps(error_data)}\n\n"
+            yield encode_event(error_data)
         finally:
             # Clean up subscription
-            try:
-                task_service.unsubscribe_from_logs(task_id, log_queue)
-            except Exception:
-                pass
+            if subscription is not None:
+                task_service.unsubscribe_from_logs(subscription)
 
     return StreamingResponse(
         event_generator(),
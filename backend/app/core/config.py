@@ -25,14 +25,70 @@ class Settings(BaseSettings):
     redis_shake_log_dir: str = os.path.join(BASE_DIR, "..", "logs")
     redis_shake_data_dir: str = os.path.join(BASE_DIR, "..", "data")  # Data directory
 
+    # Storage configuration ("json" is the legacy single-document backend)
+    task_storage_backend: str = "json"
+    log_storage_backend: str = "segment"
+    sqlite_db_path: str = os.path.join(BASE_DIR, "..", "data", "redis_shake_web.db")
+
+    # Segment log store configuration
+    log_segment_max_bytes: int = 8 * 1024 * 1024  # Roll segments at 8MB
+    log_segment_max_age: int = 3600  # Roll segments after 1 hour
+    log_compaction_interval: float = 60  # Seconds between compaction checks
+
+    # Log writer configuration
+    log_flush_interval: float = 0.05  # Max seconds a log waits to be written
+    log_flush_batch_size: int = 500  # Write early once this many logs are queued
+
+    # Log file tailing configuration
+    log_tail_use_inotify: bool = True  # Fall back to polling when False
+    log_tail_poll_interval: float = 0.5  # Seconds between polls of log files
+    log_buffer_capacity: int = 1000  # Live log lines kept in memory per task
+    log_seq_reserve_block: int = 1000  # Log sequence numbers reserved on disk at once
+    log_subscriber_queue_size: int = 1000  # Pending lines per live log subscriber
+    log_subscriber_overflow: str = "coalesce"  # "coalesce" or "drop_oldest"
+    ws_outbox_size: int = 1000  # Pending messages per WebSocket client
+
+    # Realtime status collection configuration
+    status_poll_interval: float = 2.0  # Seconds between scrapes of running tasks
+    status_poll_timeout: float = 5.0  # Timeout of one status request
+    status_poll_concurrency: int = 20  # Status requests in flight at once
+    status_persist_interval: float = 30.0  # Seconds between counter writes
+    process_sample_interval: float = 2.0  # Seconds between process samples
+    throughput_ewma_window: float = 10.0  # Seconds of rate smoothing
+    throughput_stall_seconds: float = 30.0  # No progress with a backlog
+    throughput_regression_ratio: float = 0.5  # Rate vs. baseline to flag
+    metrics_dir: str = os.path.join(BASE_DIR, "..", "data", "metrics")
+    # Status ports leased to tasks, skipping ports other processes use
+    status_port_range_start: int = 8080
+    status_port_range_end: int = 9079
+    status_port_lease_file: str = os.path.join(
+        BASE_DIR, "..", "data", "status_port_leases.json"
+    )
+
     # Redis connection configuration
     redis_host: str = "localhost"
     redis_port: int = 6379
     redis_password: Optional[str] = None
 
     # Task configuration
-    max_concurrent_tasks: int = 5
+    max_concurrent_tasks: int = 5  # Further starts wait in the start queue
+    # Optional host headroom required to admit a queued task
+    scheduler_max_cpu_percent: Optional[float] = None
+    scheduler_min_available_memory_percent: Optional[float] = None
+    scheduler_retry_interval: float = 5.0  # Seconds between headroom checks
     task_timeout: int = 3600  # 1 hour
+    recovery_concurrency: int = 4  # Tasks restarted at once on startup
+    # Seconds between checkpoints of how far task logs were read, where
+    # adopted processes resume after a restart
+    log_position_checkpoint_interval: float = 5.0
+    batch_concurrency: int = 10  # Tasks started or stopped at once by batch calls
+    task_stop_timeout: float = 10.0  # Seconds after SIGTERM before SIGKILL
+    task_kill_timeout: float = 5.0  # Seconds to wait for a killed process
+    task_ready_timeout: float = 30.0  # Seconds a new process has to become ready
+    # Log line marking a started process as ready, besides its status port:
+    # redis-shake's "start syncing..." as a log file message or console line
+    task_ready_log_pattern: Optional[str] = r"^(?:\S+ \S+ INF )?start syncing\.\.\.$"
+    task_flush_delay: float = 0.5  # Seconds before task changes are written to disk
 
     model_config = ConfigDict(env_file=".env")
 
@@ -1,23 +1,28 @@
+import asyncio
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.api.realtime import router as realtime_router
 from app.api.sync_tasks import router as sync_tasks_router
 from app.api.task_logs import router as task_logs_router
+from app.services.prometheus import (
+    CONTENT_TYPE,
+    LatencyHistogram,
+    PrometheusMiddleware,
+    render_metrics,
+)
 from app.services.task_service import TaskService
 
 # Global task service instance
 task_service = TaskService()
+# API latency observed by the metrics middleware
+request_latency = LatencyHistogram()
 
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    """Application lifecycle management"""
-    # Execute on startup
-    print("🚀 Redis-Shake Web Management Platform starting...")
-
-    # Recover running tasks
+async def recover_tasks():
+    """Recover interrupted tasks, then admit the queued ones"""
     try:
         print("🔄 Checking and recovering running tasks...")
         recovery_result = await task_service.recover_running_tasks()
@@ -45,6 +50,23 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         print(f"❌ Task recovery process error: {str(e)}")
 
+    # Admit tasks that were queued before the restart
+    await task_service.scheduler.start()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application lifecycle management"""
+    # Execute on startup
+    print("🚀 Redis-Shake Web Management Platform starting...")
+
+    # Recover running tasks in the background, the API serves meanwhile
+    recovery = asyncio.ensure_future(recover_tasks())
+
+    # Scrape the status of running tasks in the background
+    await task_service.process_sampler.start()
+    await task_service.status_collector.start()
+
     print("✅ Redis-Shake Web Management Platform started successfully!")
 
     yield
@@ -52,6 +74,22 @@ async def lifespan(app: FastAPI):
     # Execute on shutdown
     print("🛑 Redis-Shake Web Management Platform is shutting down...")
 
+    if not recovery.done():
+        recovery.cancel()
+    await task_service.status_collector.stop()
+    await task_service.process_sampler.stop()
+    task_service.scheduler.close()
+
+    # Task processes keep running, adopted with their logs on the next start
+    await task_service.detach_processes()
+    task_service.checkpoint_log_positions()
+
+    # Write pending task changes to disk
+    task_service.registry.close()
+    task_service.log_tailer.close()
+    task_service.log_service.writer.close()
+    task_service.log_service.repository.close()
+
 
 app = FastAPI(
     title="Redis-Shake Web Management Platform",
@@ -68,10 +106,12 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(PrometheusMiddleware, histogram=request_latency)
 
 # Register routes
 app.include_router(sync_tasks_router, prefix="/api/v1/tasks", tags=["Sync Tasks"])
 app.include_router(task_logs_router, prefix="/api/v1/logs", tags=["Task Logs"])
+app.include_router(realtime_router, prefix="/api/v1", tags=["Realtime"])
 
 
 @app.get("/")
@@ -84,6 +124,14 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Prometheus metrics in text exposition format"""
+    return Response(
+        render_metrics(task_service, request_latency), media_type=CONTENT_TYPE
+    )
+
+
 if __name__ == "__main__":
     import uvicorn
 
@@ -1,5 +1,5 @@
 from enum import Enum
-from typing import Any, List, Optional
+from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel, Field, ConfigDict
 
@@ -8,6 +8,7 @@ class TaskStatus(str, Enum):
     """Task status enumeration"""
 
     PENDING = "pending"
+    QUEUED = "queued"
     RUNNING = "running"
     COMPLETED = "completed"
     FAILED = "failed"
@@ -36,6 +37,14 @@ class SyncTaskCreate(BaseModel):
         description="Custom TOML configuration content, must provide complete "
         "redis-shake configuration",
     )
+    log_buffer_capacity: Optional[int] = Field(
+        None,
+        ge=1,
+        description="Live log lines kept in memory, defaults to the global setting",
+    )
+    priority: int = Field(
+        0, description="Start priority, higher is admitted first when queued"
+    )
 
     def validate_toml_config(self) -> List[str]:
         """Validate TOML configuration and return error messages list"""
@@ -109,6 +118,22 @@ class SyncTask(BaseModel):
     processed_keys: Optional[int] = Field(0, description="Processed key count")
     failed_keys: Optional[int] = Field(0, description="Failed key count")
 
+    # Live log buffer size
+    log_buffer_capacity: Optional[int] = Field(
+        None,
+        ge=1,
+        description="Live log lines kept in memory, defaults to the global setting",
+    )
+
+    # Start queue
+    priority: Optional[int] = Field(
+        0, description="Start priority, higher is admitted first when queued"
+    )
+    queued_at: Optional[str] = Field(None, description="Time the task was queued")
+    start_timings: Optional[Dict[str, Any]] = Field(
+        None, description="Durations of the phases of the last start"
+    )
+
 
 class SyncTaskUpdate(BaseModel):
     """Update sync task"""
@@ -120,12 +145,29 @@ class SyncTaskUpdate(BaseModel):
     completed_at: Optional[str] = None
     process_id: Optional[int] = None
     status_port: Optional[int] = None
+    start_timings: Optional[Dict[str, Any]] = None
     total_keys: Optional[int] = None
     processed_keys: Optional[int] = None
     failed_keys: Optional[int] = None
     custom_config: Optional[str] = Field(
         None, description="Custom TOML configuration content"
     )
+    log_buffer_capacity: Optional[int] = Field(
+        None, ge=1, description="Live log lines kept in memory"
+    )
+    priority: Optional[int] = Field(None, description="Start priority")
+
+
+class BatchTaskCreate(BaseModel):
+    """Create many sync tasks"""
+
+    tasks: List[SyncTaskCreate] = Field(..., min_length=1, description="Tasks")
+
+
+class BatchTaskIds(BaseModel):
+    """Task IDs of a batch operation"""
+
+    task_ids: List[str] = Field(..., min_length=1, description="Task IDs")
 
 
 class TaskLog(BaseModel):
@@ -138,6 +180,7 @@ class TaskLog(BaseModel):
     level: LogLevel = Field(..., description="Log level")
     message: str = Field(..., description="Log message")
     source: Optional[str] = Field("system", description="Log source")
+    seq: Optional[int] = Field(None, description="Live stream sequence number")
 
     model_config = ConfigDict(use_enum_values=True)
 
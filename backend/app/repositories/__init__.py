@@ -0,0 +1,114 @@
+# Repositories module initialization
+import os
+import threading
+from typing import Optional
+
+from app.core.config import settings
+from app.repositories.base import LogRepository, TaskRepository
+from app.repositories.json_repository import JsonLogRepository, JsonTaskRepository
+from app.repositories.segment_repository import SegmentLogRepository
+from app.repositories.sqlite_repository import (
+    SQLiteDatabase,
+    SQLiteLogRepository,
+    SQLiteTaskRepository,
+)
+
+TASK_STORAGE_BACKENDS = ("json", "sqlite")
+LOG_STORAGE_BACKENDS = ("segment", "sqlite", "json")
+
+_lock = threading.Lock()
+_sqlite_db: Optional[SQLiteDatabase] = None
+_task_repository: Optional[TaskRepository] = None
+_log_repository: Optional[LogRepository] = None
+
+
+def _check_backend(backend: str, supported):
+    if backend not in supported:
+        raise ValueError(
+            f"Unknown storage backend '{backend}', "
+            f"expected one of: {', '.join(supported)}"
+        )
+
+
+def get_sqlite_database() -> SQLiteDatabase:
+    """Get the shared SQLite database"""
+    global _sqlite_db
+    with _lock:
+        if _sqlite_db is None:
+            _sqlite_db = SQLiteDatabase(settings.sqlite_db_path)
+        return _sqlite_db
+
+
+def create_task_repository(backend: str) -> TaskRepository:
+    """Create a task repository for the given backend"""
+    _check_backend(backend, TASK_STORAGE_BACKENDS)
+    if backend == "sqlite":
+        return SQLiteTaskRepository(get_sqlite_database())
+    return JsonTaskRepository(
+        os.path.join(settings.redis_shake_config_dir, "sync_tasks.json")
+    )
+
+
+def create_log_repository(backend: str) -> LogRepository:
+    """Create a log repository for the given backend"""
+    _check_backend(backend, LOG_STORAGE_BACKENDS)
+    if backend == "sqlite":
+        return SQLiteLogRepository(get_sqlite_database())
+    if backend == "segment":
+        return SegmentLogRepository(
+            os.path.join(settings.redis_shake_log_dir, "segments"),
+            max_segment_bytes=settings.log_segment_max_bytes,
+            max_segment_age=settings.log_segment_max_age,
+            compaction_interval=settings.log_compaction_interval,
+        )
+    return JsonLogRepository(_legacy_logs_file())
+
+
+def _legacy_logs_file() -> str:
+    return os.path.join(settings.redis_shake_log_dir, "task_logs.json")
+
+
+def _import_legacy_logs(repository: LogRepository):
+    """Import logs from the legacy JSON document into an empty log store once"""
+    legacy_file = _legacy_logs_file()
+    if not os.path.exists(legacy_file) or repository.query(limit=1):
+        return
+
+    legacy = JsonLogRepository(legacy_file)
+    logs = sorted(legacy.iter_all(), key=lambda x: x["timestamp"])
+    if logs:
+        repository.append_many(logs)
+        print(f"📦 Imported {len(logs)} logs from {legacy_file}")
+    os.replace(legacy_file, legacy_file + ".migrated")
+
+
+def get_task_repository() -> TaskRepository:
+    """Get the configured task repository"""
+    global _task_repository
+    if _task_repository is None:
+        _task_repository = create_task_repository(settings.task_storage_backend)
+    return _task_repository
+
+
+def get_log_repository() -> LogRepository:
+    """Get the configured log repository"""
+    global _log_repository
+    if _log_repository is None:
+        repository = create_log_repository(settings.log_storage_backend)
+        if settings.log_storage_backend == "segment":
+            _import_legacy_logs(repository)
+        _log_repository = repository
+    return _log_repository
+
+
+__all__ = [
+    "LOG_STORAGE_BACKENDS",
+    "TASK_STORAGE_BACKENDS",
+    "LogRepository",
+    "TaskRepository",
+    "create_log_repository",
+    "create_task_repository",
+    "get_log_repository",
+    "get_sqlite_database",
+    "get_task_repository",
+]
@@ -0,0 +1,82 @@
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, Iterator, List, Optional
+
+
+class TaskRepository(ABC):
+    """Persistent storage for sync task records"""
+
+    @abstractmethod
+    def load_all(self) -> List[Dict]:
+        """Load all task records in creation order"""
+
+    @abstractmethod
+    def save_changes(
+        self,
+        snapshot: List[Dict],
+        changed_ids: Iterable[str],
+        deleted_ids: Iterable[str],
+    ):
+        """Persist a batch of task changes
+
+        ``snapshot`` is the complete current task list. Backends that support
+        row-level writes only need to write ``changed_ids`` and remove
+        ``deleted_ids``; document backends may rewrite the snapshot instead.
+        """
+
+    def close(self):
+        """Release storage resources"""
+
+
+class LogRepository(ABC):
+    """Persistent storage for task log records"""
+
+    def append(self, log: Dict, keep_per_task: Optional[int] = None):
+        """Append a single log record"""
+        self.append_many([log], keep_per_task=keep_per_task)
+
+    @abstractmethod
+    def append_many(self, logs: List[Dict], keep_per_task: Optional[int] = None):
+        """Append several log records
+
+        When ``keep_per_task`` is given, the oldest logs of the affected tasks
+        are dropped so that at most that many remain per task.
+        """
+
+    @abstractmethod
+    def query(
+        self,
+        limit: int = 100,
+        level: Optional[str] = None,
+        task_id: Optional[str] = None,
+    ) -> List[Dict]:
+        """Get the newest logs, optionally filtered by task and level"""
+
+    @abstractmethod
+    def search(
+        self,
+        keyword: str,
+        limit: int = 100,
+        task_id: Optional[str] = None,
+        level: Optional[str] = None,
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None,
+    ) -> List[Dict]:
+        """Get the newest logs whose message contains every term of ``keyword``
+
+        ``start_time`` and ``end_time`` are inclusive ISO timestamps.
+        """
+
+    @abstractmethod
+    def delete_by_task(self, task_id: str) -> bool:
+        """Delete all logs of a task, returns whether anything was deleted"""
+
+    @abstractmethod
+    def clear(self) -> bool:
+        """Delete all logs"""
+
+    @abstractmethod
+    def iter_all(self) -> Iterator[Dict]:
+        """Iterate over all stored logs in insertion order"""
+
+    def close(self):
+        """Release storage resources"""
@@ -0,0 +1,202 @@
+import json
+import os
+import tempfile
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from app.repositories.base import LogRepository, TaskRepository
+
+
+def _write_json_atomic(path: str, data: Any):
+    """Write a JSON document to a temporary file and rename it over ``path``"""
+    directory = os.path.dirname(path) or "."
+    prefix = "." + os.path.basename(path) + "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=prefix, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class JsonTaskRepository(TaskRepository):
+    """Legacy task storage in a single JSON document"""
+
+    def __init__(self, tasks_file: str):
+        self.tasks_file = tasks_file
+        self._ensure_tasks_file()
+
+    def _ensure_tasks_file(self):
+        """Ensure task file exists"""
+        if not os.path.exists(self.tasks_file):
+            with open(self.tasks_file, "w", encoding="utf-8") as f:
+                json.dump([], f)
+
+    def load_all(self) -> List[Dict]:
+        """Load all tasks from file"""
+        try:
+            with open(self.tasks_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return []
+
+    def save_changes(
+        self,
+        snapshot: List[Dict],
+        changed_ids: Iterable[str],
+        deleted_ids: Iterable[str],
+    ):
+        """Rewrite the whole task document"""
+        _write_json_atomic(self.tasks_file, snapshot)
+
+
+class JsonLogRepository(LogRepository):
+    """Legacy log storage in a single JSON document
+
+    Every mutation rewrites the whole document, kept for compatibility only.
+    """
+
+    def __init__(self, logs_file: str, max_log_size: int = 10 * 1024 * 1024):
+        self.logs_file = logs_file
+        self.max_log_size = max_log_size
+        self._lock = threading.RLock()
+        self._ensure_logs_file()
+
+    def _ensure_logs_file(self):
+        """Ensure log file exists"""
+        if not os.path.exists(self.logs_file):
+            with open(self.logs_file, "w", encoding="utf-8") as f:
+                json.dump([], f)
+
+    def _load_logs(self) -> List[dict]:
+        """Load all logs from file"""
+        try:
+            with open(self.logs_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return []
+
+    def _save_logs(self, logs: List[dict]):
+        """Save logs to file"""
+        if os.path.exists(self.logs_file):
+            file_size = os.path.getsize(self.logs_file)
+            if file_size > self.max_log_size:
+                self._rotate_log_file()
+
+        with open(self.logs_file, "w", encoding="utf-8") as f:
+            json.dump(logs, f, ensure_ascii=False, indent=2)
+
+    def _rotate_log_file(self):
+        """Move the oversized log file to a backup"""
+        if os.path.exists(self.logs_file):
+            backup_file = f"{self.logs_file}.backup"
+            if os.path.exists(backup_file):
+                os.remove(backup_file)
+            os.rename(self.logs_file, backup_file)
+
+    def append_many(self, logs: List[Dict], keep_per_task: Optional[int] = None):
+        with self._lock:
+            stored = self._load_logs()
+            stored.extend(logs)
+
+            # Limit log count per task
+            if keep_per_task is not None:
+                for task_id in {log["task_id"] for log in logs}:
+                    stored = self._limit_logs_per_task(stored, task_id, keep_per_task)
+
+            self._save_logs(stored)
+
+    def _limit_logs_per_task(
+        self, logs: List[dict], task_id: str, keep: int
+    ) -> List[dict]:
+        """Limit log count per task"""
+        task_logs = [log for log in logs if log["task_id"] == task_id]
+        if len(task_logs) <= keep:
+            return logs
+
+        # Keep the newest logs of the task
+        task_logs.sort(key=lambda x: x["timestamp"], reverse=True)
+        logs_to_keep = task_logs[:keep]
+
+        other_logs = [log for log in logs if log["task_id"] != task_id]
+        return other_logs + logs_to_keep
+
+    def query(
+        self,
+        limit: int = 100,
+        level: Optional[str] = None,
+        task_id: Optional[str] = None,
+    ) -> List[Dict]:
+        logs = self._load_logs()
+
+        # Task ID filter
+        if task_id:
+            logs = [log for log in logs if log["task_id"] == task_id]
+
+        # Filter by log level
+        if level:
+            logs = [
+                log for log in logs if log.get("level", "").upper() == level.upper()
+            ]
+
+        # Sort by time descending and limit count
+        logs.sort(key=lambda x: x["timestamp"], reverse=True)
+        return logs[:limit]
+
+    def search(
+        self,
+        keyword: str,
+        limit: int = 100,
+        task_id: Optional[str] = None,
+        level: Optional[str] = None,
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None,
+    ) -> List[Dict]:
+        logs = self._load_logs()
+
+        # Search for all keywords in messages
+        terms = keyword.lower().split()
+        level = level.upper() if level else None
+        matching_logs = [
+            log
+            for log in logs
+            if all(term in log.get("message", "").lower() for term in terms)
+            and (not task_id or log["task_id"] == task_id)
+            and (not level or str(log.get("level", "")).upper() == level)
+            and (not start_time or log["timestamp"] >= start_time)
+            and (not end_time or log["timestamp"] <= end_time)
+        ]
+
+        # Sort by time descending and limit count
+        matching_logs.sort(key=lambda x: x["timestamp"], reverse=True)
+        return matching_logs[:limit]
+
+    def delete_by_task(self, task_id: str) -> bool:
+        with self._lock:
+            logs = self._load_logs()
+            original_length = len(logs)
+
+            # Filter out logs for specified task
+            logs = [log for log in logs if log["task_id"] != task_id]
+
+            if len(logs) < original_length:
+                self._save_logs(logs)
+                return True
+            return False
+
+    def clear(self) -> bool:
+        try:
+            with self._lock:
+                with open(self.logs_file, "w", encoding="utf-8") as f:
+                    json.dump([], f)
+            return True
+        except Exception:
+            return False
+
+    def iter_all(self) -> Iterator[Dict]:
+        return iter(self._load_logs())
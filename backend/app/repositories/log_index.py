@@ -0,0 +1,190 @@
+import heapq
+import re
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# A record reference packs the segment id and the byte offset of the record in
+# that segment into one integer, so references sort in append order.
+OFFSET_BITS = 40
+OFFSET_MASK = (1 << OFFSET_BITS) - 1
+
+IndexEntry = Tuple[int, str, str]  # (offset, task_id, level)
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def make_ref(segment_id: int, offset: int) -> int:
+    return (segment_id << OFFSET_BITS) | offset
+
+
+def split_ref(ref: int) -> Tuple[int, int]:
+    return ref >> OFFSET_BITS, ref & OFFSET_MASK
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into unique lower-cased search terms, in order of appearance"""
+    return list(dict.fromkeys(TOKEN_PATTERN.findall(text.lower())))
+
+
+def contains(refs: array, ref: int) -> bool:
+    """Whether a sorted reference array contains ``ref``"""
+    i = bisect_left(refs, ref)
+    return i < len(refs) and refs[i] == ref
+
+
+def union(arrays: List[array]) -> array:
+    """Sorted union of sorted reference arrays"""
+    if len(arrays) == 1:
+        return arrays[0]
+    merged = array("q")
+    for ref in heapq.merge(*arrays):
+        if not merged or merged[-1] != ref:
+            merged.append(ref)
+    return merged
+
+
+def _splice(
+    mapping: Dict, keys: Iterable, new_refs: Dict[object, List[int]], segment_id: int
+):
+    """Replace the references into one segment for each of ``keys``"""
+    lo_ref = make_ref(segment_id, 0)
+    hi_ref = make_ref(segment_id + 1, 0)
+    for key in keys:
+        refs = mapping.get(key)
+        if refs is None:
+            if new_refs.get(key):
+                mapping[key] = array("q", new_refs[key])
+            continue
+        lo = bisect_left(refs, lo_ref)
+        hi = bisect_left(refs, hi_ref)
+        refs[lo:hi] = array("q", new_refs.get(key, []))
+        if not refs:
+            del mapping[key]
+
+
+class OffsetIndex:
+    """Record references per task, per (task, level) and per term
+
+    References are kept in compact ``array('q')`` buffers in append order. The
+    newest ``limit`` matches of a task are the tail of one array; queries across
+    tasks merge the per-task tails, so their cost depends on ``limit`` and the
+    number of tasks rather than on the number of stored logs. ``postings`` is
+    the inverted index mapping lower-cased message terms to the records
+    containing them.
+    """
+
+    def __init__(self):
+        self.by_task: Dict[str, array] = {}
+        self.by_task_level: Dict[Tuple[str, str], array] = {}
+        self.postings: Dict[str, array] = {}
+
+    def add(self, ref: int, task_id: str, level: str):
+        if task_id not in self.by_task:
+            self.by_task[task_id] = array("q")
+        self.by_task[task_id].append(ref)
+        key = (task_id, level)
+        if key not in self.by_task_level:
+            self.by_task_level[key] = array("q")
+        self.by_task_level[key].append(ref)
+
+    def add_terms(self, ref: int, terms: Iterable[str]):
+        for term in terms:
+            if term not in self.postings:
+                self.postings[term] = array("q")
+            self.postings[term].append(ref)
+
+    def add_terms_bulk(self, term: str, segment_id: int, offsets: Iterable[int]):
+        """Add the postings of one term in one segment, given in offset order"""
+        if term not in self.postings:
+            self.postings[term] = array("q")
+        self.postings[term].extend(make_ref(segment_id, offset) for offset in offsets)
+
+    def count(self, task_id: str) -> int:
+        refs = self.by_task.get(task_id)
+        return len(refs) if refs is not None else 0
+
+    def remove_task(self, task_id: str):
+        """Forget a task; its postings are pruned when its segments are compacted"""
+        self.by_task.pop(task_id, None)
+        for key in [key for key in self.by_task_level if key[0] == task_id]:
+            del self.by_task_level[key]
+
+    def substring_candidates(self, text: str) -> List[array]:
+        """Reference arrays that every record containing ``text`` is in
+
+        A term enclosed by other characters of ``text`` must be a whole term
+        of the message. The first and last may be the end or the start of a
+        longer term, so they match every indexed term ending or starting with
+        them. The candidates still have to be checked against the message.
+        """
+        text = text.lower()
+        candidates = []
+        for match in TOKEN_PATTERN.finditer(text):
+            term = match.group()
+            open_start = match.start() == 0
+            open_end = match.end() == len(text)
+            if open_start and open_end:
+                keys = [key for key in self.postings if term in key]
+            elif open_start:
+                keys = [key for key in self.postings if key.endswith(term)]
+            elif open_end:
+                keys = [key for key in self.postings if key.startswith(term)]
+            else:
+                keys = [term] if term in self.postings else []
+            candidates.append(
+                union([self.postings[key] for key in keys]) if keys else array("q")
+            )
+        return candidates
+
+    def newest(
+        self, limit: int, task_id: Optional[str] = None, level: Optional[str] = None
+    ) -> List[int]:
+        """Get the newest ``limit`` references, newest first"""
+        if task_id:
+            if level:
+                refs = self.by_task_level.get((task_id, level))
+            else:
+                refs = self.by_task.get(task_id)
+            if not refs:
+                return []
+            return list(reversed(refs[-limit:]))
+
+        if level:
+            arrays = [
+                refs for key, refs in self.by_task_level.items() if key[1] == level
+            ]
+        else:
+            arrays = list(self.by_task.values())
+        tails = [reversed(refs[-limit:]) for refs in arrays]
+        return list(islice(heapq.merge(*tails, reverse=True), limit))
+
+    def replace_segment(
+        self,
+        segment_id: int,
+        entries: Iterable[IndexEntry],
+        old_tasks: Set[str],
+        terms: Dict[str, List[int]],
+        old_terms: Iterable[str],
+    ):
+        """Swap all references into one segment for its compacted entries"""
+        new_by_task = defaultdict(list)
+        new_by_key = defaultdict(list)
+        for offset, task_id, level in entries:
+            ref = make_ref(segment_id, offset)
+            new_by_task[task_id].append(ref)
+            new_by_key[(task_id, level)].append(ref)
+        new_postings = {
+            term: [make_ref(segment_id, offset) for offset in offsets]
+            for term, offsets in terms.items()
+        }
+
+        tasks = old_tasks | set(new_by_task)
+        keys = {key for key in self.by_task_level if key[0] in tasks}
+        _splice(self.by_task, tasks, new_by_task, segment_id)
+        _splice(self.by_task_level, keys | set(new_by_key), new_by_key, segment_id)
+        _splice(
+            self.postings, set(old_terms) | set(new_postings), new_postings, segment_id
+        )
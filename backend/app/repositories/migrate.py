@@ -0,0 +1,103 @@
+"""One-shot migration of tasks and logs between storage backends
+
+Usage (from the backend directory):
+
+    python -m app.repositories.migrate --from json --to sqlite
+
+Tasks are only migrated when both backends can store tasks (``json`` and
+``sqlite``); the ``segment`` backend stores logs only.
+
+Switch ``task_storage_backend`` / ``log_storage_backend`` in the settings to the
+target backend after the migration has finished.
+"""
+
+import argparse
+import sys
+from typing import Dict
+
+from app.repositories import (
+    LOG_STORAGE_BACKENDS,
+    TASK_STORAGE_BACKENDS,
+    create_log_repository,
+    create_task_repository,
+)
+from app.repositories.base import LogRepository, TaskRepository
+
+
+def migrate_tasks(source: TaskRepository, target: TaskRepository) -> int:
+    """Copy all tasks from ``source`` into ``target``"""
+    tasks = source.load_all()
+    existing = {task["id"] for task in target.load_all()}
+    new_tasks = [task for task in tasks if task["id"] not in existing]
+    if new_tasks:
+        target.save_changes(
+            target.load_all() + new_tasks, [task["id"] for task in new_tasks], []
+        )
+    return len(new_tasks)
+
+
+def migrate_logs(
+    source: LogRepository, target: LogRepository, batch_size: int = 1000
+) -> int:
+    """Copy all logs from ``source`` into ``target`` in batches"""
+    count = 0
+    batch = []
+    for log in source.iter_all():
+        batch.append(log)
+        if len(batch) >= batch_size:
+            target.append_many(batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        target.append_many(batch)
+        count += len(batch)
+    return count
+
+
+def migrate(source_backend: str, target_backend: str) -> Dict[str, int]:
+    """Migrate tasks and logs from one backend to another
+
+    Tasks already present in the target are skipped. Logs are only copied when
+    the target holds no logs yet, so the migration is safe to re-run.
+    """
+    if source_backend == target_backend:
+        raise ValueError("Source and target backends must differ")
+
+    task_count = 0
+    if (
+        source_backend in TASK_STORAGE_BACKENDS
+        and target_backend in TASK_STORAGE_BACKENDS
+    ):
+        task_count = migrate_tasks(
+            create_task_repository(source_backend),
+            create_task_repository(target_backend),
+        )
+
+    log_count = 0
+    target_logs = create_log_repository(target_backend)
+    if not target_logs.query(limit=1):
+        log_count = migrate_logs(create_log_repository(source_backend), target_logs)
+
+    return {"tasks": task_count, "logs": log_count}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--from", dest="source", default="json", choices=LOG_STORAGE_BACKENDS
+    )
+    parser.add_argument(
+        "--to", dest="target", default="sqlite", choices=LOG_STORAGE_BACKENDS
+    )
+    args = parser.parse_args(argv)
+
+    result = migrate(args.source, args.target)
+    print(
+        f"✅ Migrated {result['tasks']} tasks and {result['logs']} logs "
+        f"from {args.source} to {args.target}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
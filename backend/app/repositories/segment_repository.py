@@ -0,0 +1,718 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from app.repositories.base import LogRepository
+from app.repositories.log_index import (
+    IndexEntry,
+    OffsetIndex,
+    contains,
+    make_ref,
+    split_ref,
+    tokenize,
+    union,
+)
+
+MANIFEST_FILE = "manifest.json"
+
+
+class _RecordReader:
+    """Read records by reference, reusing the open segment file"""
+
+    def __init__(self, repository: "SegmentLogRepository"):
+        self.repository = repository
+        self.handle = None
+        self.segment_id = None
+
+    def read(self, ref: int) -> Dict:
+        segment_id, offset = split_ref(ref)
+        if segment_id != self.segment_id:
+            self.close()
+            self.handle = open(self.repository._segment_path(segment_id), "rb")
+            self.segment_id = segment_id
+        self.handle.seek(offset)
+        return json.loads(self.handle.readline())
+
+    def close(self):
+        if self.handle is not None:
+            self.handle.close()
+            self.handle = None
+            self.segment_id = None
+
+    def __enter__(self) -> "_RecordReader":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+class SegmentLogRepository(LogRepository):
+    """Append-only log storage in rolled JSONL segments
+
+    Each append writes one JSON line per record to the active segment, so the
+    cost of an append does not depend on how many logs are stored. The active
+    segment is sealed once it exceeds ``max_segment_bytes`` or is older than
+    ``max_segment_age`` seconds. A background compactor rewrites sealed
+    segments to enforce the per-task log limit and to drop the logs of cleared
+    tasks. ``manifest.json`` lists the segments, pending task deletions and
+    the per-task log limit, so compaction enforces it after a restart.
+
+    Every segment has an ``.idx`` sidecar holding the offset, task and level of
+    each record. It is appended together with the segment and loaded into an
+    :class:`OffsetIndex` on startup, so queries by task and level read only the
+    records they return. A ``.terms`` sidecar written when a segment is sealed
+    holds the search terms of its messages for the inverted index.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_segment_bytes: int = 8 * 1024 * 1024,
+        max_segment_age: float = 3600,
+        compaction_interval: float = 60,
+    ):
+        self.directory = directory
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segment_age = max_segment_age
+        self.compaction_interval = compaction_interval
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._compact_lock = threading.Lock()
+        self._segments: List[Dict] = []  # manifest entries, oldest first
+        self._tombstones: Dict[str, int] = {}  # task_id -> last deleted segment id
+        self._next_id = 1
+        self._active_file = None
+        self._active_index_file = None
+        self._index = OffsetIndex()
+        self._active_terms: Dict[str, List[int]] = {}  # term -> active offsets
+        self._keep_per_task: Optional[int] = None
+        self._load()
+
+        self._compaction_wanted = threading.Event()
+        self._stopped = threading.Event()
+        self._compactor = threading.Thread(
+            target=self._compaction_loop, name="log-compactor", daemon=True
+        )
+        self._compactor.start()
+
+    # Segment files and manifest
+
+    def _segment_path(self, segment_id: int) -> str:
+        return os.path.join(self.directory, f"segment-{segment_id:08d}.jsonl")
+
+    def _index_path(self, segment_id: int) -> str:
+        return os.path.join(self.directory, f"segment-{segment_id:08d}.idx")
+
+    def _terms_path(self, segment_id: int) -> str:
+        return os.path.join(self.directory, f"segment-{segment_id:08d}.terms")
+
+    def _segment_files(self, segment_id: int) -> Tuple[str, str, str]:
+        return (
+            self._segment_path(segment_id),
+            self._index_path(segment_id),
+            self._terms_path(segment_id),
+        )
+
+    def _load(self):
+        """Load the manifest and the offset index of every segment"""
+        manifest_path = os.path.join(self.directory, MANIFEST_FILE)
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            manifest = {}
+
+        self._segments = [
+            segment
+            for segment in manifest.get("segments", [])
+            if os.path.exists(self._segment_path(segment["id"]))
+        ]
+        self._tombstones = manifest.get("tombstones", {})
+        self._next_id = manifest.get("next_id", 1)
+        self._keep_per_task = manifest.get("keep_per_task")
+        if self._segments:
+            self._next_id = max(self._next_id, self._segments[-1]["id"] + 1)
+
+        if not self._segments or self._segments[-1]["sealed"]:
+            self._new_segment()
+        else:
+            self._repair_active_segment()
+
+        for segment in self._segments:
+            for offset, task_id, level in self._load_index_entries(segment):
+                if not self._is_deleted(task_id, segment["id"]):
+                    self._index.add(make_ref(segment["id"], offset), task_id, level)
+
+            if segment["sealed"]:
+                terms = self._load_terms(segment)
+            else:
+                terms = self._active_terms = self._collect_terms(segment)
+            for term, offsets in terms.items():
+                self._index.add_terms_bulk(term, segment["id"], offsets)
+
+        self._write_manifest()
+
+    def _collect_terms(self, segment: Dict) -> Dict[str, List[int]]:
+        """Tokenize the messages of a segment and refresh its time bounds"""
+        terms: Dict[str, List[int]] = defaultdict(list)
+        first_ts = last_ts = None
+        for offset, record in self._read_segment(segment):
+            for term in tokenize(record.get("message", "")):
+                terms[term].append(offset)
+            timestamp = record.get("timestamp")
+            if timestamp:
+                first_ts = min(first_ts or timestamp, timestamp)
+                last_ts = max(last_ts or timestamp, timestamp)
+        segment["first_ts"] = first_ts
+        segment["last_ts"] = last_ts
+        return dict(terms)
+
+    def _load_terms(self, segment: Dict) -> Dict[str, List[int]]:
+        """Read the terms sidecar of a sealed segment, rebuilding it if missing"""
+        try:
+            with open(self._terms_path(segment["id"]), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            terms = self._collect_terms(segment)
+            self._write_terms_file(self._terms_path(segment["id"]), terms)
+            return terms
+
+    def _write_terms_file(self, path: str, terms: Dict[str, List[int]]):
+        """Write a terms sidecar atomically"""
+        fd, tmp_path = tempfile.mkstemp(
+            dir=self.directory, prefix=".terms.", suffix=".tmp"
+        )
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(terms, f, ensure_ascii=False, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def _load_index_entries(self, segment: Dict) -> List[IndexEntry]:
+        """Read the sidecar index of a segment, re-indexing any missing tail"""
+        entries: List[IndexEntry] = []
+        stale = True  # sidecar missing or holding entries past the segment end
+        try:
+            with open(self._index_path(segment["id"]), "r", encoding="utf-8") as f:
+                stale = False
+                for line in f:
+                    try:
+                        offset, task_id, level = json.loads(line)
+                    except ValueError:
+                        stale = True
+                        break
+                    if offset >= segment["size"]:
+                        stale = True
+                        break
+                    entries.append((offset, task_id, level))
+        except FileNotFoundError:
+            pass
+
+        # Index records written after the last indexed one (e.g. after a crash)
+        start = entries[-1][0] if entries else 0
+        missing = []
+        for offset, record in self._read_segment(segment, start=start):
+            if entries and offset == start:
+                continue
+            missing.append((offset, record["task_id"], self._level_of(record)))
+
+        if missing or stale:
+            entries.extend(missing)
+            self._write_index_file(self._index_path(segment["id"]), entries)
+        return entries
+
+    @staticmethod
+    def _level_of(record: Dict) -> str:
+        return str(record.get("level") or "INFO").upper()
+
+    def _write_index_file(self, path: str, entries: Iterable[IndexEntry]):
+        """Write a sidecar index atomically"""
+        fd, tmp_path = tempfile.mkstemp(
+            dir=self.directory, prefix=".index.", suffix=".tmp"
+        )
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(list(entry), ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def _repair_active_segment(self):
+        """Drop a partially written last line left behind by a crash"""
+        active = self._segments[-1]
+        path = self._segment_path(active["id"])
+        with open(path, "rb+") as f:
+            data = f.read()
+            end = data.rfind(b"\n") + 1
+            if end != len(data):
+                f.truncate(end)
+        active["size"] = end
+        active["records"] = data[:end].count(b"\n")
+
+    def _write_manifest(self):
+        """Write the manifest atomically"""
+        manifest = {
+            "next_id": self._next_id,
+            "segments": self._segments,
+            "tombstones": self._tombstones,
+            "keep_per_task": self._keep_per_task,
+        }
+        fd, tmp_path = tempfile.mkstemp(
+            dir=self.directory, prefix=".manifest.", suffix=".tmp"
+        )
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, os.path.join(self.directory, MANIFEST_FILE))
+
+    def _new_segment(self):
+        """Start a new active segment"""
+        segment = {
+            "id": self._next_id,
+            "sealed": False,
+            "created_at": time.time(),
+            "size": 0,
+            "records": 0,
+            "first_ts": None,
+            "last_ts": None,
+        }
+        self._next_id += 1
+        open(self._segment_path(segment["id"]), "ab").close()
+        self._segments.append(segment)
+
+    def _close_active_file(self):
+        for name in ("_active_file", "_active_index_file"):
+            handle = getattr(self, name)
+            if handle is not None:
+                handle.flush()
+                os.fsync(handle.fileno())
+                handle.close()
+                setattr(self, name, None)
+
+    def _roll(self):
+        """Seal the active segment and start a new one"""
+        self._close_active_file()
+        sealed = self._segments[-1]
+        self._write_terms_file(self._terms_path(sealed["id"]), self._active_terms)
+        self._active_terms = {}
+        sealed["sealed"] = True
+        self._new_segment()
+        self._write_manifest()
+
+    def _read_segment(
+        self, segment: Dict, start: int = 0
+    ) -> Iterator[Tuple[int, Dict]]:
+        """Yield (offset, record) pairs of a segment in append order"""
+        try:
+            with open(self._segment_path(segment["id"]), "rb") as f:
+                f.seek(start)
+                data = f.read(max(segment["size"] - start, 0))
+        except FileNotFoundError:
+            return
+        offset = start
+        for line in data.splitlines(keepends=True):
+            if line.strip():
+                yield offset, json.loads(line)
+            offset += len(line)
+
+    def _is_deleted(self, task_id: str, segment_id: int) -> bool:
+        return segment_id <= self._tombstones.get(task_id, 0)
+
+    def _read_refs(self, refs: List[int]) -> List[Dict]:
+        """Read the records behind a list of references, keeping their order"""
+        with _RecordReader(self) as reader:
+            return [reader.read(ref) for ref in refs]
+
+    # LogRepository interface
+
+    def append_many(self, logs: List[Dict], keep_per_task: Optional[int] = None):
+        if not logs:
+            return
+        lines = [
+            (json.dumps(log, ensure_ascii=False) + "\n").encode("utf-8") for log in logs
+        ]
+
+        with self._lock:
+            if keep_per_task is not None and keep_per_task != self._keep_per_task:
+                self._keep_per_task = keep_per_task
+                self._write_manifest()
+
+            active = self._segments[-1]
+            if (
+                active["records"]
+                and time.time() - active["created_at"] >= self.max_segment_age
+            ):
+                self._roll()
+                active = self._segments[-1]
+
+            if self._active_file is None:
+                self._active_file = open(self._segment_path(active["id"]), "ab")
+                self._active_index_file = open(self._index_path(active["id"]), "ab")
+
+            offset = active["size"]
+            entries = []
+            for log, line in zip(logs, lines):
+                entries.append((offset, log["task_id"], self._level_of(log)))
+                offset += len(line)
+            self._active_file.write(b"".join(lines))
+            self._active_file.flush()
+            self._active_index_file.write(
+                "".join(
+                    json.dumps(list(entry), ensure_ascii=False) + "\n"
+                    for entry in entries
+                ).encode("utf-8")
+            )
+            self._active_index_file.flush()
+            active["size"] = offset
+            active["records"] += len(logs)
+
+            for log, (entry_offset, task_id, level) in zip(logs, entries):
+                ref = make_ref(active["id"], entry_offset)
+                self._index.add(ref, task_id, level)
+                terms = tokenize(log.get("message", ""))
+                self._index.add_terms(ref, terms)
+                for term in terms:
+                    self._active_terms.setdefault(term, []).append(entry_offset)
+                if self._over_limit(self._index.count(task_id)):
+                    self._compaction_wanted.set()
+
+                timestamp = log.get("timestamp")
+                if timestamp:
+                    active["first_ts"] = min(
+                        active.get("first_ts") or timestamp, timestamp
+                    )
+                    active["last_ts"] = max(
+                        active.get("last_ts") or timestamp, timestamp
+                    )
+
+            if active["size"] >= self.max_segment_bytes:
+                self._roll()
+
+    def _over_limit(self, count: int) -> bool:
+        """Whether a task holds enough excess logs to be worth compacting"""
+        keep = self._keep_per_task
+        if keep is None:
+            return False
+        return count > keep + max(keep // 10, 1)
+
+    def query(
+        self,
+        limit: int = 100,
+        level: Optional[str] = None,
+        task_id: Optional[str] = None,
+    ) -> List[Dict]:
+        if limit <= 0:
+            return []
+        level = level.upper() if level else None
+        # Reads happen under the lock so compaction cannot swap a segment
+        # between looking up a reference and reading it
+        with self._lock:
+            refs = self._index.newest(limit, task_id=task_id, level=level)
+            return self._read_refs(refs)
+
+    def search(
+        self,
+        keyword: str,
+        limit: int = 100,
+        task_id: Optional[str] = None,
+        level: Optional[str] = None,
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None,
+    ) -> List[Dict]:
+        """Find the newest logs containing every word of ``keyword``
+
+        Like the other repositories, each whitespace-separated word must occur
+        in the message, case-insensitively, possibly inside a longer word. The
+        posting lists of the terms of the words (and the task index when
+        filtering by task) are intersected newest-first, driven by the
+        shortest list, so only candidate records are read and checked against
+        their message. Segment time bounds let the time range filter skip
+        whole segments.
+        """
+        words = keyword.lower().split()
+        if not words or limit <= 0:
+            return []
+        level = level.upper() if level else None
+
+        with self._lock:
+            lists = [
+                refs
+                for word in words
+                for refs in self._index.substring_candidates(word)
+            ]
+            if task_id:
+                if level:
+                    lists.append(self._index.by_task_level.get((task_id, level)))
+                else:
+                    lists.append(self._index.by_task.get(task_id))
+            elif not lists:
+                # No indexed term to narrow the search down
+                lists.append(union(list(self._index.by_task.values())))
+            if not all(lists):
+                return []
+            lists.sort(key=len)
+            driver, others = lists[0], lists[1:]
+            bounds = {
+                segment["id"]: (segment.get("first_ts"), segment.get("last_ts"))
+                for segment in self._segments
+            }
+
+            results = []
+            with _RecordReader(self) as reader:
+                i = len(driver) - 1
+                while i >= 0 and len(results) < limit:
+                    ref = driver[i]
+                    segment_id = split_ref(ref)[0]
+                    first_ts, last_ts = bounds.get(segment_id, (None, None))
+                    if start_time and last_ts and last_ts < start_time:
+                        # Older segments only hold older logs
+                        break
+                    if end_time and first_ts and first_ts > end_time:
+                        # Skip the rest of this segment
+                        i = bisect_left(driver, make_ref(segment_id, 0)) - 1
+                        continue
+                    i -= 1
+
+                    if not all(contains(refs, ref) for refs in others):
+                        continue
+                    record = reader.read(ref)
+                    if self._is_deleted(record["task_id"], segment_id):
+                        continue
+                    if level and self._level_of(record) != level:
+                        continue
+                    message = (record.get("message") or "").lower()
+                    if not all(word in message for word in words):
+                        continue
+                    timestamp = record.get("timestamp", "")
+                    if start_time and timestamp < start_time:
+                        continue
+                    if end_time and timestamp > end_time:
+                        continue
+                    results.append(record)
+            return results
+
+    def delete_by_task(self, task_id: str) -> bool:
+        with self._lock:
+            if not self._index.count(task_id):
+                return False
+            self._index.remove_task(task_id)
+            # Seal the active segment so the deletion covers whole segments
+            if self._segments[-1]["records"]:
+                self._roll()
+            self._tombstones[task_id] = self._segments[-2]["id"]
+            self._write_manifest()
+        self._compaction_wanted.set()
+        return True
+
+    def clear(self) -> bool:
+        try:
+            with self._compact_lock, self._lock:
+                self._close_active_file()
+                for segment in self._segments:
+                    for path in self._segment_files(segment["id"]):
+                        if os.path.exists(path):
+                            os.remove(path)
+                self._segments = []
+                self._tombstones = {}
+                self._index = OffsetIndex()
+                self._active_terms = {}
+                self._new_segment()
+                self._write_manifest()
+            return True
+        except Exception:
+            return False
+
+    def iter_all(self) -> Iterator[Dict]:
+        with self._lock:
+            segments = [dict(segment) for segment in self._segments]
+            tombstones = dict(self._tombstones)
+        for segment in segments:
+            for _, record in self._read_segment(segment):
+                if segment["id"] > tombstones.get(record["task_id"], 0):
+                    yield record
+
+    def close(self):
+        """Stop the compactor and sync the active segment to disk"""
+        self._stopped.set()
+        self._compaction_wanted.set()
+        # A compaction in progress finishes and records its segments first
+        self._compactor.join()
+        with self._lock:
+            self._close_active_file()
+            self._write_manifest()
+
+    # Compaction
+
+    def _compaction_loop(self):
+        while not self._stopped.is_set():
+            self._compaction_wanted.wait(self.compaction_interval)
+            if self._stopped.is_set():
+                return
+            if not self._compaction_wanted.is_set():
+                # Periodic wake-up: seal an idle segment that has grown old
+                with self._lock:
+                    active = self._segments[-1]
+                    if (
+                        active["records"]
+                        and time.time() - active["created_at"] >= self.max_segment_age
+                    ):
+                        self._roll()
+                continue
+            self._compaction_wanted.clear()
+            try:
+                self.compact()
+            except Exception as e:
+                print(f"Error compacting log segments: {e}")
+
+    def compact(self):
+        """Rewrite sealed segments without expired and deleted logs"""
+        with self._compact_lock:
+            with self._lock:
+                sealed = [dict(s) for s in self._segments if s["sealed"]]
+                tombstones = dict(self._tombstones)
+                keep = self._keep_per_task
+                excess = {}
+                if keep is not None:
+                    excess = {
+                        task_id: len(refs) - keep
+                        for task_id, refs in self._index.by_task.items()
+                        if len(refs) > keep
+                    }
+
+            rewritten = []
+            for segment in sealed:
+                entries = self._load_index_entries(segment)
+                kept = []
+                for entry in entries:
+                    task_id = entry[1]
+                    if segment["id"] <= tombstones.get(task_id, 0):
+                        continue
+                    if excess.get(task_id, 0) > 0:
+                        excess[task_id] -= 1
+                        continue
+                    kept.append(entry)
+                if len(kept) < len(entries):
+                    terms = self._load_terms(segment)
+                    rewritten.append(
+                        (segment, {entry[1] for entry in entries}, set(terms))
+                        + self._write_segment_copy(segment, entries, kept, terms)
+                    )
+
+            with self._lock:
+                for (
+                    segment,
+                    old_tasks,
+                    old_terms,
+                    tmp_paths,
+                    new_entries,
+                    new_terms,
+                ) in rewritten:
+                    self._replace_segment(
+                        segment, old_tasks, old_terms, tmp_paths, new_entries, new_terms
+                    )
+                for task_id, segment_id in tombstones.items():
+                    if self._tombstones.get(task_id) == segment_id:
+                        del self._tombstones[task_id]
+                self._write_manifest()
+
+    def _write_segment_copy(
+        self,
+        segment: Dict,
+        entries: List[IndexEntry],
+        kept: List[IndexEntry],
+        terms: Dict[str, List[int]],
+    ) -> Tuple[Optional[Tuple[str, str, str]], List[IndexEntry], Dict[str, List[int]]]:
+        """Copy the kept records of a segment into temporary sidecar files
+
+        Records are copied as raw bytes using the index offsets, without
+        decoding them, and the term postings are remapped to the new offsets.
+        """
+        if not kept:
+            return None, [], {}
+
+        with open(self._segment_path(segment["id"]), "rb") as f:
+            data = f.read(segment["size"])
+        bounds = {
+            entry[0]: next_entry[0]
+            for entry, next_entry in zip(entries, entries[1:] + [(len(data),)])
+        }
+
+        fd, tmp_segment = tempfile.mkstemp(
+            dir=self.directory, prefix=".segment.", suffix=".tmp"
+        )
+        new_entries = []
+        with os.fdopen(fd, "wb") as f:
+            for offset, task_id, level in kept:
+                new_entries.append((f.tell(), task_id, level))
+                f.write(data[offset : bounds[offset]])
+            f.flush()
+            os.fsync(f.fileno())
+
+        fd, tmp_index = tempfile.mkstemp(
+            dir=self.directory, prefix=".index.", suffix=".tmp"
+        )
+        os.close(fd)
+        self._write_index_file(tmp_index, new_entries)
+
+        moved = {old[0]: new[0] for old, new in zip(kept, new_entries)}
+        new_terms = {}
+        for term, offsets in terms.items():
+            remapped = [moved[offset] for offset in offsets if offset in moved]
+            if remapped:
+                new_terms[term] = remapped
+        fd, tmp_terms = tempfile.mkstemp(
+            dir=self.directory, prefix=".terms.", suffix=".tmp"
+        )
+        os.close(fd)
+        self._write_terms_file(tmp_terms, new_terms)
+        return (tmp_segment, tmp_index, tmp_terms), new_entries, new_terms
+
+    def _replace_segment(
+        self,
+        segment: Dict,
+        old_tasks: Set[str],
+        old_terms: Set[str],
+        tmp_paths: Optional[Tuple[str, str, str]],
+        new_entries: List[IndexEntry],
+        new_terms: Dict[str, List[int]],
+    ):
+        """Swap a compacted segment in, or drop it when nothing is left"""
+        segment_id = segment["id"]
+        for index, current in enumerate(self._segments):
+            if current["id"] == segment_id:
+                break
+        else:
+            # Segment disappeared meanwhile (logs cleared)
+            for path in tmp_paths or ():
+                os.remove(path)
+            return
+
+        # Tasks deleted during compaction are already gone from the index
+        self._index.replace_segment(
+            segment_id,
+            [e for e in new_entries if not self._is_deleted(e[1], segment_id)],
+            old_tasks,
+            new_terms,
+            old_terms,
+        )
+
+        paths = self._segment_files(segment_id)
+        segment_path = paths[0]
+        if tmp_paths is None:
+            del self._segments[index]
+            for path in paths:
+                if os.path.exists(path):
+                    os.remove(path)
+        else:
+            for tmp_path, path in zip(tmp_paths, paths):
+                os.replace(tmp_path, path)
+            current["size"] = os.path.getsize(segment_path)
+            current["records"] = len(new_entries)
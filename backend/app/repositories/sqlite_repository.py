@@ -0,0 +1,283 @@
+import json
+import sqlite3
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from app.repositories.base import LogRepository, TaskRepository
+
+TASKS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    status TEXT,
+    created_at TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_name ON tasks (name);
+CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status);
+CREATE INDEX IF NOT EXISTS idx_tasks_created_at ON tasks (created_at);
+"""
+
+LOGS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS logs (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT,
+    task_id TEXT NOT NULL,
+    task_name TEXT,
+    timestamp TEXT NOT NULL,
+    level TEXT NOT NULL,
+    message TEXT NOT NULL,
+    source TEXT,
+    stream_seq INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_logs_task_ts ON logs (task_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_logs_task_level_ts ON logs (task_id, level, timestamp);
+CREATE INDEX IF NOT EXISTS idx_logs_level_ts ON logs (level, timestamp);
+CREATE INDEX IF NOT EXISTS idx_logs_ts ON logs (timestamp);
+"""
+
+LOG_COLUMNS = ("id", "task_id", "task_name", "timestamp", "level", "message", "source")
+
+
+class SQLiteDatabase:
+    """Shared SQLite connection in WAL mode
+
+    A single connection is shared by the task and log repositories and guarded
+    by a lock, since writes come from both request handlers and background
+    flusher threads.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(
+            db_path, check_same_thread=False, isolation_level=None
+        )
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(TASKS_SCHEMA + LOGS_SCHEMA)
+        self._upgrade_schema()
+
+    def _upgrade_schema(self):
+        """Add columns introduced after a database was created"""
+        columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(logs)")}
+        if "stream_seq" not in columns:
+            self.conn.execute("ALTER TABLE logs ADD COLUMN stream_seq INTEGER")
+
+    def transaction(self):
+        """Context manager running statements in one transaction"""
+        return _Transaction(self)
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+class _Transaction:
+    def __init__(self, db: SQLiteDatabase):
+        self.db = db
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.db.lock.acquire()
+        self.db.conn.execute("BEGIN IMMEDIATE")
+        return self.db.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self.db.conn.execute("COMMIT")
+            else:
+                self.db.conn.execute("ROLLBACK")
+        finally:
+            self.db.lock.release()
+        return False
+
+
+class SQLiteTaskRepository(TaskRepository):
+    """Task storage with one row per task"""
+
+    def __init__(self, db: SQLiteDatabase):
+        self.db = db
+
+    def load_all(self) -> List[Dict]:
+        with self.db.lock:
+            rows = self.db.conn.execute(
+                "SELECT data FROM tasks ORDER BY seq"
+            ).fetchall()
+        return [json.loads(row["data"]) for row in rows]
+
+    def save_changes(
+        self,
+        snapshot: List[Dict],
+        changed_ids: Iterable[str],
+        deleted_ids: Iterable[str],
+    ):
+        """Upsert changed rows and delete removed rows only"""
+        changed_ids = set(changed_ids)
+        deleted_ids = list(deleted_ids)
+        changed = [task for task in snapshot if task["id"] in changed_ids]
+
+        with self.db.transaction() as conn:
+            if deleted_ids:
+                conn.executemany(
+                    "DELETE FROM tasks WHERE id = ?", [(i,) for i in deleted_ids]
+                )
+            conn.executemany(
+                "INSERT INTO tasks (id, name, status, created_at, data) "
+                "VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET name = excluded.name, "
+                "status = excluded.status, created_at = excluded.created_at, "
+                "data = excluded.data",
+                [
+                    (
+                        task["id"],
+                        task.get("name", ""),
+                        task.get("status"),
+                        task.get("created_at"),
+                        json.dumps(task, ensure_ascii=False),
+                    )
+                    for task in changed
+                ],
+            )
+
+
+class SQLiteLogRepository(LogRepository):
+    """Log storage with indexed queries by task, level and time"""
+
+    def __init__(self, db: SQLiteDatabase):
+        self.db = db
+
+    @staticmethod
+    def _row_to_log(row: sqlite3.Row) -> Dict:
+        log = {column: row[column] for column in LOG_COLUMNS}
+        # ``seq`` is the table's row key, the stream sequence has its own column
+        log["seq"] = row["stream_seq"]
+        return log
+
+    def append_many(self, logs: List[Dict], keep_per_task: Optional[int] = None):
+        if not logs:
+            return
+        with self.db.transaction() as conn:
+            conn.executemany(
+                "INSERT INTO logs (id, task_id, task_name, timestamp, level, "
+                "message, source, stream_seq) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        log.get("id"),
+                        log["task_id"],
+                        log.get("task_name"),
+                        log["timestamp"],
+                        str(log.get("level", "INFO")).upper(),
+                        log.get("message", ""),
+                        log.get("source"),
+                        log.get("seq"),
+                    )
+                    for log in logs
+                ],
+            )
+
+            # Limit log count per task: drop everything older than the
+            # ``keep_per_task``-th newest log, found through the task index
+            if keep_per_task is not None:
+                for task_id in {log["task_id"] for log in logs}:
+                    conn.execute(
+                        "DELETE FROM logs WHERE task_id = ? AND timestamp < ("
+                        "SELECT timestamp FROM logs WHERE task_id = ? "
+                        "ORDER BY timestamp DESC LIMIT 1 OFFSET ?)",
+                        (task_id, task_id, keep_per_task - 1),
+                    )
+
+    def query(
+        self,
+        limit: int = 100,
+        level: Optional[str] = None,
+        task_id: Optional[str] = None,
+    ) -> List[Dict]:
+        conditions = []
+        params: List = []
+        if task_id:
+            conditions.append("task_id = ?")
+            params.append(task_id)
+        if level:
+            conditions.append("level = ?")
+            params.append(level.upper())
+
+        sql = "SELECT * FROM logs"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY timestamp DESC LIMIT ?"
+        params.append(limit)
+
+        with self.db.lock:
+            rows = self.db.conn.execute(sql, params).fetchall()
+        return [self._row_to_log(row) for row in rows]
+
+    def search(
+        self,
+        keyword: str,
+        limit: int = 100,
+        task_id: Optional[str] = None,
+        level: Optional[str] = None,
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None,
+    ) -> List[Dict]:
+        conditions = []
+        params: List = []
+        for term in keyword.split():
+            conditions.append("message LIKE ? ESCAPE '\\'")
+            params.append(
+                "%"
+                + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+                + "%"
+            )
+        if task_id:
+            conditions.append("task_id = ?")
+            params.append(task_id)
+        if level:
+            conditions.append("level = ?")
+            params.append(level.upper())
+        if start_time:
+            conditions.append("timestamp >= ?")
+            params.append(start_time)
+        if end_time:
+            conditions.append("timestamp <= ?")
+            params.append(end_time)
+
+        sql = "SELECT * FROM logs"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY timestamp DESC LIMIT ?"
+        params.append(limit)
+
+        with self.db.lock:
+            rows = self.db.conn.execute(sql, params).fetchall()
+        return [self._row_to_log(row) for row in rows]
+
+    def delete_by_task(self, task_id: str) -> bool:
+        with self.db.transaction() as conn:
+            cursor = conn.execute("DELETE FROM logs WHERE task_id = ?", (task_id,))
+            return cursor.rowcount > 0
+
+    def clear(self) -> bool:
+        try:
+            with self.db.transaction() as conn:
+                conn.execute("DELETE FROM logs")
+            return True
+        except Exception:
+            return False
+
+    def iter_all(self) -> Iterator[Dict]:
+        last_seq = 0
+        while True:
+            with self.db.lock:
+                rows = self.db.conn.execute(
+                    "SELECT * FROM logs WHERE seq > ? ORDER BY seq LIMIT 1000",
+                    (last_seq,),
+                ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield self._row_to_log(row)
+            last_seq = rows[-1]["seq"]
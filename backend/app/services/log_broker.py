@@ -0,0 +1,149 @@
+import asyncio
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+
+OVERFLOW_POLICIES = ("drop_oldest", "coalesce")
+
+
+def _check_policy(policy: str):
+    if policy not in OVERFLOW_POLICIES:
+        raise ValueError(
+            f"Unknown overflow policy '{policy}', "
+            f"expected one of: {', '.join(OVERFLOW_POLICIES)}"
+        )
+
+
+def skipped_marker(count: int) -> Dict[str, Any]:
+    """Stream item standing in for ``count`` lines a subscriber did not get"""
+    return {
+        "type": "skipped",
+        "count": count,
+        "timestamp": datetime.now().isoformat(),
+        "level": "WARNING",
+        "message": f"{count} lines skipped",
+        "source": "system",
+    }
+
+
+class Subscription:
+    """Bounded queue of one subscriber of a topic
+
+    ``offer`` never blocks: when the queue is full the oldest item is dropped.
+    With the ``coalesce`` policy the dropped items are reported to the
+    consumer as one "N lines skipped" marker ahead of the remaining items;
+    with ``drop_oldest`` they are only counted.
+    """
+
+    def __init__(self, topic: str, maxsize: int, policy: str):
+        _check_policy(policy)
+        self.topic = topic
+        self.maxsize = maxsize
+        self.policy = policy
+        self.created_at = time.time()
+        self.delivered = 0
+        self.dropped = 0
+        self._items: deque = deque()
+        self._skipped = 0  # Dropped items not yet reported by a marker
+        self._ready = asyncio.Event()
+        self.closed = False
+
+    @property
+    def lag(self) -> int:
+        """Items waiting to be consumed"""
+        return len(self._items)
+
+    def offer(self, item: Any):
+        """Queue an item, dropping the oldest one if the queue is full"""
+        if self.closed:
+            return
+        if len(self._items) >= self.maxsize:
+            self._items.popleft()
+            self.dropped += 1
+            if self.policy == "coalesce":
+                self._skipped += 1
+        self._items.append(item)
+        self._ready.set()
+
+    def get_nowait(self) -> Optional[Any]:
+        """Take the next item, or None if the queue is empty"""
+        if self._skipped:
+            count, self._skipped = self._skipped, 0
+            return skipped_marker(count)
+        if not self._items:
+            self._ready.clear()
+            return None
+        self.delivered += 1
+        return self._items.popleft()
+
+    async def get(self) -> Any:
+        """Wait for and take the next item"""
+        while True:
+            item = self.get_nowait()
+            if item is not None:
+                return item
+            await self._ready.wait()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "topic": self.topic,
+            "policy": self.policy,
+            "maxsize": self.maxsize,
+            "lag": self.lag,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "connected_at": datetime.fromtimestamp(self.created_at).isoformat(),
+        }
+
+
+class LogBroker:
+    """Fan-out of log lines to the subscribers of each task
+
+    Publishing appends to every subscriber's bounded queue without waiting,
+    so a slow consumer only loses its own oldest lines and never holds up
+    the producer or the other subscribers.
+    """
+
+    def __init__(self, maxsize: int = 1000, policy: str = "coalesce"):
+        _check_policy(policy)
+        self.maxsize = maxsize
+        self.policy = policy
+        self._topics: Dict[str, Set[Subscription]] = {}
+
+    def subscribe(
+        self, topic: str, maxsize: Optional[int] = None, policy: Optional[str] = None
+    ) -> Subscription:
+        subscription = Subscription(
+            topic, maxsize or self.maxsize, policy or self.policy
+        )
+        self._topics.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscription.closed = True
+        subscribers = self._topics.get(subscription.topic)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._topics[subscription.topic]
+
+    def publish(self, topic: str, item: Any) -> int:
+        """Offer an item to all subscribers of a topic, returns their count"""
+        subscribers = self._topics.get(topic)
+        if not subscribers:
+            return 0
+        for subscription in subscribers:
+            subscription.offer(item)
+        return len(subscribers)
+
+    def has_subscribers(self, topic: str) -> bool:
+        return bool(self._topics.get(topic))
+
+    def stats(self, topic: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Lag and drop counters of all subscribers, optionally of one topic"""
+        if topic is not None:
+            subscriptions = list(self._topics.get(topic, ()))
+        else:
+            subscriptions = [s for subs in self._topics.values() for s in subs]
+        return [subscription.stats() for subscription in subscriptions]
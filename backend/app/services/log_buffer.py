@@ -0,0 +1,101 @@
+from typing import Any, Dict, Iterator, List, Optional
+
+
+class LogRecord:
+    """One buffered log line
+
+    Supports read-only mapping access (``record["message"]``,
+    ``record.get("source")``) so it can stand in for the plain log dicts
+    consumers used to receive.
+    """
+
+    FIELDS = ("seq", "timestamp", "level", "message", "source")
+    __slots__ = FIELDS + ("frame",)
+
+    def __init__(self, seq: int, timestamp: str, level: str, message: str, source):
+        self.seq = seq
+        self.timestamp = timestamp
+        self.level = level
+        self.message = message
+        self.source = source
+        self.frame: Optional[bytes] = None  # Pre-encoded SSE frame
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = getattr(self, key) if key in self.FIELDS else None
+        return default if value is None else value
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {key: getattr(self, key) for key in self.FIELDS}
+
+
+class LogRingBuffer:
+    """Fixed-capacity buffer of the newest log lines of a task
+
+    Records live in a preallocated list of ``capacity`` slots and are numbered
+    with increasing sequence numbers; record ``seq`` is stored in slot
+    ``seq % capacity``, so appending overwrites the oldest record in O(1).
+    """
+
+    def __init__(self, capacity: int = 1000, last_seq: int = 0):
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        self._slots: List[Optional[LogRecord]] = [None] * capacity
+        self._next_seq = last_seq + 1
+        self._start_seq = self._next_seq  # First sequence number of this buffer
+
+    @property
+    def capacity(self) -> int:
+        return len(self._slots)
+
+    @property
+    def last_seq(self) -> int:
+        """Sequence number of the newest record, 0 when empty"""
+        return self._next_seq - 1
+
+    @property
+    def first_seq(self) -> int:
+        """Sequence number of the oldest record still buffered"""
+        return max(self._start_seq, self._next_seq - len(self._slots))
+
+    def __len__(self) -> int:
+        return self._next_seq - self.first_seq
+
+    def append(self, timestamp: str, level: str, message: str, source) -> LogRecord:
+        record = LogRecord(self._next_seq, timestamp, level, message, source)
+        self._slots[self._next_seq % len(self._slots)] = record
+        self._next_seq += 1
+        return record
+
+    def snapshot(self, since_seq: int = 0) -> Iterator[LogRecord]:
+        """Iterate over the buffered records newer than ``since_seq``
+
+        The range is fixed when this is called, so records appended later are
+        not included, and the records are read lazily instead of copied up
+        front; records overwritten while iterating are skipped.
+        """
+        start = max(since_seq + 1, self.first_seq)
+        return self._iter_range(start, self.last_seq)
+
+    def _iter_range(self, start: int, end: int) -> Iterator[LogRecord]:
+        slots = self._slots
+        for seq in range(start, end + 1):
+            record = slots[seq % len(slots)]
+            if record is not None and record.seq == seq:
+                yield record
+
+    def resize(self, capacity: int):
+        """Change the capacity, keeping the newest records that fit"""
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        if capacity == len(self._slots):
+            return
+        records = list(self.snapshot())[-capacity:]
+        self._slots = [None] * capacity
+        for record in records:
+            self._slots[record.seq % capacity] = record
+        self._start_seq = records[0].seq if records else self._next_seq
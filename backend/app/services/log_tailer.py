@@ -0,0 +1,289 @@
+import asyncio
+import ctypes
+import ctypes.util
+import os
+import struct
+import sys
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+LineCallback = Callable[[str], Awaitable[None]]
+
+# inotify constants from <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (
+    IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+)
+EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, name length
+
+READ_CHUNK = 64 * 1024
+
+
+class _Inotify:
+    """Minimal ctypes binding of the Linux inotify API"""
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self._rm_watch = libc.inotify_rm_watch
+        self._rm_watch.argtypes = (ctypes.c_int, ctypes.c_int)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+    def add_watch(self, path: str, mask: int) -> int:
+        wd = self._add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), path)
+        return wd
+
+    def rm_watch(self, wd: int):
+        self._rm_watch(self.fd, wd)
+
+    def read_events(self) -> List[tuple]:
+        """Read pending events as (wd, mask, name) tuples"""
+        try:
+            data = os.read(self.fd, READ_CHUNK)
+        except BlockingIOError:
+            return []
+        events = []
+        pos = 0
+        while pos + EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, pos)
+            pos += EVENT_HEADER.size
+            name = data[pos : pos + length].rstrip(b"\0")
+            pos += length
+            events.append((wd, mask, os.fsdecode(name)))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+
+class _TailState:
+    """Read position of one followed file"""
+
+    __slots__ = (
+        "path",
+        "callback",
+        "inode",
+        "position",
+        "partial",
+        "wd",
+        "reading",
+        "dirty",
+        "reader",
+    )
+
+    def __init__(self, path: str, callback: LineCallback):
+        self.path = path
+        self.callback = callback
+        self.inode: Optional[int] = None
+        self.position = 0
+        self.partial = b""  # Trailing bytes of an unfinished line
+        self.wd: Optional[int] = None  # Watch of the parent directory
+        self.reading = False
+        self.dirty = False
+        self.reader: Optional[asyncio.Task] = None
+
+
+class LogTailer:
+    """Follow many log files with one inotify watcher
+
+    Each followed file is watched through its parent directory, so files that
+    are created, truncated or rotated later are picked up as well; the inode
+    and size of the file tell a rotation or truncation apart from an append,
+    and reading restarts at the beginning of the file. Files whose directory
+    does not exist yet, and all files on platforms without inotify, are
+    checked every ``poll_interval`` seconds with a ``stat`` call instead.
+    """
+
+    def __init__(self, poll_interval: float = 0.5, use_inotify: bool = True):
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify and sys.platform.startswith("linux")
+        self._states: Dict[str, _TailState] = {}
+        self._dirs: Dict[int, str] = {}  # wd -> watched directory
+        self._inotify: Optional[_Inotify] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._poll_task: Optional[asyncio.Task] = None
+
+    @property
+    def mode(self) -> str:
+        return "inotify" if self._inotify is not None else "poll"
+
+    def _start(self):
+        self._loop = asyncio.get_running_loop()
+        if self.use_inotify:
+            try:
+                self._inotify = _Inotify()
+                self._loop.add_reader(self._inotify.fd, self._on_events)
+            except (OSError, AttributeError) as e:
+                print(f"inotify unavailable, polling log files instead: {e}")
+                self._inotify = None
+        self._poll_task = self._loop.create_task(self._poll_loop())
+
+    def watch(
+        self,
+        path: str,
+        callback: LineCallback,
+        position: Optional[Sequence[int]] = None,
+    ):
+        """Follow a file, passing each new line to callback
+
+        Reading starts at the beginning of the file, or at ``position``, an
+        ``(inode, offset)`` pair from ``position()``, while the file still is
+        that inode and at least that long. Must be called from the event loop.
+        """
+        if self._loop is None:
+            self._start()
+        path = os.path.abspath(path)
+        self.unwatch(path)
+        state = self._states[path] = _TailState(path, callback)
+        if position is not None:
+            state.inode, state.position = position
+        self._add_watch(state)
+        self._schedule_read(state)
+
+    def position(self, path: str) -> Optional[Tuple[int, int]]:
+        """``(inode, offset)`` after the last complete line passed on"""
+        state = self._states.get(os.path.abspath(path))
+        if state is None or state.inode is None:
+            return None
+        return state.inode, state.position - len(state.partial)
+
+    async def flush(self, path: str):
+        """Pass the lines appended so far to the callback before returning"""
+        state = self._states.get(os.path.abspath(path))
+        if state is None:
+            return
+        self._schedule_read(state)
+        if state.reader is not None:
+            await asyncio.shield(state.reader)
+
+    def unwatch(self, path: str):
+        """Stop following a file"""
+        state = self._states.pop(os.path.abspath(path), None)
+        if state is None or state.wd is None:
+            return
+        if not any(other.wd == state.wd for other in self._states.values()):
+            self._inotify.rm_watch(state.wd)
+            self._dirs.pop(state.wd, None)
+
+    def _add_watch(self, state: _TailState):
+        if self._inotify is None:
+            return
+        directory = os.path.dirname(state.path)
+        try:
+            state.wd = self._inotify.add_watch(directory, WATCH_MASK)
+        except FileNotFoundError:
+            return  # Polled until the directory is created
+        except OSError as e:
+            print(f"Cannot watch {directory}, polling it instead: {e}")
+            return
+        self._dirs[state.wd] = directory
+
+    def _on_events(self):
+        rescan = False
+        changed = set()
+        for wd, mask, name in self._inotify.read_events():
+            if mask & IN_Q_OVERFLOW:
+                rescan = True
+            elif mask & IN_IGNORED:
+                # Directory removed, fall back to polling until it returns
+                self._dirs.pop(wd, None)
+                for state in self._states.values():
+                    if state.wd == wd:
+                        state.wd = None
+            elif wd in self._dirs:
+                changed.add(os.path.join(self._dirs[wd], name))
+
+        for state in list(self._states.values()):
+            if rescan or state.path in changed:
+                self._schedule_read(state)
+
+    async def _poll_loop(self):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            for state in list(self._states.values()):
+                if state.wd is not None:
+                    continue
+                self._add_watch(state)
+                if state.wd is not None or self._has_changed(state):
+                    self._schedule_read(state)
+
+    @staticmethod
+    def _has_changed(state: _TailState) -> bool:
+        try:
+            stat = os.stat(state.path)
+        except OSError:
+            return False
+        return stat.st_ino != state.inode or stat.st_size != state.position
+
+    def _schedule_read(self, state: _TailState):
+        if state.reading:
+            # Read again once the current read is done
+            state.dirty = True
+            return
+        state.reading = True
+        state.reader = self._loop.create_task(self._read(state))
+
+    async def _read(self, state: _TailState):
+        try:
+            while True:
+                state.dirty = False
+                for line in self._read_lines(state):
+                    if self._states.get(state.path) is not state:
+                        return
+                    try:
+                        await state.callback(line)
+                    except Exception as e:
+                        print(f"Error handling log line of {state.path}: {e}")
+                if not state.dirty:
+                    return
+        finally:
+            state.reading = False
+
+    @staticmethod
+    def _read_lines(state: _TailState) -> List[str]:
+        """Read the complete lines appended since the last read"""
+        try:
+            with open(state.path, "rb") as f:
+                stat = os.fstat(f.fileno())
+                if stat.st_ino != state.inode or stat.st_size < state.position:
+                    # New (rotated) file or truncated file, start over
+                    state.inode = stat.st_ino
+                    state.position = 0
+                    state.partial = b""
+                f.seek(state.position)
+                data = f.read()
+        except OSError:
+            return []
+
+        state.position += len(data)
+        lines = (state.partial + data).split(b"\n")
+        state.partial = lines.pop()
+        return [line.decode("utf-8", "replace").rstrip("\r") for line in lines]
+
+    def close(self):
+        """Stop following all files"""
+        self._states.clear()
+        if self._poll_task is not None:
+            self._poll_task.cancel()
+            self._poll_task = None
+        if self._inotify is not None:
+            self._loop.remove_reader(self._inotify.fd)
+            self._inotify.close()
+            self._inotify = None
+        self._dirs.clear()
+        self._loop = None
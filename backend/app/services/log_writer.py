@@ -0,0 +1,205 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.repositories import LogRepository, get_log_repository
+
+
+class LogWriter:
+    """Batched log ingestion with group commit
+
+    Logs are queued in memory and written to the repository by a background
+    thread, in one ``append_many`` call per batch. The queue is flushed once it
+    holds ``batch_size`` logs or its oldest log has waited ``flush_interval``
+    seconds. Every log of a batch shares one :class:`Future`, resolved when the
+    batch is stored, so callers that need durability can wait for it while
+    everyone else only pays for an in-memory append.
+    """
+
+    def __init__(
+        self,
+        repository: LogRepository,
+        flush_interval: float = 0.05,
+        batch_size: int = 500,
+    ):
+        self.repository = repository
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+
+        self._cond = threading.Condition()
+        self._pending: List[Tuple[Dict, Optional[int]]] = []
+        self._pending_future: Future = Future()
+        self._oldest: Optional[float] = None  # Enqueue time of the oldest log
+        self._due = False  # Whether the queued logs must be written right away
+        self._flushing_future: Optional[Future] = None  # Batch being written
+        self._closed = False
+
+        # Metrics
+        self._batches = 0
+        self._records = 0
+        self._failed_batches = 0
+        self._last_batch_size = 0
+        self._max_queue_depth = 0
+        self._last_flush_latency = 0.0
+        self._max_flush_latency = 0.0
+        self._total_flush_latency = 0.0
+
+        self._thread = threading.Thread(
+            target=self._run, name="log-writer", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, log: Dict, keep_per_task: Optional[int] = None) -> Future:
+        """Queue a log, returns a future resolved once its batch is stored"""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("log writer is closed")
+            self._pending.append((log, keep_per_task))
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+                self._cond.notify()
+            elif len(self._pending) >= self.batch_size:
+                self._due = True
+                self._cond.notify()
+            self._max_queue_depth = max(self._max_queue_depth, len(self._pending))
+            return self._pending_future
+
+    def _request_flush(self) -> Optional[Future]:
+        """Make the queued logs due, returns the future of the batch to wait
+        for, None when everything is stored"""
+        with self._cond:
+            if self._pending:
+                self._due = True
+                self._cond.notify()
+                return self._pending_future
+            return self._flushing_future
+
+    def flush(self, timeout: Optional[float] = None):
+        """Write all queued logs now and wait until they are stored"""
+        while True:
+            future = self._request_flush()
+            if future is None:
+                return
+            future.result(timeout)
+
+    async def flush_async(self):
+        """Write all queued logs now and wait until they are stored, without
+        blocking the event loop"""
+        while True:
+            future = self._request_flush()
+            if future is None:
+                return
+            await asyncio.wrap_future(future)
+
+    def _take_batch(self) -> Tuple[List[Tuple[Dict, Optional[int]]], Future]:
+        """Wait for a due batch and take it from the queue"""
+        with self._cond:
+            while True:
+                if self._pending:
+                    if self._due or self._closed:
+                        break
+                    wait = self._oldest + self.flush_interval - time.monotonic()
+                    if wait <= 0:
+                        break
+                    self._cond.wait(wait)
+                elif self._closed:
+                    return [], None
+                else:
+                    self._cond.wait()
+
+            # Take the whole queue, every caller waits on the same future
+            batch, self._pending = self._pending, []
+            future = self._flushing_future = self._pending_future
+            self._pending_future = Future()
+            self._oldest = None
+            self._due = False
+            return batch, future
+
+    def _run(self):
+        while True:
+            batch, future = self._take_batch()
+            if future is None:
+                return
+
+            started = time.monotonic()
+            error = None
+            try:
+                # Group consecutive logs with the same retention limit
+                start = 0
+                for i in range(1, len(batch) + 1):
+                    if i == len(batch) or batch[i][1] != batch[start][1]:
+                        self.repository.append_many(
+                            [log for log, _ in batch[start:i]],
+                            keep_per_task=batch[start][1],
+                        )
+                        start = i
+            except Exception as e:
+                error = e
+                print(f"Error writing {len(batch)} logs: {e}")
+            latency = time.monotonic() - started
+
+            with self._cond:
+                self._flushing_future = None
+                self._batches += 1
+                self._last_batch_size = len(batch)
+                self._last_flush_latency = latency
+                self._max_flush_latency = max(self._max_flush_latency, latency)
+                self._total_flush_latency += latency
+                if error is None:
+                    self._records += len(batch)
+                else:
+                    self._failed_batches += 1
+
+            if error is None:
+                future.set_result(len(batch))
+            else:
+                future.set_exception(error)
+
+    def metrics(self) -> Dict:
+        """Queue depth, batch size and flush latency statistics"""
+        with self._cond:
+            return {
+                "queue_depth": len(self._pending),
+                "max_queue_depth": self._max_queue_depth,
+                "batches_flushed": self._batches,
+                "records_flushed": self._records,
+                "failed_batches": self._failed_batches,
+                "last_batch_size": self._last_batch_size,
+                "avg_batch_size": (
+                    self._records / self._batches if self._batches else 0.0
+                ),
+                "last_flush_latency_ms": self._last_flush_latency * 1000,
+                "max_flush_latency_ms": self._max_flush_latency * 1000,
+                "avg_flush_latency_ms": (
+                    self._total_flush_latency * 1000 / self._batches
+                    if self._batches
+                    else 0.0
+                ),
+            }
+
+    def close(self):
+        """Write the remaining logs and stop the writer thread"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+
+
+_lock = threading.Lock()
+_log_writer: Optional[LogWriter] = None
+
+
+def get_log_writer() -> LogWriter:
+    """Get the shared log writer of the configured log repository"""
+    global _log_writer
+    with _lock:
+        if _log_writer is None:
+            _log_writer = LogWriter(
+                get_log_repository(),
+                flush_interval=settings.log_flush_interval,
+                batch_size=settings.log_flush_batch_size,
+            )
+        return _log_writer
@@ -0,0 +1,317 @@
+import math
+import os
+import struct
+import sys
+import time
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+# Recorded series, counters are cumulative and roll up to their last value,
+# the other fields roll up to their mean
+FIELDS = (
+    "read_count",
+    "write_count",
+    "read_ops",
+    "write_ops",
+    "cpu_percent",
+    "rss_bytes",
+)
+COUNTERS = ("read_count", "write_count")
+
+# (step seconds, capacity): 1s for an hour, 1m for a day, 1h for 90 days
+RESOLUTIONS = ((1, 3600), (60, 1440), (3600, 2160))
+
+FILE_MAGIC = b"RSTS"
+FILE_VERSION = 1
+FILE_HEADER = struct.Struct("<4sBB")  # magic, version, section count
+SECTION_HEADER = struct.Struct("<III")  # step, capacity, field count
+
+NAN = float("nan")
+
+
+class _Series:
+    """Fixed-step time series in a ring of columns
+
+    The point of bucket ``b`` (``timestamp // step``) lives in slot
+    ``b % capacity`` of one ``array('d')`` per field, so writes are O(1) and
+    a time range is read by visiting its buckets instead of searching.
+    """
+
+    def __init__(self, step: int, capacity: int):
+        self.step = step
+        self.capacity = capacity
+        self.buckets = array("d", [NAN]) * capacity
+        self.columns = {field: array("d", [NAN]) * capacity for field in FIELDS}
+
+    def put(self, bucket: int, values: Dict[str, float]):
+        slot = bucket % self.capacity
+        self.buckets[slot] = bucket
+        for field in FIELDS:
+            self.columns[field][slot] = values.get(field, NAN)
+
+    def get(self, bucket: int) -> Optional[Dict[str, float]]:
+        slot = bucket % self.capacity
+        if self.buckets[slot] != bucket:
+            return None
+        return {field: self.columns[field][slot] for field in FIELDS}
+
+    def to_bytes(self) -> bytes:
+        parts = [SECTION_HEADER.pack(self.step, self.capacity, len(FIELDS))]
+        for column in [self.buckets] + [self.columns[f] for f in FIELDS]:
+            if sys.byteorder == "big":
+                column = array("d", column)
+                column.byteswap()
+            parts.append(column.tobytes())
+        return b"".join(parts)
+
+    def load_columns(self, columns: List[array]):
+        self.buckets = columns[0]
+        self.columns = dict(zip(FIELDS, columns[1:]))
+
+
+class _Rollup:
+    """Aggregate of the samples of the open bucket of one resolution"""
+
+    __slots__ = ("bucket", "sums", "counts", "last")
+
+    def __init__(self, bucket: int):
+        self.bucket = bucket
+        self.sums = dict.fromkeys(FIELDS, 0.0)
+        self.counts = dict.fromkeys(FIELDS, 0)
+        self.last: Dict[str, float] = {}
+
+    def add(self, values: Dict[str, float]):
+        for field, value in values.items():
+            if value is None or math.isnan(value):
+                continue
+            self.sums[field] += value
+            self.counts[field] += 1
+            self.last[field] = value
+
+    def value(self) -> Dict[str, float]:
+        values = {}
+        for field in FIELDS:
+            if not self.counts[field]:
+                values[field] = NAN
+            elif field in COUNTERS:
+                values[field] = self.last[field]
+            else:
+                values[field] = self.sums[field] / self.counts[field]
+        return values
+
+
+class _TaskMetrics:
+    """All resolutions of one task"""
+
+    def __init__(self):
+        self.series = [_Series(step, capacity) for step, capacity in RESOLUTIONS]
+        self.rollups: List[Optional[_Rollup]] = [None] * len(RESOLUTIONS)
+        self.dirty = False
+
+
+class MetricsStore:
+    """In-process time-series store of task throughput and resource usage
+
+    Samples are kept at 1s resolution and rolled up to 1m and 1h as buckets
+    close. The rollups are saved to one columnar file per task in
+    ``directory`` whenever a minute closes, and loaded back when a task is
+    first used, so history survives restarts.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._tasks: Dict[str, _TaskMetrics] = {}
+
+    def _path(self, task_id: str) -> str:
+        return os.path.join(self.directory, f"task_{task_id}.tsdb")
+
+    def _get(self, task_id: str) -> _TaskMetrics:
+        metrics = self._tasks.get(task_id)
+        if metrics is None:
+            metrics = self._tasks[task_id] = _TaskMetrics()
+            self._load(task_id, metrics)
+        return metrics
+
+    def record(
+        self,
+        task_id: str,
+        values: Dict[str, Optional[float]],
+        timestamp: Optional[float] = None,
+    ):
+        """Record a sample, missing fields are left empty"""
+        timestamp = time.time() if timestamp is None else timestamp
+        metrics = self._get(task_id)
+        values = {
+            field: NAN if values.get(field) is None else float(values[field])
+            for field in FIELDS
+        }
+        for index, series in enumerate(metrics.series):
+            bucket = int(timestamp // series.step)
+            rollup = metrics.rollups[index]
+            if rollup is not None and rollup.bucket != bucket:
+                series.put(rollup.bucket, rollup.value())
+                if index > 0:
+                    metrics.dirty = True
+                rollup = None
+            if rollup is None:
+                rollup = metrics.rollups[index] = _Rollup(bucket)
+            rollup.add(values)
+
+    def _points(
+        self, metrics: _TaskMetrics, index: int, first: int, last: int
+    ) -> List[Tuple[int, Dict[str, float]]]:
+        """Points of buckets ``first`` to ``last`` of one resolution"""
+        series = metrics.series[index]
+        rollup = metrics.rollups[index]
+        first = max(first, last - series.capacity + 1)
+        points = []
+        for bucket in range(first, last + 1):
+            if rollup is not None and rollup.bucket == bucket:
+                values = rollup.value()  # Still open
+            else:
+                values = series.get(bucket)
+            if values is not None:
+                points.append((bucket * series.step, values))
+        return points
+
+    def query(
+        self,
+        task_id: str,
+        start: float,
+        end: float,
+        step: Optional[int] = None,
+        max_points: int = 500,
+    ) -> Dict:
+        """Series of a task between ``start`` and ``end`` every ``step`` seconds
+
+        Reads the coarsest resolution that is no coarser than ``step`` and
+        still covers ``start``, and aggregates its points into ``step``
+        buckets. Without a step, one is picked to return at most
+        ``max_points`` points.
+        """
+        if end < start:
+            raise ValueError("'to' must not be before 'from'")
+        if step is None:
+            step = max(1, int(math.ceil((end - start) / max_points)))
+        now = time.time()
+        index = 0
+        for i, (resolution, capacity) in enumerate(RESOLUTIONS):
+            if resolution <= step:
+                index = i
+        # Fall back to coarser data when the finer ring no longer covers start
+        while (
+            index + 1 < len(RESOLUTIONS)
+            and now - RESOLUTIONS[index][0] * RESOLUTIONS[index][1] > start
+        ):
+            index += 1
+        resolution = RESOLUTIONS[index][0]
+        step = max(step, resolution)
+
+        metrics = self._get(task_id)
+        points = self._points(
+            metrics, index, int(start // resolution), int(end // resolution)
+        )
+
+        timestamps: List[int] = []
+        series: Dict[str, List[Optional[float]]] = {field: [] for field in FIELDS}
+        bucket: Optional[_Rollup] = None
+        for timestamp, values in points + [(None, None)]:
+            out_bucket = None if timestamp is None else int(timestamp // step)
+            if bucket is not None and bucket.bucket != out_bucket:
+                timestamps.append(bucket.bucket * step)
+                for field, value in bucket.value().items():
+                    series[field].append(None if math.isnan(value) else value)
+                bucket = None
+            if timestamp is None:
+                break
+            if bucket is None:
+                bucket = _Rollup(out_bucket)
+            bucket.add(values)
+
+        return {
+            "task_id": task_id,
+            "from": start,
+            "to": end,
+            "step": step,
+            "resolution": resolution,
+            "timestamps": timestamps,
+            "series": series,
+        }
+
+    def flush(self, task_id: Optional[str] = None):
+        """Save the rollups of changed tasks"""
+        task_ids = [task_id] if task_id is not None else list(self._tasks)
+        for current_id in task_ids:
+            metrics = self._tasks.get(current_id)
+            if metrics is not None and metrics.dirty:
+                metrics.dirty = False
+                self._save(current_id, metrics)
+
+    def dirty_snapshots(self) -> List[Tuple[str, bytes]]:
+        """Serialize the rollups of changed tasks for saving elsewhere"""
+        snapshots = []
+        for task_id, metrics in self._tasks.items():
+            if metrics.dirty:
+                metrics.dirty = False
+                snapshots.append((task_id, self._encode(metrics)))
+        return snapshots
+
+    @staticmethod
+    def _encode(metrics: _TaskMetrics) -> bytes:
+        rollups = metrics.series[1:]  # The 1s series is not persisted
+        header = FILE_HEADER.pack(FILE_MAGIC, FILE_VERSION, len(rollups))
+        return header + b"".join(series.to_bytes() for series in rollups)
+
+    def write(self, task_id: str, data: bytes):
+        """Atomically write an encoded rollup file"""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(task_id)
+        temp_path = path + ".tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+    def _save(self, task_id: str, metrics: _TaskMetrics):
+        self.write(task_id, self._encode(metrics))
+
+    def _load(self, task_id: str, metrics: _TaskMetrics):
+        try:
+            with open(self._path(task_id), "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return
+        try:
+            magic, version, sections = FILE_HEADER.unpack_from(data, 0)
+            if magic != FILE_MAGIC or version != FILE_VERSION:
+                raise ValueError("unknown file format")
+            pos = FILE_HEADER.size
+            by_step = {series.step: series for series in metrics.series}
+            for _ in range(sections):
+                step, capacity, fields = SECTION_HEADER.unpack_from(data, pos)
+                pos += SECTION_HEADER.size
+                size = capacity * 8
+                columns = []
+                for _ in range(fields + 1):
+                    column = array("d")
+                    column.frombytes(data[pos : pos + size])
+                    if sys.byteorder == "big":
+                        column.byteswap()
+                    columns.append(column)
+                    pos += size
+                series = by_step.get(step)
+                if (
+                    series is not None
+                    and series.capacity == capacity
+                    and fields == len(FIELDS)
+                ):
+                    series.load_columns(columns)
+        except (struct.error, ValueError) as e:
+            print(f"Ignoring unreadable metrics file of task {task_id}: {e}")
+
+    def remove(self, task_id: str):
+        """Forget the metrics of a task and delete its file"""
+        self._tasks.pop(task_id, None)
+        try:
+            os.remove(self._path(task_id))
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,127 @@
+import json
+import os
+import socket
+import threading
+from typing import Dict, Iterable, Optional
+
+from app.repositories.json_repository import _write_json_atomic
+
+
+class PortAllocator:
+    """Status port leases of the tasks
+
+    Each task holds at most one port from ``[start, end]``. Leases are kept in
+    a JSON file, so a task keeps its port and no other task gets it across
+    server restarts. Ports that cannot be bound, e.g. because another process
+    listens on them, are skipped. Allocation continues after the last
+    allocated port, so a port released by one task is not handed to the next
+    one right away.
+    """
+
+    def __init__(self, lease_file: str, start: int = 8080, end: int = 9079):
+        if start > end:
+            raise ValueError(f"Invalid status port range {start}-{end}")
+        self.lease_file = lease_file
+        self.start = start
+        self.end = end
+        self._lock = threading.Lock()
+        self._leases: Dict[str, int] = self._load()  # task_id -> port
+        self._next = start
+
+    def _load(self) -> Dict[str, int]:
+        try:
+            with open(self.lease_file, "r", encoding="utf-8") as f:
+                leases = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"Error loading status port leases: {e}")
+            return {}
+        return {str(task_id): int(port) for task_id, port in leases.items()}
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.lease_file) or ".", exist_ok=True)
+        _write_json_atomic(self.lease_file, self._leases)
+
+    @staticmethod
+    def is_free(port: int) -> bool:
+        """Whether a port can be bound on all interfaces"""
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            # Ports in TIME_WAIT are free for a new listener
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            try:
+                sock.bind(("", port))
+            except OSError:
+                return False
+        return True
+
+    def get(self, task_id: str) -> Optional[int]:
+        """Port leased by a task"""
+        return self._leases.get(task_id)
+
+    def leases(self) -> Dict[str, int]:
+        return dict(self._leases)
+
+    def acquire(self, task_id: str, requested: Optional[int] = None) -> int:
+        """Lease a free port to a task and return it
+
+        ``requested`` is a port fixed by the task configuration, which may lie
+        outside the range. Otherwise the task keeps its current lease while
+        that port is free. Raises ``ValueError`` when the requested port is
+        in use or no port of the range is free.
+        """
+        with self._lock:
+            current = self._leases.get(task_id)
+            if requested:
+                if not self._available(task_id, requested):
+                    raise ValueError(f"Status port {requested} is already in use")
+                port = requested
+            elif current is not None and self._available(task_id, current):
+                port = current
+            else:
+                port = self._scan(task_id)
+            if port != current:
+                self._leases[task_id] = port
+                self._save()
+            return port
+
+    def _available(self, task_id: str, port: int) -> bool:
+        for owner, leased in self._leases.items():
+            if leased == port and owner != task_id:
+                return False
+        return self.is_free(port)
+
+    def _scan(self, task_id: str) -> int:
+        leased = set(self._leases.values())
+        size = self.end - self.start + 1
+        for offset in range(size):
+            port = self.start + (self._next - self.start + offset) % size
+            if port not in leased and self.is_free(port):
+                self._next = port + 1 if port < self.end else self.start
+                return port
+        raise ValueError(
+            f"No free status port in {self.start}-{self.end} for task {task_id}"
+        )
+
+    def assign(self, task_id: str, port: int):
+        """Record the port of a task process that already listens on it"""
+        with self._lock:
+            if self._leases.get(task_id) != port:
+                self._leases[task_id] = port
+                self._save()
+
+    def release(self, task_id: str):
+        """Return the port of a task"""
+        with self._lock:
+            if self._leases.pop(task_id, None) is not None:
+                self._save()
+
+    def retain(self, task_ids: Iterable[str]):
+        """Drop the leases of tasks that no longer exist"""
+        keep = set(task_ids)
+        with self._lock:
+            stale = [task_id for task_id in self._leases if task_id not in keep]
+            for task_id in stale:
+                del self._leases[task_id]
+            if stale:
+                self._save()
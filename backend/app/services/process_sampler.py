@@ -0,0 +1,129 @@
+import asyncio
+import threading
+import time
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+import psutil
+
+from app.models.schemas import TaskStatus
+
+if TYPE_CHECKING:
+    from app.services.task_service import TaskService
+
+
+class ProcessSampler:
+    """Background sampler of the resource usage of task processes
+
+    Keeps one long-lived ``psutil.Process`` handle per running task, so
+    ``cpu_percent`` measures the time since the previous sample instead of
+    returning 0.0, and samples all tasks in one pass in a worker thread every
+    ``interval`` seconds. Readers get the cached samples without touching
+    psutil on the event loop.
+    """
+
+    def __init__(self, task_service: "TaskService", interval: float = 2.0):
+        self.task_service = task_service
+        self.interval = interval
+        # task_id -> latest sample, {"alive": False} once the process is gone
+        self.samples: Dict[str, Dict[str, Any]] = {}
+        self._handles: Dict[str, psutil.Process] = {}
+        self._lock = threading.Lock()  # Guards the handles across threads
+        self._runner: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Start sampling in the background"""
+        if self._runner is None or self._runner.done():
+            self._runner = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        if self._runner is not None:
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+            self._runner = None
+
+    async def _run(self):
+        while True:
+            started = time.monotonic()
+            try:
+                await self.sample_once()
+            except Exception as e:
+                print(f"Error sampling task processes: {e}")
+            await asyncio.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+
+    async def sample_once(self):
+        """Sample the processes of all running tasks"""
+        targets = {
+            task["id"]: task["process_id"]
+            for task in self.task_service.registry.all()
+            if task.get("status") == TaskStatus.RUNNING.value and task.get("process_id")
+        }
+        loop = asyncio.get_running_loop()
+        self.samples = await loop.run_in_executor(None, self._sample_all, targets)
+
+    async def sample_task(self, task_id: str, pid: int) -> Dict[str, Any]:
+        """Sample one task process now, for tasks not sampled yet"""
+        loop = asyncio.get_running_loop()
+        sample = await loop.run_in_executor(None, self._sample_one, task_id, pid)
+        self.samples[task_id] = sample
+        return sample
+
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Get the latest sample of a task process"""
+        return self.samples.get(task_id)
+
+    def _sample_all(self, targets: Dict[str, int]) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            for task_id in list(self._handles):
+                if task_id not in targets:
+                    del self._handles[task_id]
+        return {
+            task_id: self._sample_one(task_id, pid) for task_id, pid in targets.items()
+        }
+
+    def _sample_one(self, task_id: str, pid: int) -> Dict[str, Any]:
+        with self._lock:
+            handle = self._handles.get(task_id)
+            try:
+                if handle is None or handle.pid != pid:
+                    handle = self._handles[task_id] = psutil.Process(pid)
+                    first = True
+                else:
+                    first = False
+                with handle.oneshot():
+                    if handle.status() == psutil.STATUS_ZOMBIE:
+                        raise psutil.NoSuchProcess(pid)
+                    cpu_percent = handle.cpu_percent()
+                    memory_info = handle.memory_info()
+                    sample = {
+                        "pid": pid,
+                        "alive": True,
+                        # The first call only sets the baseline
+                        "cpu_percent": None if first else cpu_percent,
+                        "rss_bytes": memory_info.rss,
+                        "memory_info": memory_info._asdict(),
+                        "create_time": handle.create_time(),
+                        "num_threads": handle.num_threads(),
+                        "num_fds": self._optional(handle, "num_fds"),
+                        "io_counters": self._optional(handle, "io_counters"),
+                    }
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                self._handles.pop(task_id, None)
+                sample = {"pid": pid, "alive": False}
+        sample["sampled_at"] = datetime.now().isoformat()
+        return sample
+
+    @staticmethod
+    def _optional(handle: psutil.Process, name: str):
+        """Values some platforms or permissions do not provide"""
+        method = getattr(handle, name, None)
+        if method is None:
+            return None
+        try:
+            value = method()
+        except psutil.AccessDenied:
+            return None
+        return value._asdict() if hasattr(value, "_asdict") else value
@@ -0,0 +1,232 @@
+import bisect
+import time
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+
+from app.models.schemas import TaskStatus
+
+if TYPE_CHECKING:
+    from app.services.task_service import TaskService
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, bool):
+        value = int(value)
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class Exposition:
+    """Builder of a Prometheus text exposition format document"""
+
+    def __init__(self):
+        self._lines: List[str] = []
+
+    def family(self, name: str, metric_type: str, help_text: str):
+        self._lines.append(f"# HELP {name} {help_text}")
+        self._lines.append(f"# TYPE {name} {metric_type}")
+
+    def sample(self, name: str, value: Optional[float], **labels):
+        if value is None:
+            return
+        if labels:
+            label_text = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+            name = f"{name}{{{label_text}}}"
+        self._lines.append(f"{name} {_format_value(value)}")
+
+    def render(self) -> str:
+        return "\n".join(self._lines) + "\n"
+
+
+class LatencyHistogram:
+    """Request latency histogram labelled by method, route and status code"""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        # (method, route, status) -> [bucket counts..., sum, count]
+        self._series: Dict[Tuple[str, str, str], List[float]] = {}
+
+    def observe(self, method: str, route: str, status: int, seconds: float):
+        key = (method, route, str(status))
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = [0] * (len(self.buckets) + 3)
+        series[bisect.bisect_left(self.buckets, seconds)] += 1
+        series[-2] += seconds
+        series[-1] += 1
+
+    def export(self, exposition: Exposition, name: str, help_text: str):
+        exposition.family(name, "histogram", help_text)
+        for (method, route, status), series in sorted(self._series.items()):
+            labels = {"method": method, "route": route, "status": status}
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                exposition.sample(f"{name}_bucket", cumulative, le=le, **labels)
+            exposition.sample(f"{name}_sum", series[-2], **labels)
+            exposition.sample(f"{name}_count", series[-1], **labels)
+
+
+def _route_template(scope) -> str:
+    """Path template of the route that matched a request"""
+    # FastAPI versions that include routers without copying their routes
+    # keep the prefixed template in the effective route context
+    context = (scope.get("fastapi") or {}).get("effective_route_context")
+    route = context if context is not None else scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class PrometheusMiddleware:
+    """ASGI middleware timing HTTP requests until the response starts
+
+    Requests are labelled with their route template, so path parameters do
+    not create new series.
+    """
+
+    def __init__(self, app, histogram: LatencyHistogram):
+        self.app = app
+        self.histogram = histogram
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                self.histogram.observe(
+                    scope["method"],
+                    _route_template(scope),
+                    status[0],
+                    time.perf_counter() - started,
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+def render_metrics(task_service: "TaskService", histogram: LatencyHistogram) -> str:
+    """Render all metrics from the cached collector data
+
+    Costs O(tasks), nothing is fetched from the task processes.
+    """
+    out = Exposition()
+    tasks = task_service.registry.all()
+    collector = task_service.status_collector
+
+    out.family("redis_shake_task_status", "gauge", "Task status, 1 for the current")
+    for task in tasks:
+        for status in TaskStatus:
+            out.sample(
+                "redis_shake_task_status",
+                task.get("status") == status.value,
+                task_id=task["id"],
+                task_name=task.get("name", ""),
+                status=status.value,
+            )
+
+    counters = (
+        ("read_count", "redis_shake_task_read_entries_total", "counter"),
+        ("write_count", "redis_shake_task_write_entries_total", "counter"),
+        ("read_ops", "redis_shake_task_read_ops", "gauge"),
+        ("write_ops", "redis_shake_task_write_ops", "gauge"),
+    )
+    scraped = []
+    for task in tasks:
+        snapshot = collector.get(task["id"])
+        counts = ((snapshot or {}).get("data") or {}).get("total_entries_count")
+        if isinstance(counts, dict):
+            scraped.append((task, counts))
+    for field, name, metric_type in counters:
+        out.family(name, metric_type, f"redis-shake {field} of the task")
+        for task, counts in scraped:
+            out.sample(name, counts.get(field), task_id=task["id"])
+
+    usage = {
+        task_id: sample
+        for task_id, sample in task_service.process_sampler.samples.items()
+        if sample.get("alive")
+    }
+    process_metrics = (
+        ("cpu_percent", "redis_shake_process_cpu_percent", "Process CPU usage"),
+        ("rss_bytes", "redis_shake_process_resident_memory_bytes", "Process RSS"),
+        ("num_fds", "redis_shake_process_open_fds", "Process open file descriptors"),
+        ("num_threads", "redis_shake_process_threads", "Process threads"),
+    )
+    for field, name, help_text in process_metrics:
+        out.family(name, "gauge", help_text)
+        for task_id, values in sorted(usage.items()):
+            out.sample(name, values.get(field), task_id=task_id)
+    io_metrics = (
+        ("read_bytes", "redis_shake_process_io_read_bytes_total", "Bytes read"),
+        ("write_bytes", "redis_shake_process_io_write_bytes_total", "Bytes written"),
+    )
+    for field, name, help_text in io_metrics:
+        out.family(name, "counter", f"Process storage I/O: {help_text}")
+        for task_id, values in sorted(usage.items()):
+            out.sample(
+                name, (values.get("io_counters") or {}).get(field), task_id=task_id
+            )
+
+    out.family("redis_shake_task_log_lines_total", "counter", "Live log lines ingested")
+    for task_id, count in sorted(task_service.log_line_counts.items()):
+        out.sample("redis_shake_task_log_lines_total", count, task_id=task_id)
+
+    subscribers: Dict[str, List[Dict]] = {}
+    for stats in task_service.get_log_subscriber_stats():
+        subscribers.setdefault(stats["topic"], []).append(stats)
+    subscriber_metrics = (
+        ("redis_shake_log_subscribers", "gauge", "Live log subscribers", len),
+        (
+            "redis_shake_log_subscriber_lag",
+            "gauge",
+            "Lines waiting in live log subscriber queues",
+            lambda items: sum(item["lag"] for item in items),
+        ),
+        (
+            "redis_shake_log_subscriber_dropped",
+            "gauge",
+            "Lines dropped by connected live log subscribers",
+            lambda items: sum(item["dropped"] for item in items),
+        ),
+    )
+    for name, metric_type, help_text, aggregate in subscriber_metrics:
+        out.family(name, metric_type, help_text)
+        for task_id, items in sorted(subscribers.items()):
+            out.sample(name, aggregate(items), task_id=task_id)
+
+    writer = task_service.log_service.writer_metrics()
+    out.family(
+        "redis_shake_log_writer_queue_depth", "gauge", "Logs waiting to be written"
+    )
+    out.sample("redis_shake_log_writer_queue_depth", writer["queue_depth"])
+    out.family(
+        "redis_shake_log_writer_records_total", "counter", "Logs written to storage"
+    )
+    out.sample("redis_shake_log_writer_records_total", writer["records_flushed"])
+    out.family(
+        "redis_shake_log_writer_failed_batches_total",
+        "counter",
+        "Log batches that failed to be written",
+    )
+    out.sample("redis_shake_log_writer_failed_batches_total", writer["failed_batches"])
+
+    histogram.export(
+        out, "redis_shake_web_request_duration_seconds", "HTTP request latency"
+    )
+    return out.render()
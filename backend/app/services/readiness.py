@@ -0,0 +1,84 @@
+import asyncio
+import re
+from typing import Any, Dict, Optional
+
+
+class ReadinessProbe:
+    """Wait until a freshly spawned redis-shake process is up
+
+    The process counts as ready as soon as its status port accepts
+    connections or one of its log lines matches ``log_pattern``. Waiting
+    ends early when the process exits and gives up after ``deadline``
+    seconds.
+    """
+
+    def __init__(
+        self,
+        process: asyncio.subprocess.Process,
+        status_port: Optional[int],
+        log_pattern: Optional[str] = None,
+        deadline: float = 30.0,
+        poll_interval: float = 0.1,
+    ):
+        self.process = process
+        self.status_port = status_port
+        self.log_pattern = re.compile(log_pattern) if log_pattern else None
+        self.deadline = deadline
+        self.poll_interval = poll_interval
+        self._marker = asyncio.Event()
+
+    def on_log_line(self, message: str):
+        """Feed a log line of the process"""
+        if self.log_pattern is not None and self.log_pattern.search(message):
+            self._marker.set()
+
+    async def _port_open(self) -> bool:
+        try:
+            _, writer = await asyncio.wait_for(
+                asyncio.open_connection("localhost", self.status_port),
+                timeout=self.poll_interval,
+            )
+        except (OSError, asyncio.TimeoutError):
+            return False
+        writer.close()
+        return True
+
+    async def wait(self) -> Dict[str, Any]:
+        """Wait for readiness
+
+        Returns ``ready`` and the ``reason``: ``status_port`` or ``log`` when
+        ready, ``exited`` or ``timeout`` otherwise.
+        """
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        exited = asyncio.ensure_future(self.process.wait())
+        marker = asyncio.ensure_future(self._marker.wait())
+
+        def result(ready: bool, reason: str) -> Dict[str, Any]:
+            return {
+                "ready": ready,
+                "reason": reason,
+                "elapsed_ms": round((loop.time() - started) * 1000, 1),
+            }
+
+        try:
+            while True:
+                # The wait also covers the output pipes, which may outlive
+                # the process
+                if exited.done() or self.process.returncode is not None:
+                    return result(False, "exited")
+                if marker.done():
+                    return result(True, "log")
+                if self.status_port and await self._port_open():
+                    return result(True, "status_port")
+                remaining = started + self.deadline - loop.time()
+                if remaining <= 0:
+                    return result(False, "timeout")
+                await asyncio.wait(
+                    {exited, marker},
+                    timeout=min(self.poll_interval, remaining),
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+        finally:
+            exited.cancel()
+            marker.cancel()
@@ -0,0 +1,36 @@
+import json
+from typing import Any, Dict, Optional, Union
+
+from app.services.log_buffer import LogRecord
+
+# Most pending frames written to a client in one chunk
+MAX_FRAMES_PER_WRITE = 256
+
+
+def encode_event(data: Dict[str, Any], event_id: Optional[int] = None) -> bytes:
+    """Encode one Server-Sent Events frame"""
+    frame = f"data: {json.dumps(data)}\n"
+    if event_id is not None:
+        frame += f"id: {event_id}\n"
+    return (frame + "\n").encode("utf-8")
+
+
+def encode_log_event(task_id: str, log_line: Any, event_id: Optional[int] = None):
+    """Encode a log line as a ``log`` event of the task stream"""
+    return encode_event(
+        {
+            "type": log_line.get("type", "log"),
+            "timestamp": log_line["timestamp"],
+            "level": log_line["level"],
+            "message": log_line["message"],
+            "source": log_line.get("source", "redis-shake"),
+            "task_id": task_id,
+        },
+        event_id,
+    )
+
+
+def to_frame(task_id: str, item: Union[LogRecord, Dict[str, Any]]) -> bytes:
+    """Get the frame of a queued stream item, encoding it if needed"""
+    frame = getattr(item, "frame", None)
+    return frame if frame is not None else encode_log_event(task_id, item)
@@ -0,0 +1,238 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+
+import aiohttp
+
+from app.models.schemas import TaskStatus
+from app.services.task_analytics import ThroughputTracker
+
+if TYPE_CHECKING:
+    from app.services.task_service import TaskService
+
+# listener(task_id, snapshot) with each new snapshot of a task
+SnapshotListener = Callable[[str, Dict[str, Any]], None]
+
+
+class StatusCollector:
+    """Background scraper of the redis-shake status ports of running tasks
+
+    One pooled HTTP session polls every running task each ``interval``
+    seconds, at most ``max_concurrency`` at a time, and keeps the latest
+    snapshot per task in memory, so API requests are served from the cache
+    instead of opening a connection each. The key counters are written back
+    to the task records only every ``persist_interval`` seconds. Successive
+    snapshots feed a ``ThroughputTracker`` per task. Each successful scrape
+    is also recorded in the metrics store together with the latest CPU and
+    memory sample of the task process. Snapshot listeners are notified of
+    every new snapshot.
+    """
+
+    def __init__(
+        self,
+        task_service: "TaskService",
+        interval: float = 2.0,
+        timeout: float = 5.0,
+        persist_interval: float = 30.0,
+        max_concurrency: int = 20,
+        tracker_options: Optional[Dict[str, float]] = None,
+    ):
+        self.task_service = task_service
+        self.interval = interval
+        self.timeout = timeout
+        self.persist_interval = persist_interval
+        self.max_concurrency = max_concurrency
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        # task_id -> rates and health derived from successive snapshots
+        self._trackers: Dict[str, ThroughputTracker] = {}
+        self.tracker_options = tracker_options or {}
+        # task_id -> {"data", "error", "analytics", "collected_at",
+        # "collected_monotonic"}
+        self._snapshots: Dict[str, Dict[str, Any]] = {}
+        self._listeners: List[SnapshotListener] = []
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._runner: Optional[asyncio.Task] = None
+        self._last_persist = time.monotonic()
+
+    @property
+    def running(self) -> bool:
+        return self._runner is not None and not self._runner.done()
+
+    def add_listener(self, listener: SnapshotListener):
+        """Register a callback invoked with each new task snapshot"""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: SnapshotListener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _notify(self, task_id: str, snapshot: Dict[str, Any]):
+        for listener in list(self._listeners):
+            try:
+                listener(task_id, snapshot)
+            except Exception as e:
+                print(f"Error in task snapshot listener: {e}")
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.max_concurrency, keepalive_timeout=60
+                ),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    async def start(self):
+        """Start polling in the background"""
+        if not self.running:
+            self._runner = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        """Stop polling, persist the latest counters and close the session"""
+        if self._runner is not None:
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+            self._runner = None
+        self.persist_counters()
+        self.task_service.metrics_store.flush()
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _run(self):
+        while True:
+            started = time.monotonic()
+            try:
+                await self.collect_once()
+            except Exception as e:
+                print(f"Error collecting task status: {e}")
+            await asyncio.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+
+    def _running_tasks(self) -> List[Dict]:
+        return [
+            task
+            for task in self.task_service.registry.all()
+            if task.get("status") == TaskStatus.RUNNING.value
+            and task.get("status_port")
+        ]
+
+    async def collect_once(self):
+        """Scrape all running tasks once"""
+        tasks = self._running_tasks()
+        loop = asyncio.get_running_loop()
+        snapshots = await asyncio.gather(
+            *(self.collect_task(task["id"], task["status_port"]) for task in tasks)
+        )
+
+        metrics_store = self.task_service.metrics_store
+        process_sampler = self.task_service.process_sampler
+        for task, snapshot in zip(tasks, snapshots):
+            if snapshot["error"] is None:
+                metrics_store.record(
+                    task["id"],
+                    self._sample_values(snapshot, process_sampler.get(task["id"])),
+                )
+        for task_id, data in metrics_store.dirty_snapshots():
+            await loop.run_in_executor(None, metrics_store.write, task_id, data)
+
+        # Forget tasks that are no longer running
+        running = {task["id"] for task in tasks}
+        for task_id in list(self._snapshots):
+            if task_id not in running:
+                del self._snapshots[task_id]
+                self._trackers.pop(task_id, None)
+
+        if time.monotonic() - self._last_persist >= self.persist_interval:
+            self.persist_counters()
+
+    @staticmethod
+    def _sample_values(
+        snapshot: Dict[str, Any], usage: Optional[Dict[str, Any]]
+    ) -> Dict[str, Optional[float]]:
+        counts = (snapshot.get("data") or {}).get("total_entries_count")
+        values: Dict[str, Optional[float]] = {
+            "cpu_percent": (usage or {}).get("cpu_percent"),
+            "rss_bytes": (usage or {}).get("rss_bytes"),
+        }
+        if isinstance(counts, dict):
+            for field in ("read_count", "write_count", "read_ops", "write_ops"):
+                values[field] = counts.get(field)
+        return values
+
+    async def collect_task(self, task_id: str, status_port: int) -> Dict[str, Any]:
+        """Scrape one task and cache its snapshot"""
+        previous = self._snapshots.get(task_id, {})
+        snapshot = {
+            "data": previous.get("data"),
+            "error": None,
+            "collected_at": datetime.now().isoformat(),
+            "collected_monotonic": time.monotonic(),
+        }
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        try:
+            async with self._semaphore, self._get_session().get(
+                f"http://localhost:{status_port}"
+            ) as response:
+                if response.status == 200:
+                    snapshot["data"] = await response.json(content_type=None)
+                else:
+                    snapshot["error"] = f"error: {response.status}"
+        except asyncio.TimeoutError:
+            snapshot["error"] = "Timed out reading the task status"
+        except Exception as e:
+            snapshot["error"] = f"failed: {str(e)}"
+        if snapshot["error"] is None:
+            tracker = self._trackers.get(task_id)
+            if tracker is None:
+                tracker = self._trackers[task_id] = ThroughputTracker(
+                    **self.tracker_options
+                )
+            tracker.update(snapshot["data"], time.time())
+        tracker = self._trackers.get(task_id)
+        snapshot["analytics"] = tracker.summary if tracker else {}
+        self._snapshots[task_id] = snapshot
+        self._notify(task_id, snapshot)
+        return snapshot
+
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Get the latest cached snapshot of a task"""
+        return self._snapshots.get(task_id)
+
+    def is_fresh(self, snapshot: Dict[str, Any]) -> bool:
+        """Whether a snapshot is recent enough to serve"""
+        age = time.monotonic() - snapshot["collected_monotonic"]
+        return age <= max(2 * self.interval, 1.0)
+
+    async def get_fresh(self, task_id: str, status_port: int) -> Dict[str, Any]:
+        """Get the cached snapshot of a task, scraping it when not recent
+
+        Covers tasks the background loop has not reached yet, e.g. just
+        started ones.
+        """
+        snapshot = self._snapshots.get(task_id)
+        if snapshot is None or not self.is_fresh(snapshot):
+            snapshot = await self.collect_task(task_id, status_port)
+        return snapshot
+
+    def persist_counters(self):
+        """Write the latest key counters to the task records if they changed"""
+        self._last_persist = time.monotonic()
+        for task_id, snapshot in list(self._snapshots.items()):
+            counts = (snapshot.get("data") or {}).get("total_entries_count")
+            if not isinstance(counts, dict):
+                continue
+            task = self.task_service.registry.get(task_id)
+            if task is None:
+                continue
+            changes = {
+                "total_keys": counts.get("read_count", 0),
+                "processed_keys": counts.get("write_count", 0),
+            }
+            if any(task.get(key) != value for key, value in changes.items()):
+                self.task_service.registry.update(task_id, changes)
@@ -0,0 +1,138 @@
+import math
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+
+def _ewma(previous: Optional[float], value: float, dt: float, tau: float) -> float:
+    """Time-weighted exponential moving average, ``tau`` is the time constant"""
+    if previous is None:
+        return value
+    alpha = 1.0 - math.exp(-dt / tau)
+    return previous + alpha * (value - previous)
+
+
+def _readers(status: Dict[str, Any]) -> List[Dict[str, Any]]:
+    reader = status.get("reader")
+    if isinstance(reader, dict):
+        return [reader]
+    if isinstance(reader, list):
+        return [item for item in reader if isinstance(item, dict)]
+    return []
+
+
+def rdb_progress(status: Dict[str, Any]) -> Optional[Dict[str, int]]:
+    """Total and received RDB bytes over all readers, None without RDB info"""
+    size = received = 0
+    found = False
+    for reader in _readers(status):
+        if "rdb_file_size_bytes" in reader:
+            found = True
+            size += int(reader.get("rdb_file_size_bytes") or 0)
+            received += int(reader.get("rdb_received_bytes") or 0)
+    return {"size": size, "received": received} if found else None
+
+
+class ThroughputTracker:
+    """Rates, backlog, RDB ETA and health of one task
+
+    Updated from successive redis-shake status snapshots:
+
+    - read and write rates are smoothed with a time-weighted EWMA over
+      ``tau`` seconds, and a slower one over ``baseline_tau`` seconds is the
+      baseline throughput
+    - the task is stalled when there is a backlog (or an unfinished RDB
+      transfer) but nothing was written (received) for ``stall_after`` seconds
+    - throughput regressed when the smoothed write rate falls below
+      ``regression_ratio`` of the baseline
+    """
+
+    def __init__(
+        self,
+        tau: float = 10.0,
+        baseline_tau: float = 300.0,
+        stall_after: float = 30.0,
+        regression_ratio: float = 0.5,
+        min_baseline_rate: float = 1.0,
+    ):
+        self.tau = tau
+        self.baseline_tau = baseline_tau
+        self.stall_after = stall_after
+        self.regression_ratio = regression_ratio
+        self.min_baseline_rate = min_baseline_rate
+        self.read_rate: Optional[float] = None
+        self.write_rate: Optional[float] = None
+        self.baseline_write_rate: Optional[float] = None
+        self.rdb_rate: Optional[float] = None  # Received RDB bytes per second
+        self._last: Optional[Dict[str, float]] = None
+        self._last_progress: Optional[float] = None  # Time of the last progress
+        self._summary: Dict[str, Any] = {}
+
+    def update(self, status: Dict[str, Any], timestamp: float) -> Dict[str, Any]:
+        """Fold in a status snapshot taken at ``timestamp``, returns the summary"""
+        counts = status.get("total_entries_count")
+        if not isinstance(counts, dict):
+            return self._summary
+        rdb = rdb_progress(status)
+        current = {
+            "time": timestamp,
+            "read": float(counts.get("read_count") or 0),
+            "write": float(counts.get("write_count") or 0),
+            "rdb": float(rdb["received"]) if rdb else 0.0,
+        }
+
+        last = self._last
+        if last is None or current["read"] < last["read"]:
+            # First snapshot, or redis-shake restarted and its counters reset
+            self._last_progress = timestamp
+        else:
+            dt = timestamp - last["time"]
+            if dt <= 0:
+                return self._summary
+            read_rate = (current["read"] - last["read"]) / dt
+            write_rate = (current["write"] - last["write"]) / dt
+            rdb_rate = max(0.0, current["rdb"] - last["rdb"]) / dt
+            self.read_rate = _ewma(self.read_rate, read_rate, dt, self.tau)
+            self.write_rate = _ewma(self.write_rate, write_rate, dt, self.tau)
+            self.baseline_write_rate = _ewma(
+                self.baseline_write_rate, write_rate, dt, self.baseline_tau
+            )
+            self.rdb_rate = _ewma(self.rdb_rate, rdb_rate, dt, self.tau)
+            if current["write"] > last["write"] or current["rdb"] > last["rdb"]:
+                self._last_progress = timestamp
+        self._last = current
+
+        backlog = int(current["read"] - current["write"])
+        rdb_remaining = rdb["size"] - rdb["received"] if rdb else 0
+        waiting = backlog > 0 or rdb_remaining > 0
+        idle_for = timestamp - self._last_progress
+        stalled = waiting and idle_for >= self.stall_after
+        regression = (
+            self.write_rate is not None
+            and self.baseline_write_rate is not None
+            and self.baseline_write_rate >= self.min_baseline_rate
+            and self.write_rate < self.regression_ratio * self.baseline_write_rate
+        )
+
+        rdb_eta = None
+        if rdb and rdb_remaining > 0 and self.rdb_rate:
+            rdb_eta = rdb_remaining / self.rdb_rate
+
+        self._summary = {
+            "read_rate": self.read_rate,
+            "write_rate": self.write_rate,
+            "baseline_write_rate": self.baseline_write_rate,
+            "backlog": backlog,
+            "rdb_progress": (
+                rdb["received"] / rdb["size"] if rdb and rdb["size"] else None
+            ),
+            "rdb_eta_seconds": rdb_eta,
+            "stalled": stalled,
+            "stalled_for_seconds": idle_for if stalled else 0.0,
+            "regression": regression,
+            "updated_at": datetime.fromtimestamp(timestamp).isoformat(),
+        }
+        return self._summary
+
+    @property
+    def summary(self) -> Dict[str, Any]:
+        return self._summary
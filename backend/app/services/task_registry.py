@@ -0,0 +1,220 @@
+import threading
+from typing import Callable, Dict, List, Optional, Set
+
+from app.repositories.base import TaskRepository
+
+# listener(event, task, changes) with event "created", "updated" or "deleted"
+ChangeListener = Callable[[str, Dict, Dict], None]
+
+
+class TaskRegistry:
+    """In-memory task registry with debounced write-behind persistence
+
+    The registry is the authoritative copy of all task records. Reads are served
+    from memory only; mutations mark the touched records dirty and a background
+    timer hands them to the task repository in one batch. Change listeners are
+    notified of every mutation after it is applied.
+    """
+
+    def __init__(self, repository: TaskRepository, flush_delay: float = 0.5):
+        self.repository = repository
+        self.flush_delay = flush_delay
+        self._tasks: Dict[str, Dict] = {}  # task_id -> task dict, insertion ordered
+        self._name_index: Dict[str, str] = {}  # task name -> task_id
+        self._lock = threading.RLock()
+        self._flush_lock = threading.Lock()  # keeps snapshots written in order
+        self._changed: Set[str] = set()
+        self._deleted: Set[str] = set()
+        self._timer: Optional[threading.Timer] = None
+        self._listeners: List[ChangeListener] = []
+        self._load()
+
+    def _load(self):
+        """Load tasks from the repository into memory"""
+        tasks = self.repository.load_all()
+
+        with self._lock:
+            self._tasks.clear()
+            self._name_index.clear()
+            for task in tasks:
+                if not task.get("id"):
+                    continue
+                self._tasks[task["id"]] = task
+                if task.get("name"):
+                    self._name_index[task["name"]] = task["id"]
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def __contains__(self, task_id: str) -> bool:
+        return task_id in self._tasks
+
+    def get(self, task_id: str) -> Optional[Dict]:
+        """Get a copy of a task record by ID"""
+        with self._lock:
+            task = self._tasks.get(task_id)
+            return dict(task) if task is not None else None
+
+    def all(self) -> List[Dict]:
+        """Get copies of all task records in creation order"""
+        with self._lock:
+            return [dict(task) for task in self._tasks.values()]
+
+    def find_id_by_name(self, name: str) -> Optional[str]:
+        """Look up a task ID by task name"""
+        return self._name_index.get(name)
+
+    def add_listener(self, listener: ChangeListener):
+        """Register a callback invoked with each task change"""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: ChangeListener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _notify(self, event: str, task: Dict, changes: Dict):
+        for listener in list(self._listeners):
+            try:
+                listener(event, task, changes)
+            except Exception as e:
+                print(f"Error in task change listener: {e}")
+
+    def insert(self, task: Dict):
+        """Insert a new task record"""
+        with self._lock:
+            if task["id"] in self._tasks:
+                raise ValueError(f"Task '{task['id']}' already exists")
+            if task.get("name") in self._name_index:
+                raise ValueError(f"task '{task['name']}' ")
+            self._tasks[task["id"]] = dict(task)
+            if task.get("name"):
+                self._name_index[task["name"]] = task["id"]
+            self._deleted.discard(task["id"])
+            self._mark_dirty(task["id"])
+            created = dict(task)
+        self._notify("created", created, created)
+
+    def insert_many(self, tasks: List[Dict]):
+        """Insert new task records all at once, or none if any is invalid
+
+        The records are marked dirty together, so they are persisted by a
+        single flush.
+        """
+        with self._lock:
+            ids = set()
+            names = set()
+            for task in tasks:
+                if task["id"] in self._tasks or task["id"] in ids:
+                    raise ValueError(f"Task '{task['id']}' already exists")
+                name = task.get("name")
+                if name in self._name_index or (name and name in names):
+                    raise ValueError(f"task '{name}' ")
+                ids.add(task["id"])
+                if name:
+                    names.add(name)
+            created = []
+            for task in tasks:
+                self._tasks[task["id"]] = dict(task)
+                if task.get("name"):
+                    self._name_index[task["name"]] = task["id"]
+                self._deleted.discard(task["id"])
+                self._mark_dirty(task["id"])
+                created.append(dict(task))
+        for task in created:
+            self._notify("created", task, task)
+
+    def update(self, task_id: str, changes: Dict) -> Optional[Dict]:
+        """Apply field changes to a task record and return the updated copy"""
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if task is None:
+                return None
+
+            new_name = changes.get("name")
+            if new_name and new_name != task.get("name"):
+                owner = self._name_index.get(new_name)
+                if owner is not None and owner != task_id:
+                    raise ValueError(f"task '{new_name}' ")
+                self._name_index.pop(task.get("name"), None)
+                self._name_index[new_name] = task_id
+
+            task.update(changes)
+            self._mark_dirty(task_id)
+            updated = dict(task)
+        self._notify("updated", updated, changes)
+        return updated
+
+    def remove(self, task_id: str) -> Optional[Dict]:
+        """Remove a task record and return it"""
+        with self._lock:
+            task = self._tasks.pop(task_id, None)
+            if task is None:
+                return None
+            if self._name_index.get(task.get("name")) == task_id:
+                del self._name_index[task["name"]]
+            self._changed.discard(task_id)
+            self._deleted.add(task_id)
+            self._mark_dirty()
+        self._notify("deleted", task, {})
+        return task
+
+    def remove_many(self, task_ids: List[str]) -> List[Dict]:
+        """Remove task records at once and return the removed ones"""
+        with self._lock:
+            removed = []
+            for task_id in task_ids:
+                task = self._tasks.pop(task_id, None)
+                if task is None:
+                    continue
+                if self._name_index.get(task.get("name")) == task_id:
+                    del self._name_index[task["name"]]
+                self._changed.discard(task_id)
+                self._deleted.add(task_id)
+                removed.append(task)
+            if removed:
+                self._mark_dirty()
+        for task in removed:
+            self._notify("deleted", task, {})
+        return removed
+
+    def _mark_dirty(self, task_id: Optional[str] = None):
+        """Mark a task dirty and arm the flush timer if it is not pending
+
+        Changes made while a flush is pending are coalesced into it, so a burst
+        of updates costs one write and a change is on disk within
+        ``flush_delay`` seconds even under constant updates.
+        """
+        if task_id is not None:
+            self._changed.add(task_id)
+        if self._timer is not None:
+            return
+        self._timer = threading.Timer(self.flush_delay, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def flush(self):
+        """Persist pending changes through the repository"""
+        with self._flush_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if not self._changed and not self._deleted:
+                    return
+                snapshot = [dict(task) for task in self._tasks.values()]
+                changed, self._changed = self._changed, set()
+                deleted, self._deleted = self._deleted, set()
+
+            try:
+                self.repository.save_changes(snapshot, changed, deleted)
+            except Exception as e:
+                print(f"Error flushing task registry: {e}")
+                # Keep the failed changes pending and retry later
+                with self._lock:
+                    self._changed |= {i for i in changed if i in self._tasks}
+                    self._deleted |= {i for i in deleted if i not in self._tasks}
+                    self._mark_dirty()
+
+    def close(self):
+        """Flush pending changes, e.g. on application shutdown"""
+        self.flush()
@@ -0,0 +1,239 @@
+import asyncio
+import heapq
+import itertools
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple
+
+import psutil
+
+from app.models.schemas import TaskStatus
+
+if TYPE_CHECKING:
+    from app.services.task_service import TaskService
+
+
+class TaskScheduler:
+    """Admission control for task starts
+
+    At most ``max_running`` tasks run (or are starting) at once. Further
+    starts wait in a queue with the ``queued`` status and are admitted by
+    priority, higher first, and in request order within a priority, whenever
+    a running task stops, fails or is deleted.
+
+    With ``max_cpu_percent`` or ``min_available_memory_percent`` set, a task
+    is only admitted while the host has that much headroom; otherwise the
+    queue is retried every ``retry_interval`` seconds.
+    """
+
+    def __init__(
+        self,
+        task_service: "TaskService",
+        max_running: int = 5,
+        max_cpu_percent: Optional[float] = None,
+        min_available_memory_percent: Optional[float] = None,
+        retry_interval: float = 5.0,
+    ):
+        self.task_service = task_service
+        self.max_running = max_running
+        self.max_cpu_percent = max_cpu_percent
+        self.min_available_memory_percent = min_available_memory_percent
+        self.retry_interval = retry_interval
+        self._heap: List[Tuple[int, int, str]] = []  # (-priority, order, task_id)
+        self._order = itertools.count()
+        self._queued: Dict[str, int] = {}  # task_id -> order of its live entry
+        self._starting: Set[str] = set()
+        self._cancelled: Set[str] = set()  # Stopped while starting
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._retry: Optional[asyncio.TimerHandle] = None
+        task_service.registry.add_listener(self._on_task_change)
+        if max_cpu_percent is not None:
+            psutil.cpu_percent()  # Baseline of the non-blocking measurement
+
+    def _running_count(self) -> int:
+        running = sum(
+            1
+            for task in self.task_service.registry.all()
+            if task.get("status") == TaskStatus.RUNNING.value
+        )
+        return running + len(self._starting)
+
+    def _has_headroom(self) -> bool:
+        if self.max_cpu_percent is not None:
+            if psutil.cpu_percent() > self.max_cpu_percent:
+                return False
+        if self.min_available_memory_percent is not None:
+            memory = psutil.virtual_memory()
+            available = memory.available * 100.0 / memory.total
+            if available < self.min_available_memory_percent:
+                return False
+        return True
+
+    def _can_admit(self) -> bool:
+        return self._running_count() < self.max_running and self._has_headroom()
+
+    async def request_start(self, task_id: str, priority: int = 0) -> Dict[str, Any]:
+        """Start a task now if a slot is free, otherwise queue it"""
+        self._loop = asyncio.get_running_loop()
+        if task_id in self._starting:
+            raise ValueError("Task is already starting")
+        if task_id in self._queued:
+            raise ValueError("Task is already queued")
+        if not self._queued and self._can_admit():
+            self._starting.add(task_id)
+            return await self._admit(task_id)
+
+        self._push(task_id, priority)
+        self.task_service.registry.update(
+            task_id,
+            {
+                "status": TaskStatus.QUEUED.value,
+                "queued_at": datetime.now().isoformat(),
+            },
+        )
+        self._schedule_retry()
+        position = self.position(task_id)
+        return {
+            "success": True,
+            "queued": True,
+            "message": f"Task queued at position {position}",
+            "task_id": task_id,
+            "queue_position": position,
+        }
+
+    def _push(self, task_id: str, priority: int):
+        order = next(self._order)
+        heapq.heappush(self._heap, (-priority, order, task_id))
+        self._queued[task_id] = order
+
+    def _is_live(self, entry: Tuple[int, int, str]) -> bool:
+        return self._queued.get(entry[2]) == entry[1]
+
+    def cancel(self, task_id: str) -> bool:
+        """Remove a task from the queue, returns whether it was queued"""
+        # Entries of removed tasks are skipped when they reach the head
+        return self._queued.pop(task_id, None) is not None
+
+    def cancel_start(self, task_id: str) -> bool:
+        """Mark a starting task to be stopped once its process is spawned,
+        returns whether it was starting"""
+        if task_id not in self._starting:
+            return False
+        self._cancelled.add(task_id)
+        return True
+
+    def start_cancelled(self, task_id: str) -> bool:
+        """Whether the start of a task was cancelled while it launched"""
+        return task_id in self._cancelled
+
+    def reprioritize(self, task_id: str, priority: int):
+        """Move a queued task to the end of its new priority"""
+        if self.cancel(task_id):
+            self._push(task_id, priority)
+
+    def restore(self):
+        """Queue the tasks that were queued when the service last stopped"""
+        tasks = [
+            task
+            for task in self.task_service.registry.all()
+            if task.get("status") == TaskStatus.QUEUED.value
+        ]
+        tasks.sort(key=lambda task: task.get("queued_at") or "")
+        for task in tasks:
+            if task["id"] not in self._queued:
+                self._push(task["id"], task.get("priority") or 0)
+
+    def _ordered(self) -> List[Tuple[int, int, str]]:
+        return sorted(entry for entry in self._heap if self._is_live(entry))
+
+    def position(self, task_id: str) -> Optional[int]:
+        """1-based queue position of a task, None if it is not queued"""
+        if task_id not in self._queued:
+            return None
+        for position, entry in enumerate(self._ordered(), 1):
+            if entry[2] == task_id:
+                return position
+        return None
+
+    def queue(self) -> List[Dict[str, Any]]:
+        """Queued tasks in admission order"""
+        return [
+            {"task_id": task_id, "priority": -priority, "queue_position": position}
+            for position, (priority, _, task_id) in enumerate(self._ordered(), 1)
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_running": self.max_running,
+            "running": self._running_count() - len(self._starting),
+            "starting": len(self._starting),
+            "queued": len(self._queued),
+        }
+
+    async def _admit(self, task_id: str) -> Dict[str, Any]:
+        """Launch a task counted in ``_starting``"""
+        try:
+            return await self.task_service._launch_task(task_id)
+        finally:
+            self._starting.discard(task_id)
+            self._cancelled.discard(task_id)
+            self.kick()
+
+    def _pop(self) -> Optional[str]:
+        while self._heap:
+            entry = heapq.heappop(self._heap)
+            if self._is_live(entry):
+                del self._queued[entry[2]]
+                return entry[2]
+        return None
+
+    def kick(self):
+        """Admit queued tasks while slots are free, must run on the loop"""
+        while self._queued and self._can_admit():
+            task_id = self._pop()
+            task = self.task_service.registry.get(task_id)
+            if task is None or task.get("status") != TaskStatus.QUEUED.value:
+                continue
+            self._starting.add(task_id)  # Takes the slot right away
+            asyncio.ensure_future(self._admit_queued(task_id))
+        self._schedule_retry()
+
+    async def _admit_queued(self, task_id: str):
+        try:
+            await self._admit(task_id)
+        except Exception as e:
+            print(f"Error starting queued task {task_id}: {e}")
+
+    def _schedule_retry(self):
+        """Retry later when tasks wait for host headroom"""
+        if self._retry is not None or not self._queued or self._loop is None:
+            return
+        if self._running_count() >= self.max_running:
+            return  # Admitted when a slot frees up
+
+        def retry():
+            self._retry = None
+            self.kick()
+
+        self._retry = self._loop.call_later(self.retry_interval, retry)
+
+    def _on_task_change(self, event: str, task: Dict, changes: Dict):
+        """Registry listener, frees slots when tasks leave the running state"""
+        if event == "deleted":
+            self.cancel(task["id"])
+        elif changes.get("status") in (None, TaskStatus.RUNNING.value):
+            return
+        elif changes["status"] != TaskStatus.QUEUED.value:
+            self.cancel(task["id"])
+        if self._loop is not None and self._loop.is_running():
+            self._loop.call_soon_threadsafe(self.kick)
+
+    async def start(self):
+        """Bind to the running loop and admit tasks queued before a restart"""
+        self._loop = asyncio.get_running_loop()
+        self.restore()
+        self.kick()
+
+    def close(self):
+        if self._retry is not None:
+            self._retry.cancel()
+            self._retry = None
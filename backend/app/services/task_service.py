@@ -1,13 +1,11 @@
 import asyncio
 import json
 import os
-import weakref
+import time
 import uuid
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 
-import aiofiles
-import aiohttp
 import psutil
 
 from app.core.config import settings
@@ -16,10 +14,23 @@ from app.models.schemas import (
     SyncTask,
     SyncTaskCreate,
     SyncTaskUpdate,
+    TaskLog,
     TaskLogCreate,
     TaskStatus,
 )
+from app.repositories import get_task_repository
+from app.services.log_broker import LogBroker, Subscription, skipped_marker
+from app.services.log_buffer import LogRecord, LogRingBuffer
 from app.services.log_service import LogService
+from app.services.log_tailer import LogTailer
+from app.services.metrics_store import MetricsStore
+from app.services.port_allocator import PortAllocator
+from app.services.process_sampler import ProcessSampler
+from app.services.readiness import ReadinessProbe
+from app.services.sse import encode_log_event
+from app.services.status_collector import StatusCollector
+from app.services.task_registry import TaskRegistry
+from app.services.task_scheduler import TaskScheduler
 
 
 class TaskService:
@@ -38,225 +49,425 @@ class TaskService:
             return
         TaskService._initialized = True
 
-        # Task file storage path
-        self.tasks_file = os.path.join(
-            settings.redis_shake_config_dir, "sync_tasks.json"
+        # Authoritative in-memory task registry, persisted by write-behind
+        self.registry = TaskRegistry(
+            get_task_repository(), flush_delay=settings.task_flush_delay
         )
-        self._ensure_tasks_file()
         # Service instances
         self.log_service = LogService()
+        # One watcher following the log files of all running tasks
+        self.log_tailer = LogTailer(
+            poll_interval=settings.log_tail_poll_interval,
+            use_inotify=settings.log_tail_use_inotify,
+        )
         # Process output streams management
-        self.process_streams = {}  # task_id -> {'process': process, 'log_buffer': []}
-        self.stream_subscribers = {}  # task_id -> set of weak references to queues
+        self.process_streams = {}  # task_id -> {'process': process}
+        # Status ports leased to the tasks
+        self.port_allocator = PortAllocator(
+            settings.status_port_lease_file,
+            start=settings.status_port_range_start,
+            end=settings.status_port_range_end,
+        )
+        self.port_allocator.retain(task["id"] for task in self.registry.all())
+        # Last checkpoint of the log read positions per task
+        self._position_checkpoints: Dict[str, float] = {}
+        # Readiness probes of the processes being started
+        self._readiness_probes: Dict[str, ReadinessProbe] = {}
+        self.log_buffers: Dict[str, LogRingBuffer] = {}  # Live logs per task
+        # Highest log sequence number stored as reserved per task
+        self._reserved_log_seqs: Dict[str, int] = {}
+        # Live log lines distributed per task since this server started
+        self.log_line_counts: Dict[str, int] = {}
+        # Live log fan-out with bounded subscriber queues
+        self.log_broker = LogBroker(
+            maxsize=settings.log_subscriber_queue_size,
+            policy=settings.log_subscriber_overflow,
+        )
+        # Throughput and resource history of the tasks
+        self.metrics_store = MetricsStore(settings.metrics_dir)
+        # Admission control of task starts
+        self.scheduler = TaskScheduler(
+            self,
+            max_running=settings.max_concurrent_tasks,
+            max_cpu_percent=settings.scheduler_max_cpu_percent,
+            min_available_memory_percent=(
+                settings.scheduler_min_available_memory_percent
+            ),
+            retry_interval=settings.scheduler_retry_interval,
+        )
+        # Progress of the startup recovery of interrupted tasks
+        self.recovery_progress: Dict[str, Any] = {"state": "idle", "tasks": {}}
+        # Cached resource usage of the task processes
+        self.process_sampler = ProcessSampler(
+            self, interval=settings.process_sample_interval
+        )
+        # Shared scraper of the status ports of running tasks
+        self.status_collector = StatusCollector(
+            self,
+            interval=settings.status_poll_interval,
+            timeout=settings.status_poll_timeout,
+            persist_interval=settings.status_persist_interval,
+            max_concurrency=settings.status_poll_concurrency,
+            tracker_options={
+                "tau": settings.throughput_ewma_window,
+                "stall_after": settings.throughput_stall_seconds,
+                "regression_ratio": settings.throughput_regression_ratio,
+            },
+        )
+
+    def _follow_task_files(
+        self, task_id: str, positions: Optional[Dict[str, List[int]]] = None
+    ) -> Dict[str, str]:
+        """Follow the redis-shake log file and the output files of a task
+
+        Each file is read from its stored position in ``positions`` if given,
+        otherwise from its beginning, e.g. the output files truncated for a
+        new process. Returns the followed paths by name.
+        """
+        positions = positions or {}
+        paths = {
+            "log": self._get_task_log_file_path(task_id),
+            **self._get_task_output_paths(task_id),
+        }
+        for name, path in paths.items():
+            self.log_tailer.watch(
+                path, self._task_line_handler(task_id, name), positions.get(name)
+            )
+        return paths
 
-    def _ensure_tasks_file(self):
-        """Ensure task file exists"""
-        if not os.path.exists(self.tasks_file):
-            with open(self.tasks_file, "w", encoding="utf-8") as f:
-                json.dump([], f)
+    def _task_line_handler(self, task_id: str, name: str):
+        async def handle(line: str):
+            if name == "log":
+                await self._handle_log_file_line(task_id, line)
+            else:
+                await self._handle_output_line(task_id, line, name)
+            self._checkpoint_log_positions(task_id)
 
-    async def _read_process_output(
-        self, task_id: str, process: asyncio.subprocess.Process
+        return handle
+
+    async def _follow_process(
+        self,
+        task_id: str,
+        pid: int,
+        wait_exit: Callable[[], Awaitable[Optional[int]]],
+        positions: Optional[Dict[str, List[int]]] = None,
     ):
-        """Read process output and distribute to subscribers"""
-        try:
-            # Start log file monitoring
-            log_file_task = asyncio.create_task(self._monitor_log_file(task_id))
-
-            # Read stdout
-            async def read_stdout():
-                while True:
-                    try:
-                        line = await process.stdout.readline()
-                        if not line:
-                            break
-                        log_line = {
-                            "timestamp": datetime.now().isoformat(),
-                            "level": "INFO",
-                            "message": line.decode("utf-8").strip(),
-                            "source": "stdout",
-                        }
-                        await self._distribute_log(task_id, log_line)
-                    except Exception as e:
-                        print(f"Error reading stdout for task {task_id}: {e}")
-                        break
-
-            # Read stderr
-            async def read_stderr():
-                while True:
-                    try:
-                        line = await process.stderr.readline()
-                        if not line:
-                            break
-                        log_line = {
-                            "timestamp": datetime.now().isoformat(),
-                            "level": "ERROR",
-                            "message": line.decode("utf-8").strip(),
-                            "source": "stderr",
-                        }
-                        await self._distribute_log(task_id, log_line)
-                    except Exception as e:
-                        print(f"Error reading stderr for task {task_id}: {e}")
-                        break
-
-            # Start both readers concurrently
-            await asyncio.gather(read_stdout(), read_stderr(), return_exceptions=True)
+        """Distribute the logs and output of a task process until it exits
 
+        Cancelling stops following the process without recording an exit,
+        e.g. on shutdown, when the process keeps running to be adopted.
+        """
+        paths = self._follow_task_files(task_id, positions)
+        returncode = None
+        cancelled = False
+        try:
+            returncode = await wait_exit()
+            # Pass on what the process wrote right before exiting
+            for path in paths.values():
+                await self.log_tailer.flush(path)
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
         except Exception as e:
             print(f"Error in process output reader for task {task_id}: {e}")
         finally:
-            # Cancel log file monitoring
-            if "log_file_task" in locals():
-                log_file_task.cancel()
+            self._checkpoint_log_positions(task_id, force=True)
+            for path in paths.values():
+                self.log_tailer.unwatch(path)
+            self._position_checkpoints.pop(task_id, None)
 
             # Clean up when process ends
-            if task_id in self.process_streams:
+            stream = self.process_streams.get(task_id)
+            if stream is not None and stream["pid"] == pid:
                 del self.process_streams[task_id]
-            if task_id in self.stream_subscribers:
-                del self.stream_subscribers[task_id]
+                if not stream.get("stopping") and not cancelled:
+                    await self._handle_process_exit(task_id, pid, returncode)
+
+    async def _handle_process_exit(
+        self, task_id: str, pid: int, returncode: Optional[int]
+    ):
+        """Record a running task whose process exited without being stopped,
+        which frees its slot for queued tasks
 
-    async def _monitor_log_file(self, task_id: str):
-        """Monitor task-specific log file for changes"""
-        log_file_path = self._get_task_log_file_path(task_id)
-        last_position = 0
+        ``returncode`` is None when the exit status could not be read, e.g.
+        for processes adopted after a restart. The task is then recorded as
+        stopped with a warning instead of failed, as the outcome is unknown.
+        """
+        task = self.registry.get(task_id)
+        if (
+            task is None
+            or task.get("status") != TaskStatus.RUNNING.value
+            or task.get("process_id") != pid
+        ):
+            return  # Still starting, or already stopped
+
+        self.port_allocator.release(task_id)
+        if returncode == 0:
+            status, level = TaskStatus.COMPLETED, LogLevel.INFO
+            message = "redis-shake exited"
+        elif returncode is None:
+            status, level = TaskStatus.STOPPED, LogLevel.WARNING
+            message = "redis-shake exited, its exit status is unknown"
+        else:
+            status, level = TaskStatus.FAILED, LogLevel.ERROR
+            message = f"redis-shake exited with code {returncode}"
+        await self.update_task(
+            task_id,
+            SyncTaskUpdate(
+                status=status,
+                completed_at=datetime.now().isoformat(),
+                error_message=message if returncode != 0 else None,
+            ),
+        )
+        self.log_service.add_log(
+            TaskLogCreate(task_id=task_id, level=level, message=message),
+            task_name=task["name"],
+        )
 
+    def _checkpoint_log_positions(self, task_id: str, force: bool = False):
+        """Store how far the files of a task were read, at most every
+        ``log_position_checkpoint_interval`` seconds unless forced"""
+        now = time.monotonic()
+        last = self._position_checkpoints.get(task_id)
+        if not force and last is not None:
+            if now - last < settings.log_position_checkpoint_interval:
+                return
+        self._position_checkpoints[task_id] = now
+        paths = {
+            "log": self._get_task_log_file_path(task_id),
+            **self._get_task_output_paths(task_id),
+        }
+        positions = {}
+        for name, path in paths.items():
+            position = self.log_tailer.position(path)
+            if position is not None:
+                positions[name] = list(position)
+        task = self.registry.get(task_id)
+        if task is not None and positions and task.get("log_positions") != positions:
+            self.registry.update(task_id, {"log_positions": positions})
+
+    async def detach_processes(self):
+        """Stop following all task processes, which keep running and are
+        adopted with their logs on the next start"""
+        readers = []
+        for stream in self.process_streams.values():
+            stream["stopping"] = True
+            reader = stream.get("reader")
+            if reader is not None and not reader.done():
+                reader.cancel()
+                readers.append(reader)
+        await asyncio.gather(*readers, return_exceptions=True)
+
+    def checkpoint_log_positions(self):
+        """Store the read positions of all followed tasks, e.g. on shutdown"""
+        for task_id in list(self.process_streams):
+            self._checkpoint_log_positions(task_id, force=True)
+
+    async def _handle_log_file_line(self, task_id: str, line: str):
+        """Parse a line of the task-specific log file and distribute it"""
+        line = line.strip()
+        if not line:
+            return
         try:
-            while True:
-                try:
-                    if os.path.exists(log_file_path):
-                        async with aiofiles.open(
-                            log_file_path, "r", encoding="utf-8"
-                        ) as f:
-                            # Seek to last known position
-                            await f.seek(last_position)
-
-                            # Read new lines
-                            while True:
-                                line = await f.readline()
-                                if not line:
-                                    break
-
-                                # Parse JSON log line
-                                try:
-                                    log_data = json.loads(line.strip())
-                                    log_line = {
-                                        "timestamp": log_data.get(
-                                            "time", datetime.now().isoformat()
-                                        ),
-                                        "level": log_data.get("level", "INFO").upper(),
-                                        "message": log_data.get("message", ""),
-                                        "source": "redis-shake",
-                                    }
-                                    await self._distribute_log(task_id, log_line)
-                                except json.JSONDecodeError:
-                                    # If not JSON, treat as plain text
-                                    log_line = {
-                                        "timestamp": datetime.now().isoformat(),
-                                        "level": "INFO",
-                                        "message": line.strip(),
-                                        "source": "redis-shake",
-                                    }
-                                    await self._distribute_log(task_id, log_line)
-
-                            # Update last position
-                            last_position = await f.tell()
-
-                    # Wait before checking again
-                    await asyncio.sleep(0.5)
-
-                except Exception as e:
-                    print(f"Error monitoring log file for task {task_id}: {e}")
-                    await asyncio.sleep(1)
+            # Parse JSON log line
+            log_data = json.loads(line)
+            log_line = {
+                "timestamp": log_data.get("time", datetime.now().isoformat()),
+                "level": log_data.get("level", "INFO").upper(),
+                "message": log_data.get("message", ""),
+                "source": "redis-shake",
+            }
+        except json.JSONDecodeError:
+            # If not JSON, treat as plain text
+            log_line = {
+                "timestamp": datetime.now().isoformat(),
+                "level": "INFO",
+                "message": line,
+                "source": "redis-shake",
+            }
+        await self._distribute_log(task_id, log_line)
 
-        except asyncio.CancelledError:
-            print(f"Log file monitoring cancelled for task {task_id}")
+    async def _handle_output_line(self, task_id: str, line: str, source: str):
+        """Distribute a line the redis-shake process wrote to stdout or stderr"""
+        line = line.strip()
+        if not line:
+            return
+        log_line = {
+            "timestamp": datetime.now().isoformat(),
+            "level": "ERROR" if source == "stderr" else "INFO",
+            "message": line,
+            "source": source,
+        }
+        await self._distribute_log(task_id, log_line)
 
     async def _distribute_log(self, task_id: str, log_line: dict):
         """Distribute log line to all subscribers"""
-        # Store in buffer
-        if task_id in self.process_streams:
-            buffer = self.process_streams[task_id].get("log_buffer", [])
-            buffer.append(log_line)
-            # Keep only last 1000 lines
-            if len(buffer) > 1000:
-                buffer.pop(0)
-            self.process_streams[task_id]["log_buffer"] = buffer
-
-        # Send to subscribers
-        if task_id in self.stream_subscribers:
-            dead_refs = set()
-            for queue_ref in self.stream_subscribers[task_id].copy():
-                queue = queue_ref()
-                if queue is None:
-                    dead_refs.add(queue_ref)
-                else:
-                    try:
-                        await queue.put(log_line)
-                    except Exception:
-                        dead_refs.add(queue_ref)
-
-            # Clean up dead references
-            self.stream_subscribers[task_id] -= dead_refs
-
-    def subscribe_to_logs(self, task_id: str, queue: asyncio.Queue):
-        """Subscribe to task logs"""
-        if task_id not in self.stream_subscribers:
-            self.stream_subscribers[task_id] = set()
-
-        # Use weak reference to avoid memory leaks
-        queue_ref = weakref.ref(queue)
-        self.stream_subscribers[task_id].add(queue_ref)
-
-        # Send existing buffer to new subscriber
-        if task_id in self.process_streams:
-            buffer = self.process_streams[task_id].get("log_buffer", [])
-            asyncio.create_task(self._send_buffer_to_queue(queue, buffer))
-
-    async def _send_buffer_to_queue(self, queue: asyncio.Queue, buffer: list):
-        """Send buffered logs to a queue"""
-        try:
-            for log_line in buffer:
-                await queue.put(log_line)
-        except Exception as e:
-            print(f"Error sending buffer to queue: {e}")
+        # Lines of a starting process may mark it as ready
+        probe = self._readiness_probes.get(task_id)
+        if probe is not None:
+            probe.on_log_line(log_line["message"])
+
+        # Number the line and store it in the ring buffer, which drops the
+        # oldest line when full
+        record = self._get_log_buffer(task_id).append(
+            log_line["timestamp"],
+            log_line["level"],
+            log_line["message"],
+            log_line.get("source"),
+        )
+        if record.seq > self._reserved_log_seqs.get(task_id, 0):
+            self._reserve_log_seqs(task_id, record.seq)
+        self.log_line_counts[task_id] = self.log_line_counts.get(task_id, 0) + 1
+
+        # Persist process output, which is not written to any log file
+        if log_line["source"] in ("stdout", "stderr") and log_line["message"]:
+            task = self.registry.get(task_id)
+            self.log_service.add_log(
+                TaskLogCreate(
+                    task_id=task_id,
+                    level=log_line["level"],
+                    message=log_line["message"],
+                    source=log_line["source"],
+                ),
+                task_name=task["name"] if task else None,
+                timestamp=log_line["timestamp"],
+                seq=record.seq,
+            )
+
+        # Encode the SSE frame once, all subscribers share it
+        record.frame = encode_log_event(task_id, log_line, record.seq)
+
+        # Send to subscribers without waiting for them
+        self.log_broker.publish(task_id, record)
+
+    def _get_log_buffer(self, task_id: str) -> LogRingBuffer:
+        """Get the live log buffer of a task, created with its configured capacity
+
+        Sequence numbers continue after the reserved ones stored with the
+        task, so they keep increasing across process and server restarts,
+        crashes included. Numbers reserved but not used before a restart are
+        skipped.
+        """
+        buffer = self.log_buffers.get(task_id)
+        if buffer is None:
+            task = self.registry.get(task_id) or {}
+            capacity = task.get("log_buffer_capacity") or settings.log_buffer_capacity
+            last_seq = task.get("log_seq") or 0
+            self._reserved_log_seqs[task_id] = last_seq
+            buffer = self.log_buffers[task_id] = LogRingBuffer(
+                capacity, last_seq=last_seq
+            )
+        return buffer
 
-    def unsubscribe_from_logs(self, task_id: str, queue: asyncio.Queue):
+    def _reserve_log_seqs(self, task_id: str, seq: int):
+        """Store a block of sequence numbers starting at ``seq`` as reserved
+        before ``seq`` is handed out
+
+        The registry is written right away, one write per
+        ``log_seq_reserve_block`` lines.
+        """
+        reserved = seq + settings.log_seq_reserve_block - 1
+        if self.registry.update(task_id, {"log_seq": reserved}) is not None:
+            self.registry.flush()
+        self._reserved_log_seqs[task_id] = reserved
+
+    def _replay_items(
+        self,
+        task_id: str,
+        since_seq: Optional[int],
+        persisted: Optional[List[TaskLog]] = None,
+    ) -> List[Any]:
+        """Get the lines a subscriber has not seen yet
+
+        Without ``since_seq``, or with one newer than any line, this is the
+        whole live buffer. Lines older than the buffer are taken from
+        ``persisted``, the stored lines after ``since_seq``; lines that were
+        not persisted are reported by a skipped marker.
+        """
+        buffer = self.log_buffers.get(task_id)
+        if buffer is not None and since_seq is not None and since_seq > buffer.last_seq:
+            # Id from before a restart that reused sequence numbers
+            since_seq = None
+        if since_seq is None:
+            return list(buffer.snapshot()) if buffer else []
+
+        items: List[Any] = []
+        first_seq = buffer.first_seq if buffer else None
+        if first_seq is None or since_seq + 1 < first_seq:
+            persisted = [
+                log
+                for log in persisted or []
+                if first_seq is None or log.seq < first_seq
+            ]
+            if first_seq is not None:
+                missing = first_seq - since_seq - 1 - len(persisted)
+                if missing > 0:
+                    items.append(skipped_marker(missing))
+            for log in persisted:
+                record = LogRecord(
+                    log.seq, log.timestamp, log.level, log.message, log.source
+                )
+                record.frame = encode_log_event(task_id, record, record.seq)
+                items.append(record)
+        if buffer is not None:
+            items.extend(buffer.snapshot(since_seq))
+        return items
+
+    async def subscribe_to_logs(
+        self, task_id: str, since_seq: Optional[int] = None
+    ) -> Subscription:
+        """Subscribe to task logs
+
+        The subscriber first receives the lines after ``since_seq`` (the whole
+        live buffer if not given), newer lines follow through the subscription.
+        Items are :class:`LogRecord` objects carrying their SSE frame, or
+        skipped markers.
+        """
+        persisted = await self._stored_lines_before_buffer(task_id, since_seq)
+        subscription = self.log_broker.subscribe(task_id)
+        for item in self._replay_items(task_id, since_seq, persisted):
+            subscription.offer(item)
+        return subscription
+
+    async def _stored_lines_before_buffer(
+        self, task_id: str, since_seq: Optional[int], attempts: int = 3
+    ) -> List[TaskLog]:
+        """Read the stored lines after ``since_seq`` when the live buffer no
+        longer holds all of them
+
+        Read again when the buffer moved on during the read, as long as the
+        lines that left it may not have been stored yet.
+        """
+        persisted: List[TaskLog] = []
+        for _ in range(attempts):
+            buffer = self.log_buffers.get(task_id)
+            first_seq = buffer.first_seq if buffer else None
+            if since_seq is None or (
+                first_seq is not None and not since_seq + 1 < first_seq
+            ):
+                break
+            persisted = await self.log_service.get_stream_logs(task_id, since_seq)
+            buffer = self.log_buffers.get(task_id)
+            if (buffer.first_seq if buffer else None) == first_seq:
+                break
+        return persisted
+
+    def unsubscribe_from_logs(self, subscription: Subscription):
         """Unsubscribe from task logs"""
-        if task_id in self.stream_subscribers:
-            # Find and remove the weak reference
-            to_remove = None
-            for queue_ref in self.stream_subscribers[task_id]:
-                if queue_ref() is queue:
-                    to_remove = queue_ref
-                    break
-            if to_remove:
-                self.stream_subscribers[task_id].discard(to_remove)
-
-    def _load_tasks(self) -> List[Dict]:
-        """Load all tasks from file"""
-        try:
-            with open(self.tasks_file, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            return []
+        self.log_broker.unsubscribe(subscription)
 
-    def _save_tasks(self, tasks: List[Dict]):
-        """Save tasks to file"""
-        with open(self.tasks_file, "w", encoding="utf-8") as f:
-            json.dump(tasks, f, ensure_ascii=False, indent=2)
+    def get_log_subscriber_stats(self, task_id: Optional[str] = None) -> List[Dict]:
+        """Get lag and drop counters of live log subscribers"""
+        return self.log_broker.stats(task_id)
 
     async def get_all_tasks(self) -> List[SyncTask]:
         """Get all sync tasks"""
-        tasks_data = self._load_tasks()
-        return [SyncTask(**task) for task in tasks_data]
+        return [SyncTask(**task) for task in self.registry.all()]
 
     async def get_task(self, task_id: str) -> Optional[SyncTask]:
         """Get sync task by ID"""
-        tasks = await self.get_all_tasks()
-        for task in tasks:
-            if task.id == task_id:
-                return task
-        return None
+        task = self.registry.get(task_id)
+        return SyncTask(**task) if task is not None else None
 
     async def create_task(self, task_create: SyncTaskCreate) -> SyncTask:
         """Create new sync task"""
@@ -266,33 +477,15 @@ class TaskService:
             raise ValueError(f"TOMLconfigurationfailed: {'; '.join(validation_errors)}")
 
         # Check if task name is duplicate
-        existing_tasks = self._load_tasks()
-        for existing_task in existing_tasks:
-            if existing_task.get("name") == task_create.name:
-                raise ValueError(f"task '{task_create.name}' ")
-
-        # Generate unique ID
-        task_id = str(uuid.uuid4())
+        if self.registry.find_id_by_name(task_create.name) is not None:
+            raise ValueError(f"task '{task_create.name}' ")
 
         # Create task object
-        task_dict = {
-            "id": task_id,
-            "name": task_create.name,
-            "custom_config": task_create.custom_config,
-            "status": TaskStatus.PENDING.value,
-            "created_at": datetime.now().isoformat(),
-            "started_at": None,
-            "completed_at": None,
-            "error_message": None,
-            "process_id": None,
-            "total_keys": 0,
-            "processed_keys": 0,
-            "failed_keys": 0,
-        }
+        task_dict = self._new_task_record(task_create)
+        task_id = task_dict["id"]
 
         # Save task
-        existing_tasks.append(task_dict)
-        self._save_tasks(existing_tasks)
+        self.registry.insert(task_dict)
 
         # Record log
         self.log_service.add_log(
@@ -307,40 +500,102 @@ class TaskService:
         # Return created task
         return SyncTask(**task_dict)
 
+    def _new_task_record(self, task_create: SyncTaskCreate) -> Dict[str, Any]:
+        """Build the record of a new task"""
+        return {
+            "id": str(uuid.uuid4()),
+            "name": task_create.name,
+            "custom_config": task_create.custom_config,
+            "status": TaskStatus.PENDING.value,
+            "created_at": datetime.now().isoformat(),
+            "started_at": None,
+            "completed_at": None,
+            "error_message": None,
+            "process_id": None,
+            "total_keys": 0,
+            "processed_keys": 0,
+            "failed_keys": 0,
+            "log_buffer_capacity": task_create.log_buffer_capacity,
+            "priority": task_create.priority,
+            "queued_at": None,
+        }
+
+    async def create_tasks(self, task_creates: List[SyncTaskCreate]) -> Dict[str, Any]:
+        """Create many sync tasks at once
+
+        All configurations and names are validated first, and the tasks are
+        only created when every item is valid. They are inserted in one
+        registry change, which is persisted by a single write. Returns the
+        number of created tasks and one result per item.
+        """
+        results = []
+        names = set()
+        for index, task_create in enumerate(task_creates):
+            errors = task_create.validate_toml_config()
+            if (
+                self.registry.find_id_by_name(task_create.name) is not None
+                or task_create.name in names
+            ):
+                errors.append(f"task '{task_create.name}' ")
+            names.add(task_create.name)
+            results.append(
+                {
+                    "index": index,
+                    "name": task_create.name,
+                    "success": not errors,
+                    "error": "; ".join(errors) or None,
+                }
+            )
+
+        if not all(result["success"] for result in results):
+            for result in results:
+                if result["success"]:
+                    result["success"] = False
+                    result["error"] = "Not created, the batch has invalid items"
+            return {"created": 0, "results": results}
+
+        records = [self._new_task_record(task_create) for task_create in task_creates]
+        self.registry.insert_many(records)
+        for record, result in zip(records, results):
+            self.log_service.add_log(
+                TaskLogCreate(
+                    task_id=record["id"],
+                    level=LogLevel.INFO,
+                    message=f"task '{record['name']}' Createsuccessfully",
+                ),
+                task_name=record["name"],
+            )
+            result["task"] = SyncTask(**record)
+        return {"created": len(records), "results": results}
+
     async def update_task(
         self, task_id: str, task_update: SyncTaskUpdate
     ) -> Optional[SyncTask]:
         """Update sync task"""
-        tasks = self._load_tasks()
-
-        # Find and update task
-        for i, task in enumerate(tasks):
-            if task["id"] == task_id:
-                # Check if task name is duplicate（task）
-                if task_update.name and task_update.name != task.get("name"):
-                    for other_task in tasks:
-                        if (
-                            other_task.get("id") != task_id
-                            and other_task.get("name") == task_update.name
-                        ):
-                            raise ValueError(f"task '{task_update.name}' ")
-
-                # Update fields
-                update_data = task_update.dict(exclude_unset=True)
-                for key, value in update_data.items():
-                    if value is not None:
-                        if key == "status" and hasattr(value, "value"):
-                            task[key] = value.value
-                        else:
-                            task[key] = value
-
-                # Save updated task
-                self._save_tasks(tasks)
-
-                # Return updated task
-                return SyncTask(**task)
+        # Collect changed fields
+        changes = {}
+        update_data = task_update.dict(exclude_unset=True)
+        for key, value in update_data.items():
+            if value is not None:
+                if key == "status" and hasattr(value, "value"):
+                    changes[key] = value.value
+                else:
+                    changes[key] = value
 
-        return None
+        # Update task (the registry rejects duplicate task names)
+        task = self.registry.update(task_id, changes)
+        if task is None:
+            return None
+
+        if "priority" in changes:
+            self.scheduler.reprioritize(task_id, changes["priority"])
+
+        # Apply a new buffer capacity to a running task right away
+        if "log_buffer_capacity" in changes and task_id in self.log_buffers:
+            self.log_buffers[task_id].resize(changes["log_buffer_capacity"])
+
+        # Return updated task
+        return SyncTask(**task)
 
     async def delete_task(self, task_id: str) -> bool:
         """Delete sync task
@@ -357,55 +612,83 @@ class TaskService:
         if task.status == TaskStatus.RUNNING:
             raise ValueError("Cannot delete running task, please stop task first")
 
-        tasks = self._load_tasks()
-        original_length = len(tasks)
+        # Remove task from registry
+        if self.registry.remove(task_id) is not None:
+            self._cleanup_deleted_task(task_id, task.name)
+            return True
 
-        # Filter out task to be deleted
-        tasks = [task for task in tasks if task["id"] != task_id]
+        return False
 
-        # If task count decreased, deletion was successful
-        if len(tasks) < original_length:
-            self._save_tasks(tasks)
+    async def delete_tasks(self, task_ids: List[str]) -> List[Dict[str, Any]]:
+        """Delete many sync tasks in one registry change
 
-            # Clean up related configuration files
-            try:
-                config_path = os.path.join(
-                    settings.redis_shake_config_dir, f"task_{task_id}.toml"
-                )
-                if os.path.exists(config_path):
-                    os.remove(config_path)
-            except Exception as e:
-                # configurationDeletefailedtaskDelete，Record log
-                self.log_service.add_log(
-                    TaskLogCreate(
-                        task_id=task_id,
-                        level=LogLevel.WARNING,
-                        message=f"Delete configuration file failed: {str(e)}",
-                    ),
-                    task_name=task.name,
-                )
+        Running tasks and unknown IDs are skipped with an error. Returns one
+        result per task.
+        """
+        errors: Dict[str, str] = {}
+        deletable = []
+        for task_id in task_ids:
+            task = self.registry.get(task_id)
+            if task is None:
+                errors[task_id] = "tasknot found"
+            elif task.get("status") == TaskStatus.RUNNING.value:
+                errors[task_id] = "Cannot delete running task, please stop task first"
+            else:
+                deletable.append(task_id)
+
+        for task in self.registry.remove_many(deletable):
+            self._cleanup_deleted_task(task["id"], task.get("name"))
+
+        return [
+            {
+                "success": task_id not in errors,
+                "task_id": task_id,
+                "error": errors.get(task_id),
+            }
+            for task_id in task_ids
+        ]
 
-            # Delete
+    def _cleanup_deleted_task(self, task_id: str, task_name: Optional[str]):
+        """Drop the in-memory state, port lease and configuration file of a
+        deleted task"""
+        self.log_buffers.pop(task_id, None)
+        self._reserved_log_seqs.pop(task_id, None)
+        self.log_line_counts.pop(task_id, None)
+        self.port_allocator.release(task_id)
+        self.metrics_store.remove(task_id)
+
+        # Clean up related configuration files
+        try:
+            config_path = os.path.join(
+                settings.redis_shake_config_dir, f"task_{task_id}.toml"
+            )
+            if os.path.exists(config_path):
+                os.remove(config_path)
+        except Exception as e:
+            # configurationDeletefailedtaskDelete，Record log
             self.log_service.add_log(
                 TaskLogCreate(
                     task_id=task_id,
-                    level=LogLevel.INFO,
-                    message=f"task '{task.name}' Deletesuccessfully",
+                    level=LogLevel.WARNING,
+                    message=f"Delete configuration file failed: {str(e)}",
                 ),
-                task_name=task.name,
+                task_name=task_name,
             )
 
-            return True
-
-        return False
+        # Delete
+        self.log_service.add_log(
+            TaskLogCreate(
+                task_id=task_id,
+                level=LogLevel.INFO,
+                message=f"task '{task_name}' Deletesuccessfully",
+            ),
+            task_name=task_name,
+        )
 
-    def _ensure_status_port(self, config_content: str, task_id: str) -> str:
-        """configuration"""
+    def _ensure_status_port(self, config_content: str, status_port: int) -> str:
+        """Set the leased status port where the configuration leaves it open"""
         import re
 
-        # task（8080）
-        status_port = 8080 + hash(task_id) % 1000
-
         # [advanced]
         if "[advanced]" in config_content:
             # status_port
@@ -479,13 +762,36 @@ class TaskService:
 
         return config_content
 
+    def _get_task_config_path(self, task_id: str) -> str:
+        """Get the configuration file path of the redis-shake process of a task"""
+        task_data_dir = os.path.join(settings.redis_shake_data_dir, f"task_{task_id}")
+        return os.path.join(task_data_dir, f"task_{task_id}.toml")
+
+    def _get_task_output_paths(self, task_id: str) -> Dict[str, str]:
+        """Get the files receiving the stdout and stderr of a task process
+
+        Output goes to files rather than pipes, so the process survives
+        restarts of this server.
+        """
+        task_log_dir = os.path.join(
+            settings.redis_shake_data_dir, f"task_{task_id}", "logs"
+        )
+        return {
+            source: os.path.join(task_log_dir, f"task_{task_id}.{source}")
+            for source in ("stdout", "stderr")
+        }
+
     def _get_task_log_file_path(self, task_id: str) -> str:
         """Get the log file path for a specific task"""
         task_data_dir = os.path.join(settings.redis_shake_data_dir, f"task_{task_id}")
         return os.path.join(task_data_dir, "logs", f"task_{task_id}.log")
 
     async def start_task(self, task_id: str) -> Dict[str, Any]:
-        """Starttask"""
+        """Starttask
+
+        Starts right away when fewer than ``max_concurrent_tasks`` tasks are
+        running, otherwise the task is queued and started by the scheduler.
+        """
         # task
         task = await self.get_task(task_id)
         if not task:
@@ -503,59 +809,23 @@ class TaskService:
         if not task.custom_config:
             raise ValueError("TOMLconfiguration")
 
-        try:
-            # Create task-specific data directory
-            task_data_dir = os.path.join(
-                settings.redis_shake_data_dir, f"task_{task_id}"
-            )
-            os.makedirs(task_data_dir, exist_ok=True)
-
-            # Create task log directory
-            task_log_dir = os.path.join(task_data_dir, "logs")
-            os.makedirs(task_log_dir, exist_ok=True)
-
-            # Store configuration to task directory
-            config_content = self._ensure_status_port(task.custom_config, task_id)
-            config_content = self._ensure_task_specific_paths(config_content, task_id)
-            config_path = os.path.join(task_data_dir, f"task_{task_id}.toml")
-
-            # configuration
-            with open(config_path, "w", encoding="utf-8") as f:
-                f.write(config_content)
-
-            # Validate configurationCreatesuccessfully
-            if not os.path.exists(config_path):
-                raise ValueError(f"configurationCreatefailed: {config_path}")
+        return await self.scheduler.request_start(task_id, task.priority or 0)
 
-            # redis-shake
-            if not os.path.exists(settings.redis_shake_bin_path):
-                raise ValueError(f"redis-shake: {settings.redis_shake_bin_path}")
-
-            #
-            cmd = [settings.redis_shake_bin_path, config_path]
-
-            # Start
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-                cwd=os.path.dirname(settings.redis_shake_bin_path),
-            )
-
-            # Store process and start reading output
-            self.process_streams[task_id] = {"process": process, "log_buffer": []}
+    async def _launch_task(self, task_id: str) -> Dict[str, Any]:
+        """Spawn the redis-shake process of a task admitted by the scheduler"""
+        task = await self.get_task(task_id)
+        if not task:
+            raise ValueError("tasknot found")
 
-            # Start reading process output in background
-            asyncio.create_task(self._read_process_output(task_id, process))
+        try:
+            spawned = await self._spawn_task(task)
+            process = spawned["process"]
 
-            # Start
-            await asyncio.sleep(2)
+            if self.scheduler.start_cancelled(task_id):
+                return await self._abort_launch(task_id, spawned)
 
-            #
-            if process.returncode is None:
-                # ，Startsuccessfully
-                #
-                status_port = 8080 + hash(task_id) % 1000
+            if spawned["ready"]:
+                status_port = spawned["status_port"]
 
                 # Updatetask
                 await self.update_task(
@@ -566,6 +836,7 @@ class TaskService:
                         process_id=process.pid,
                         status_port=status_port,
                         error_message=None,
+                        start_timings=spawned["timings"],
                     ),
                 )
 
@@ -588,18 +859,15 @@ class TaskService:
                 }
             else:
                 # ，Startfailed
-                stdout, stderr = await process.communicate()
-                error_message = (
-                    stderr.decode("utf-8")
-                    if stderr
-                    else stdout.decode("utf-8") if stdout else "taskStartfailed"
-                )
+                error_message = spawned["error"] or "taskStartfailed"
 
                 # Updatetaskfailed
                 await self.update_task(
                     task_id,
                     SyncTaskUpdate(
-                        status=TaskStatus.FAILED, error_message=error_message
+                        status=TaskStatus.FAILED,
+                        error_message=error_message,
+                        start_timings=spawned["timings"],
                     ),
                 )
 
@@ -621,12 +889,273 @@ class TaskService:
                 }
 
         except Exception as e:
-            # Updatetaskfailed
-            await self.update_task(
-                task_id, SyncTaskUpdate(status=TaskStatus.FAILED, error_message=str(e))
-            )
+            # Updatetaskfailed, unless it was stopped meanwhile
+            if not self.scheduler.start_cancelled(task_id):
+                await self.update_task(
+                    task_id,
+                    SyncTaskUpdate(status=TaskStatus.FAILED, error_message=str(e)),
+                )
             raise ValueError(f"Starttaskfailed: {str(e)}")
 
+    async def _abort_launch(
+        self, task_id: str, spawned: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Terminate the process of a task stopped while it was launching
+
+        The task was already marked stopped by ``stop_task``.
+        """
+        if spawned["ready"]:
+            stream = self.process_streams.get(task_id)
+            if stream is not None:
+                stream["stopping"] = True
+            await self._terminate_process(spawned["process"])
+            if stream is not None:
+                await self._finish_reader(stream)
+            self.port_allocator.release(task_id)
+
+        return {
+            "success": False,
+            "message": "Task start cancelled",
+            "task_id": task_id,
+            "error": None,
+        }
+
+    async def _spawn_task(self, task: SyncTask) -> Dict[str, Any]:
+        """Lease a status port to a task and spawn its redis-shake process
+
+        A port fixed by the configuration is leased as is. The lease is
+        returned when the process does not become ready.
+        """
+        started = time.perf_counter()
+        status_port = self.port_allocator.acquire(
+            task.id, self._parse_status_port(task.custom_config)
+        )
+        try:
+            spawned = await self._spawn_process(task, status_port, started)
+        except Exception:
+            self.port_allocator.release(task.id)
+            raise
+        if not spawned["ready"]:
+            self.port_allocator.release(task.id)
+        return spawned
+
+    async def _spawn_process(
+        self, task: SyncTask, status_port: int, started: float
+    ) -> Dict[str, Any]:
+        """Write the configuration of a task, spawn redis-shake and wait until
+        it is ready
+
+        The process is ready once its status port accepts connections or it
+        logs a line matching ``task_ready_log_pattern``. A process that exits
+        first fails right away, one that is not ready after
+        ``task_ready_timeout`` seconds is killed. Returns the process, whether
+        it is ready, its status port, the startup error and the durations of
+        the start phases in milliseconds since ``started``.
+        """
+
+        def elapsed_ms() -> float:
+            return round((time.perf_counter() - started) * 1000, 1)
+
+        # Create task-specific data and log directories
+        task_data_dir = os.path.join(settings.redis_shake_data_dir, f"task_{task.id}")
+        os.makedirs(os.path.join(task_data_dir, "logs"), exist_ok=True)
+
+        # Store configuration to task directory
+        config_content = self._ensure_status_port(task.custom_config, status_port)
+        config_content = self._ensure_task_specific_paths(config_content, task.id)
+        config_path = self._get_task_config_path(task.id)
+        with open(config_path, "w", encoding="utf-8") as f:
+            f.write(config_content)
+        # The written configuration is authoritative for the port
+        status_port = self._extract_status_port_from_config(config_path)
+        timings: Dict[str, Any] = {"render_ms": elapsed_ms()}
+
+        # redis-shake
+        if not os.path.exists(settings.redis_shake_bin_path):
+            raise ValueError(f"redis-shake: {settings.redis_shake_bin_path}")
+
+        # Output of this start is numbered after the lines already buffered
+        since_seq = self._get_log_buffer(task.id).last_seq
+        # Lines earlier runs left in the log file must not reach the probe
+        positions = None
+        try:
+            log_stat = os.stat(self._get_task_log_file_path(task.id))
+            positions = {"log": [log_stat.st_ino, log_stat.st_size]}
+        except FileNotFoundError:
+            pass
+        output_paths = self._get_task_output_paths(task.id)
+        with open(output_paths["stdout"], "wb") as stdout, open(
+            output_paths["stderr"], "wb"
+        ) as stderr:
+            # In its own session the process outlives this server, e.g. a
+            # Ctrl-C in its terminal
+            process = await asyncio.create_subprocess_exec(
+                settings.redis_shake_bin_path,
+                config_path,
+                stdout=stdout,
+                stderr=stderr,
+                cwd=os.path.dirname(settings.redis_shake_bin_path),
+                start_new_session=True,
+            )
+        timings["spawn_ms"] = elapsed_ms()
+
+        probe = ReadinessProbe(
+            process,
+            status_port,
+            log_pattern=settings.task_ready_log_pattern,
+            deadline=settings.task_ready_timeout,
+        )
+        self._readiness_probes[task.id] = probe
+        stream = self.process_streams[task.id] = {
+            "process": process,
+            "pid": process.pid,
+        }
+        reader = asyncio.create_task(
+            self._follow_process(task.id, process.pid, process.wait, positions)
+        )
+        stream["reader"] = reader
+        try:
+            readiness = await probe.wait()
+        finally:
+            self._readiness_probes.pop(task.id, None)
+        timings["ready_ms"] = elapsed_ms()
+        timings["ready_by"] = readiness["reason"]
+
+        error = None
+        if readiness["reason"] == "timeout":
+            stream["stopping"] = True
+            await self._terminate_process(process, settings.task_kill_timeout)
+            error = (
+                f"redis-shake not ready within {settings.task_ready_timeout:g} seconds"
+            )
+        if not readiness["ready"]:
+            # Let the reader drain the output of the process
+            try:
+                await asyncio.wait_for(asyncio.shield(reader), timeout=1.0)
+            except asyncio.TimeoutError:
+                pass
+            output = self._startup_output(task.id, since_seq)
+            if error is None:
+                error = f"redis-shake exited with code {process.returncode}"
+            if output:
+                error = f"{error}: {output}"
+
+        return {
+            "process": process,
+            "ready": readiness["ready"],
+            "status_port": status_port,
+            "error": error,
+            "timings": timings,
+        }
+
+    async def _terminate_process(
+        self,
+        process: asyncio.subprocess.Process,
+        timeout: Optional[float] = None,
+    ) -> bool:
+        """Terminate a child process without blocking the event loop
+
+        Sends SIGTERM and escalates to SIGKILL when the process has not exited
+        after ``timeout`` seconds, ``task_stop_timeout`` by default. Returns
+        whether it had to be killed.
+        """
+        if timeout is None:
+            timeout = settings.task_stop_timeout
+        if process.returncode is not None:
+            return False
+        try:
+            process.terminate()
+        except ProcessLookupError:
+            return False
+        if await self._wait_exit(process, timeout):
+            return False
+        try:
+            process.kill()
+        except ProcessLookupError:
+            return False
+        await self._wait_exit(process, settings.task_kill_timeout)
+        return True
+
+    @staticmethod
+    async def _wait_exit(process: asyncio.subprocess.Process, timeout: float) -> bool:
+        """Wait until a child process has exited, returns whether it did in time
+
+        ``process.wait()`` alone also waits for the output pipes to close,
+        which a surviving grandchild can keep open, so the return code is
+        checked as well.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        waiter = asyncio.ensure_future(process.wait())
+        try:
+            while process.returncode is None:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return False
+                await asyncio.wait({waiter}, timeout=min(0.1, remaining))
+            return True
+        finally:
+            waiter.cancel()
+
+    async def _terminate_pid(self, pid: int, timeout: Optional[float] = None) -> bool:
+        """Terminate a process that is not a child of this server
+
+        Its exit cannot be awaited, so it is polled until it is gone or a
+        zombie. Returns whether it had to be killed.
+        """
+        if timeout is None:
+            timeout = settings.task_stop_timeout
+        try:
+            handle = psutil.Process(pid)
+            handle.terminate()
+        except psutil.NoSuchProcess:
+            return False
+        if await self._wait_gone(handle, timeout):
+            return False
+        try:
+            handle.kill()
+        except psutil.NoSuchProcess:
+            return False
+        await self._wait_gone(handle, settings.task_kill_timeout)
+        return True
+
+    @staticmethod
+    async def _wait_gone(handle: psutil.Process, timeout: float) -> bool:
+        """Poll until a process has exited, returns whether it did in time"""
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                if handle.status() == psutil.STATUS_ZOMBIE:
+                    return True
+            except psutil.NoSuchProcess:
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(0.1)
+
+    async def _finish_reader(self, stream: Dict[str, Any]):
+        """Let the output reader of a stopped process drain, then cancel it"""
+        reader = stream.get("reader")
+        if reader is None or reader.done():
+            return
+        try:
+            await asyncio.wait_for(asyncio.shield(reader), timeout=1.0)
+        except asyncio.TimeoutError:
+            # A surviving grandchild may hold the pipes open
+            reader.cancel()
+
+    def _startup_output(self, task_id: str, since_seq: int, limit: int = 20) -> str:
+        """Last lines a process printed since ``since_seq``"""
+        buffer = self.log_buffers.get(task_id)
+        if buffer is None:
+            return ""
+        lines = [
+            record.message
+            for record in buffer.snapshot(since_seq)
+            if record.source in ("stdout", "stderr") and record.message
+        ]
+        return "\n".join(lines[-limit:])
+
     async def stop_task(self, task_id: str) -> Dict[str, Any]:
         """Stoptask"""
         # task
@@ -634,47 +1163,69 @@ class TaskService:
         if not task:
             raise ValueError("tasknot found")
 
+        # A task being launched is stopped once its process is spawned, queued
+        # tasks just leave the queue
+        if self.scheduler.cancel_start(task_id):
+            await self.update_task(
+                task_id,
+                SyncTaskUpdate(
+                    status=TaskStatus.STOPPED, completed_at=datetime.now().isoformat()
+                ),
+            )
+            return {
+                "success": True,
+                "message": "Task start cancelled",
+                "task_id": task_id,
+                "error": None,
+            }
+
+        if task.status == TaskStatus.QUEUED:
+            self.scheduler.cancel(task_id)
+            await self.update_task(
+                task_id,
+                SyncTaskUpdate(
+                    status=TaskStatus.STOPPED, completed_at=datetime.now().isoformat()
+                ),
+            )
+            return {
+                "success": True,
+                "message": "Task removed from the start queue",
+                "task_id": task_id,
+                "error": None,
+            }
+
         # task
         if task.status != TaskStatus.RUNNING:
             raise ValueError("taskStop")
 
         try:
-            success = False
             error_message = None
 
-            # ID，
-            if task.process_id:
-                try:
-                    #
-                    if psutil.pid_exists(task.process_id):
-                        process = psutil.Process(task.process_id)
-
-                        #
-                        process.terminate()
-
-                        #
-                        try:
-                            process.wait(timeout=10)  # 10
-                            success = True
-                        except psutil.TimeoutExpired:
-                            # 10，
-                            process.kill()
-                            process.wait(timeout=5)
-                            success = True
-                            error_message = ""
-                    else:
-                        #
-                        success = True
-                        error_message = ""
-
-                except (psutil.NoSuchProcess, psutil.AccessDenied) as e:
-                    success = True
-                    error_message = f": {str(e)}"
-                except Exception as e:
-                    error_message = f"Stopfailed: {str(e)}"
-            else:
-                success = True
-                error_message = "ID"
+            # The output reader must not report this exit as a failure
+            stream = self.process_streams.get(task_id)
+            if stream is not None:
+                stream["stopping"] = True
+
+            try:
+                if stream is not None and stream.get("process") is not None:
+                    killed = await self._terminate_process(stream["process"])
+                elif task.process_id:
+                    # Not a child of this server, e.g. adopted after a restart
+                    killed = await self._terminate_pid(task.process_id)
+                else:
+                    killed = False
+                    error_message = "ID"
+                if killed:
+                    error_message = (
+                        f"Killed after not exiting within "
+                        f"{settings.task_stop_timeout:g} seconds"
+                    )
+                if stream is not None:
+                    await self._finish_reader(stream)
+            except psutil.AccessDenied as e:
+                error_message = f": {str(e)}"
+
+            self.port_allocator.release(task_id)
 
             # UpdatetaskStop
             await self.update_task(
@@ -687,8 +1238,8 @@ class TaskService:
             )
 
             return {
-                "success": success,
-                "message": "taskStopsuccessfully" if success else "taskStopfailed",
+                "success": True,
+                "message": "taskStopsuccessfully",
                 "task_id": task_id,
                 "error": error_message,
             }
@@ -696,6 +1247,43 @@ class TaskService:
         except Exception as e:
             raise ValueError(f"Stoptaskfailed: {str(e)}")
 
+    async def stop_tasks(self, task_ids: List[str]) -> List[Dict[str, Any]]:
+        """Stop many tasks in parallel"""
+        # Cancel queued tasks first, so none is admitted into a freed slot
+        for task_id in task_ids:
+            self.scheduler.cancel(task_id)
+
+        return await self._run_batch(task_ids, self.stop_task, "taskStopfailed")
+
+    async def start_tasks(self, task_ids: List[str]) -> List[Dict[str, Any]]:
+        """Start many tasks concurrently, beyond free slots they are queued"""
+        return await self._run_batch(task_ids, self.start_task, "taskStartfailed")
+
+    async def _run_batch(
+        self,
+        task_ids: List[str],
+        action: Callable[[str], Awaitable[Dict[str, Any]]],
+        failure_message: str,
+    ) -> List[Dict[str, Any]]:
+        """Run a task action once per task, at most ``batch_concurrency`` at
+        once, with failures reported per task instead of raised"""
+        task_ids = list(dict.fromkeys(task_ids))
+        semaphore = asyncio.Semaphore(settings.batch_concurrency)
+
+        async def run(task_id: str) -> Dict[str, Any]:
+            async with semaphore:
+                try:
+                    return await action(task_id)
+                except ValueError as e:
+                    return {
+                        "success": False,
+                        "message": failure_message,
+                        "task_id": task_id,
+                        "error": str(e),
+                    }
+
+        return list(await asyncio.gather(*(run(task_id) for task_id in task_ids)))
+
     async def get_task_status(self, task_id: str) -> Dict[str, Any]:
         """task"""
         task = await self.get_task(task_id)
@@ -707,44 +1295,29 @@ class TaskService:
             "status": task.status,
             "process_running": False,
             "process_info": None,
+            "queue_position": self.scheduler.position(task_id),
         }
 
-        # task，
+        # Served from the background sampler, sampled now if not yet seen
         if task.status == TaskStatus.RUNNING and task.process_id:
-            try:
-                if psutil.pid_exists(task.process_id):
-                    process = psutil.Process(task.process_id)
-                    status_info["process_running"] = True
-                    status_info["process_info"] = {
-                        "pid": task.process_id,
-                        "cpu_percent": process.cpu_percent(),
-                        "memory_info": process.memory_info()._asdict(),
-                        "create_time": process.create_time(),
-                    }
-                else:
-                    # ，Updatetask
-                    await self.update_task(
-                        task_id,
-                        SyncTaskUpdate(
-                            status=TaskStatus.FAILED,
-                            error_message="",
-                            completed_at=datetime.now().isoformat(),
-                            process_id=None,
-                        ),
-                    )
-                    status_info["status"] = TaskStatus.FAILED
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                # ，Updatetask
-                await self.update_task(
-                    task_id,
-                    SyncTaskUpdate(
-                        status=TaskStatus.FAILED,
-                        error_message="",
-                        completed_at=datetime.now().isoformat(),
-                        process_id=None,
-                    ),
+            sample = self.process_sampler.get(task_id)
+            if sample is None or sample["pid"] != task.process_id:
+                sample = await self.process_sampler.sample_task(
+                    task_id, task.process_id
                 )
-                status_info["status"] = TaskStatus.FAILED
+            if sample["alive"]:
+                status_info["process_running"] = True
+                status_info["process_info"] = {
+                    key: value
+                    for key, value in sample.items()
+                    if key not in ("alive", "rss_bytes")
+                }
+            else:
+                # Exited unnoticed, recorded like any other exit, which also
+                # returns the status port lease
+                await self._handle_process_exit(task_id, task.process_id, None)
+                task = await self.get_task(task_id)
+                status_info["status"] = task.status if task else TaskStatus.FAILED
 
         return status_info
 
@@ -757,6 +1330,7 @@ class TaskService:
             "running": 0,
             "stopped": 0,
             "failed": 0,
+            "queued": 0,
             "total_keys": 0,
             "processed_keys": 0,
             "failed_keys": 0,
@@ -771,6 +1345,8 @@ class TaskService:
                 statistics["stopped"] += 1
             elif task.status == TaskStatus.FAILED:
                 statistics["failed"] += 1
+            elif task.status == TaskStatus.QUEUED:
+                statistics["queued"] += 1
 
             #
             statistics["total_keys"] += task.total_keys or 0
@@ -790,6 +1366,30 @@ class TaskService:
             for task in sorted_tasks[:5]
         ]
 
+        # Live throughput of the running tasks
+        throughput = {
+            "read_rate": 0.0,
+            "write_rate": 0.0,
+            "backlog": 0,
+            "stalled_tasks": [],
+            "regressed_tasks": [],
+        }
+        for task in tasks:
+            if task.status != TaskStatus.RUNNING:
+                continue
+            snapshot = self.status_collector.get(task.id)
+            analytics = snapshot["analytics"] if snapshot else {}
+            if not analytics:
+                continue
+            throughput["read_rate"] += analytics["read_rate"] or 0.0
+            throughput["write_rate"] += analytics["write_rate"] or 0.0
+            throughput["backlog"] += analytics["backlog"]
+            if analytics["stalled"]:
+                throughput["stalled_tasks"].append(task.id)
+            if analytics["regression"]:
+                throughput["regressed_tasks"].append(task.id)
+        statistics["throughput"] = throughput
+
         return statistics
 
     async def get_realtime_status(self, task_id: str) -> Dict[str, Any]:
@@ -805,81 +1405,98 @@ class TaskService:
         if not task.status_port:
             raise ValueError("taskconfiguration")
 
-        try:
-            # HTTPRedis-Shake
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    f"http://localhost:{task.status_port}", timeout=5
-                ) as response:
-                    if response.status == 200:
-                        status_data = await response.json()
-
-                        # Updatetask
-                        if "total_entries_count" in status_data:
-                            total_count = status_data["total_entries_count"]
-                            await self.update_task(
-                                task_id,
-                                SyncTaskUpdate(
-                                    total_keys=total_count.get("read_count", 0),
-                                    processed_keys=total_count.get("write_count", 0),
-                                ),
-                            )
-
-                        return status_data
-                    else:
-                        raise ValueError(f"error: {response.status}")
-        except asyncio.TimeoutError:
-            raise ValueError("，task")
-        except Exception as e:
-            raise ValueError(f"failed: {str(e)}")
+        # Served from the background collector
+        snapshot = await self.status_collector.get_fresh(task_id, task.status_port)
+        if snapshot["data"] is None:
+            raise ValueError(snapshot["error"])
+        return dict(snapshot["data"], analytics=snapshot["analytics"])
+
+    async def get_realtime_statuses(
+        self, task_ids: Optional[List[str]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """Get the Redis-Shake real-time status of many tasks
+
+        Defaults to all running tasks. Tasks without a recent snapshot are
+        scraped concurrently, each result holds either ``data`` or ``error``.
+        """
+        if task_ids is None:
+            task_ids = [
+                task["id"]
+                for task in self.registry.all()
+                if task.get("status") == TaskStatus.RUNNING.value
+            ]
+
+        results: Dict[str, Dict[str, Any]] = {}
+        scrapes = {}
+        for task_id in dict.fromkeys(task_ids):
+            task = self.registry.get(task_id)
+            if task is None:
+                results[task_id] = {"data": None, "error": "Task not found"}
+            elif task.get("status") != TaskStatus.RUNNING.value:
+                results[task_id] = {"data": None, "error": "Task is not running"}
+            elif not task.get("status_port"):
+                results[task_id] = {"data": None, "error": "Task has no status port"}
+            else:
+                scrapes[task_id] = self.status_collector.get_fresh(
+                    task_id, task["status_port"]
+                )
+
+        snapshots = await asyncio.gather(*scrapes.values())
+        for task_id, snapshot in zip(scrapes, snapshots):
+            results[task_id] = {
+                "data": snapshot["data"],
+                "error": snapshot["error"],
+                "analytics": snapshot["analytics"],
+                "collected_at": snapshot["collected_at"],
+            }
+        return {task_id: results[task_id] for task_id in dict.fromkeys(task_ids)}
+
+    async def get_task_metrics(
+        self,
+        task_id: str,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        step: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Get the throughput and resource history of a task
+
+        Defaults to the last hour, ``start`` and ``end`` are Unix timestamps.
+        """
+        if self.registry.get(task_id) is None:
+            raise ValueError("tasknot found")
+        end = datetime.now().timestamp() if end is None else end
+        start = end - 3600 if start is None else start
+        return self.metrics_store.query(task_id, start, end, step)
 
     async def recover_running_tasks(self) -> Dict[str, Any]:
-        """task（）"""
+        """task（）
+
+        Restarts up to ``recovery_concurrency`` tasks at once, the progress
+        of each task is kept in ``recovery_progress``.
+        """
         try:
-            tasks = await self.get_all_tasks()
-            recovered_tasks = []
-            failed_tasks = []
-
-            for task in tasks:
-                if task.status == TaskStatus.RUNNING:
-                    try:
-                        #
-                        if task.process_id and psutil.pid_exists(task.process_id):
-                            # ，
-                            continue
-
-                        # ，Start
-                        print(f"task: {task.name} (ID: {task.id})")
-
-                        # Starttask
-                        await self._restart_task(task)
-                        recovered_tasks.append(
-                            {
-                                "task_id": task.id,
-                                "task_name": task.name,
-                                "status": "recovered",
-                            }
-                        )
-
-                    except Exception as e:
-                        print(
-                            f"taskfailed: {task.name} (ID: {task.id}), error: {str(e)}"
-                        )
-                        # failedtaskUpdatefailed
-                        await self.update_task(
-                            task.id,
-                            SyncTaskUpdate(
-                                status=TaskStatus.FAILED,
-                                error_message=f"failed: {str(e)}",
-                            ),
-                        )
-                        failed_tasks.append(
-                            {
-                                "task_id": task.id,
-                                "task_name": task.name,
-                                "error": str(e),
-                            }
-                        )
+            tasks = [
+                task
+                for task in await self.get_all_tasks()
+                if task.status == TaskStatus.RUNNING
+            ]
+            self.recovery_progress = {
+                "state": "running",
+                "started_at": datetime.now().isoformat(),
+                "finished_at": None,
+                "tasks": {
+                    task.id: {"task_name": task.name, "state": "pending", "error": None}
+                    for task in tasks
+                },
+            }
+            semaphore = asyncio.Semaphore(settings.recovery_concurrency)
+            results = await asyncio.gather(
+                *(self._recover_task(task, semaphore) for task in tasks)
+            )
+            recovered_tasks = [r for r in results if r and "error" not in r]
+            failed_tasks = [r for r in results if r and "error" in r]
+            self.recovery_progress["state"] = "completed"
+            self.recovery_progress["finished_at"] = datetime.now().isoformat()
 
             return {
                 "recovered_count": len(recovered_tasks),
@@ -890,6 +1507,8 @@ class TaskService:
 
         except Exception as e:
             print(f"task: {str(e)}")
+            self.recovery_progress["state"] = "failed"
+            self.recovery_progress["finished_at"] = datetime.now().isoformat()
             return {
                 "recovered_count": 0,
                 "failed_count": 0,
@@ -898,62 +1517,150 @@ class TaskService:
                 "error": str(e),
             }
 
-    async def _restart_task(self, task: SyncTask) -> None:
-        """Starttask"""
-        try:
-            # Create task-specific data directory
-            task_data_dir = os.path.join(
-                settings.redis_shake_data_dir, f"task_{task.id}"
-            )
-            os.makedirs(task_data_dir, exist_ok=True)
+    async def _recover_task(
+        self, task: SyncTask, semaphore: asyncio.Semaphore
+    ) -> Optional[Dict[str, Any]]:
+        """Adopt the surviving process of an interrupted task or restart it"""
+        progress = self.recovery_progress["tasks"][task.id]
+        async with semaphore:
+            progress["state"] = "recovering"
+            try:
+                # Processes that survived a restart of this server keep running
+                if task.process_id and self._is_task_process(task):
+                    self._adopt_task(task)
+                    progress["state"] = "adopted"
+                    return {
+                        "task_id": task.id,
+                        "task_name": task.name,
+                        "status": "adopted",
+                    }
 
-            # Create task log directory
-            task_log_dir = os.path.join(task_data_dir, "logs")
-            os.makedirs(task_log_dir, exist_ok=True)
+                # ，Start
+                print(f"task: {task.name} (ID: {task.id})")
 
-            # Store configuration to task directory
-            config_path = os.path.join(task_data_dir, f"task_{task.id}.toml")
+                # Starttask
+                await self._restart_task(task)
+                progress["state"] = "recovered"
+                return {
+                    "task_id": task.id,
+                    "task_name": task.name,
+                    "status": "recovered",
+                }
 
-            # Ensure configuration file exists with proper paths
-            config_content = self._ensure_status_port(task.custom_config, task.id)
-            config_content = self._ensure_task_specific_paths(config_content, task.id)
+            except Exception as e:
+                print(f"taskfailed: {task.name} (ID: {task.id}), error: {str(e)}")
+                # failedtaskUpdatefailed
+                await self.update_task(
+                    task.id,
+                    SyncTaskUpdate(
+                        status=TaskStatus.FAILED,
+                        error_message=f"failed: {str(e)}",
+                    ),
+                )
+                progress["state"] = "failed"
+                progress["error"] = str(e)
+                return {
+                    "task_id": task.id,
+                    "task_name": task.name,
+                    "error": str(e),
+                }
 
-            # Write updated configuration
-            with open(config_path, "w", encoding="utf-8") as f:
-                f.write(config_content)
+    def _is_task_process(self, task: SyncTask) -> bool:
+        """Whether the recorded PID of a task runs redis-shake with its config
 
-            # redis-shake
-            if not os.path.exists(settings.redis_shake_bin_path):
-                raise ValueError(f"redis-shake: {settings.redis_shake_bin_path}")
+        Guards against PIDs reused by other programs after a reboot or crash.
+        """
+        try:
+            process = psutil.Process(task.process_id)
+            if process.status() == psutil.STATUS_ZOMBIE:
+                return False
+            cmdline = process.cmdline()
+            cwd = process.cwd()
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return False
+        if len(cmdline) < 2:
+            return False
+
+        def resolve(path: str) -> str:
+            return os.path.realpath(os.path.join(cwd, path))
+
+        binary = os.path.realpath(settings.redis_shake_bin_path)
+        config_path = os.path.realpath(self._get_task_config_path(task.id))
+        # The binary may follow an interpreter when it is a script
+        return resolve(cmdline[-1]) == config_path and any(
+            resolve(arg) == binary for arg in cmdline[:-1]
+        )
 
-            #
-            cmd = [settings.redis_shake_bin_path, config_path]
+    def _adopt_task(self, task: SyncTask):
+        """Take over the process of a task that survived a restart
 
-            # Start
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-                cwd=os.path.dirname(settings.redis_shake_bin_path),
+        Its log and output files are followed again from the positions stored
+        before the restart, and its status port stays leased, so status and
+        metrics collection resume.
+        """
+        handle = psutil.Process(task.process_id)
+        if task.status_port:
+            self.port_allocator.assign(task.id, task.status_port)
+        record = self.registry.get(task.id) or {}
+        stream = self.process_streams[task.id] = {"pid": handle.pid, "adopted": True}
+        stream["reader"] = asyncio.ensure_future(
+            self._follow_process(
+                task.id,
+                handle.pid,
+                lambda: self._wait_foreign_exit(handle),
+                record.get("log_positions"),
             )
+        )
+        print(f"task {task.name} adopted, PID: {handle.pid}")
 
-            # Store process and start reading output
-            self.process_streams[task.id] = {"process": process, "log_buffer": []}
+    async def _wait_foreign_exit(self, handle: psutil.Process) -> Optional[int]:
+        """Wait until a process that is not a child of this server exits
 
-            # Start reading process output in background
-            asyncio.create_task(self._read_process_output(task.id, process))
+        Uses a pidfd where available (Linux 5.3+), otherwise polls every
+        ``process_sample_interval`` seconds. Returns the exit code if it can
+        be read, which the kernel only reports to the parent, None otherwise.
+        """
+        pidfd_open = getattr(os, "pidfd_open", None)
+        fd = None
+        if pidfd_open is not None:
+            try:
+                fd = pidfd_open(handle.pid)
+            except OSError:
+                fd = None
+        if fd is None:
+            while not await self._wait_gone(handle, settings.process_sample_interval):
+                pass
+            return self._exit_status(handle)
+
+        loop = asyncio.get_running_loop()
+        exited = loop.create_future()
+        loop.add_reader(fd, lambda: exited.done() or exited.set_result(None))
+        try:
+            await exited
+        finally:
+            loop.remove_reader(fd)
+            os.close(fd)
+        return self._exit_status(handle)
+
+    @staticmethod
+    def _exit_status(handle: psutil.Process) -> Optional[int]:
+        """Exit code of an exited process, negative for a signal, None when
+        it is not a child of this server"""
+        try:
+            returncode = handle.wait(timeout=0)
+        except (psutil.Error, ChildProcessError):
+            return None
+        return int(returncode) if returncode is not None else None
 
-            # Start
-            await asyncio.sleep(2)
+    async def _restart_task(self, task: SyncTask) -> None:
+        """Starttask"""
+        try:
+            spawned = await self._spawn_task(task)
+            process = spawned["process"]
 
-            #
-            if process.returncode is None:
+            if spawned["ready"]:
                 # ，Startsuccessfully
-                # configuration
-                status_port = self._extract_status_port_from_config(config_path)
-                if not status_port:
-                    # configuration，
-                    status_port = task.status_port or (8080 + hash(task.id) % 1000)
+                status_port = spawned["status_port"] or task.status_port
 
                 # Updatetask
                 await self.update_task(
@@ -964,13 +1671,14 @@ class TaskService:
                         process_id=process.pid,
                         status_port=status_port,
                         error_message=None,
+                        start_timings=spawned["timings"],
                     ),
                 )
 
                 print(f"task {task.name} successfully，PID: {process.pid}")
             else:
                 # Startfailed
-                raise ValueError(f"redis-shakeStartfailed，: {process.returncode}")
+                raise ValueError(spawned["error"])
 
         except Exception as e:
             raise ValueError(f"taskfailed: {str(e)}")
@@ -978,18 +1686,23 @@ class TaskService:
     def _extract_status_port_from_config(self, config_path: str) -> Optional[int]:
         """configuration"""
         try:
-            import re
-
             with open(config_path, "r", encoding="utf-8") as f:
                 content = f.read()
 
-            # status_portconfiguration
-            match = re.search(r"status_port\s*=\s*(\d+)", content)
-            if match:
-                port = int(match.group(1))
-                # 0，configuration，None
-                return port if port > 0 else None
-            return None
+            return self._parse_status_port(content)
         except Exception as e:
             print(f"configurationfailed: {str(e)}")
             return None
+
+    @staticmethod
+    def _parse_status_port(config_content: str) -> Optional[int]:
+        """Status port set in a configuration, None when unset or 0"""
+        import re
+
+        # status_portconfiguration
+        match = re.search(r"status_port\s*=\s*(\d+)", config_content)
+        if match:
+            port = int(match.group(1))
+            # 0，configuration，None
+            return port if port > 0 else None
+        return None
@@ -0,0 +1,359 @@
+import asyncio
+import json
+import threading
+from typing import Any, Dict, List, Optional, Set
+
+from fastapi import WebSocket
+
+from app.services.log_broker import Subscription
+from app.services.task_service import TaskService
+
+TOPICS = ("logs", "status", "tasks")
+
+# Task fields reported by the ``status`` topic
+STATUS_FIELDS = (
+    "status",
+    "started_at",
+    "completed_at",
+    "error_message",
+    "process_id",
+    "total_keys",
+    "processed_keys",
+    "failed_keys",
+)
+
+# Status collector fields reported by the ``status`` topic: the latest
+# redis-shake status and the throughput analytics derived from it
+SNAPSHOT_FIELDS = ("metrics", "analytics")
+
+
+def _as_set(value) -> Optional[Set[str]]:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = [value]
+    return {str(item) for item in value}
+
+
+class _TopicSubscription:
+    """One topic subscription of a connection with its server-side filters
+
+    Filters:
+        task_ids: tasks to follow (required for ``logs``), all tasks if omitted
+        levels, sources, contains: log level, source and message filters
+        since: ``{task_id: seq}`` to resume log streams
+        fields: status and snapshot fields to report (``status``)
+        statuses, name_contains: task list filters (``tasks``)
+    """
+
+    def __init__(self, sub_id: str, topic: str, filters: Dict[str, Any]):
+        self.id = sub_id
+        self.topic = topic
+        self.task_ids = _as_set(filters.get("task_ids"))
+        self.levels = {level.upper() for level in _as_set(filters.get("levels")) or ()}
+        self.sources = _as_set(filters.get("sources"))
+        self.contains = (filters.get("contains") or "").lower()
+        self.since: Dict[str, int] = filters.get("since") or {}
+        self.fields = _as_set(filters.get("fields")) or set(
+            STATUS_FIELDS + SNAPSHOT_FIELDS
+        )
+        self.statuses = _as_set(filters.get("statuses"))
+        self.name_contains = (filters.get("name_contains") or "").lower()
+        self.visible: Set[str] = set()  # Tasks in the client's filtered list
+        self.log_subscriptions: List[Subscription] = []
+        self.pumps: List[asyncio.Task] = []
+
+    def matches_task(self, task: Dict) -> bool:
+        if self.task_ids is not None and task.get("id") not in self.task_ids:
+            return False
+        if self.statuses is not None and task.get("status") not in self.statuses:
+            return False
+        if (
+            self.name_contains
+            and self.name_contains not in task.get("name", "").lower()
+        ):
+            return False
+        return True
+
+    def matches_log(self, item: Any) -> bool:
+        if item.get("type") == "skipped":
+            return True
+        if self.levels and str(item.get("level", "")).upper() not in self.levels:
+            return False
+        if self.sources is not None and item.get("source") not in self.sources:
+            return False
+        if self.contains and self.contains not in item.get("message", "").lower():
+            return False
+        return True
+
+    def status_of(self, task: Dict) -> Dict[str, Any]:
+        data = {
+            field: task.get(field) for field in STATUS_FIELDS if field in self.fields
+        }
+        data["task_id"] = task.get("id")
+        return data
+
+    def snapshot_of(
+        self, task_id: str, snapshot: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """Fields of a collector snapshot, None if none are reported"""
+        data = {}
+        if "metrics" in self.fields:
+            data["metrics"] = snapshot.get("data")
+        if "analytics" in self.fields:
+            data["analytics"] = snapshot.get("analytics")
+        if not data:
+            return None
+        data["collected_at"] = snapshot.get("collected_at")
+        data["collect_error"] = snapshot.get("error")
+        data["task_id"] = task_id
+        return data
+
+
+class _Connection:
+    """A WebSocket client with its subscriptions and bounded outbox"""
+
+    def __init__(self, websocket: WebSocket, outbox_size: int):
+        self.websocket = websocket
+        # Slow clients lose their oldest messages behind a skipped marker
+        self.outbox = Subscription("websocket", outbox_size, "coalesce")
+        self.subscriptions: Dict[str, _TopicSubscription] = {}
+
+    def send(self, message: Dict[str, Any]):
+        self.outbox.offer(message)
+
+
+class WebSocketHub:
+    """Multiplex task logs, task status and the task list over one socket
+
+    Clients send JSON commands::
+
+        {"action": "subscribe", "id": "s1", "topic": "logs",
+         "filters": {"task_ids": ["..."], "levels": ["ERROR"]}}
+        {"action": "unsubscribe", "id": "s1"}
+        {"action": "ping"}
+
+    and receive ``subscribed``/``unsubscribed``/``error``/``pong`` replies and
+    ``event`` messages tagged with the subscription id. ``status`` and
+    ``tasks`` subscriptions start with a ``snapshot`` event and then receive
+    change events pushed from the task registry; ``status`` subscriptions
+    also receive a ``metrics`` event with each status collector snapshot.
+    ``logs`` subscriptions receive the live log lines of their tasks.
+    """
+
+    def __init__(self, task_service: TaskService, outbox_size: int = 1000):
+        self.task_service = task_service
+        self.outbox_size = outbox_size
+        self._connections: Set[_Connection] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        task_service.registry.add_listener(self._on_task_change)
+        task_service.status_collector.add_listener(self._on_snapshot)
+
+    async def serve(self, websocket: WebSocket):
+        """Run one client connection until it disconnects"""
+        await websocket.accept()
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        connection = _Connection(websocket, self.outbox_size)
+        self._connections.add(connection)
+        sender = asyncio.ensure_future(self._send_loop(connection))
+        try:
+            while True:
+                text = await websocket.receive_text()
+                try:
+                    command = json.loads(text)
+                    if not isinstance(command, dict):
+                        raise ValueError("command must be a JSON object")
+                    self._handle(connection, command)
+                except (ValueError, TypeError, AttributeError) as e:
+                    connection.send({"type": "error", "message": str(e)})
+        except Exception:
+            # Client disconnected
+            pass
+        finally:
+            self._connections.discard(connection)
+            for subscription in list(connection.subscriptions.values()):
+                self._close_subscription(subscription)
+            sender.cancel()
+
+    async def _send_loop(self, connection: _Connection):
+        try:
+            while True:
+                message = await connection.outbox.get()
+                await connection.websocket.send_text(json.dumps(message))
+        except Exception:
+            # Client disconnected, the receive loop cleans up
+            pass
+
+    def _handle(self, connection: _Connection, command: Dict[str, Any]):
+        action = command.get("action")
+        sub_id = str(command.get("id", ""))
+        if action == "ping":
+            connection.send({"type": "pong"})
+        elif action == "subscribe":
+            topic = command.get("topic")
+            if topic not in TOPICS:
+                raise ValueError(
+                    f"Unknown topic '{topic}', expected one of: {', '.join(TOPICS)}"
+                )
+            if not sub_id or sub_id in connection.subscriptions:
+                raise ValueError("subscribe needs a new subscription id")
+            subscription = _TopicSubscription(
+                sub_id, topic, command.get("filters") or {}
+            )
+            if topic == "logs" and not subscription.task_ids:
+                raise ValueError("logs subscriptions need task_ids")
+            connection.subscriptions[sub_id] = subscription
+            connection.send({"type": "subscribed", "id": sub_id, "topic": topic})
+            self._start(connection, subscription)
+        elif action == "unsubscribe":
+            subscription = connection.subscriptions.pop(sub_id, None)
+            if subscription is None:
+                raise ValueError(f"Unknown subscription '{sub_id}'")
+            self._close_subscription(subscription)
+            connection.send({"type": "unsubscribed", "id": sub_id})
+        else:
+            raise ValueError(f"Unknown action '{action}'")
+
+    def _start(self, connection: _Connection, subscription: _TopicSubscription):
+        tasks = [
+            task
+            for task in self.task_service.registry.all()
+            if subscription.matches_task(task)
+        ]
+        if subscription.topic == "tasks":
+            subscription.visible = {task["id"] for task in tasks}
+            self._send_event(connection, subscription, "snapshot", tasks)
+        elif subscription.topic == "status":
+            data = []
+            for task in tasks:
+                status = subscription.status_of(task)
+                snapshot = self.task_service.status_collector.get(task["id"])
+                if snapshot is not None:
+                    status.update(subscription.snapshot_of(task["id"], snapshot) or {})
+                data.append(status)
+            self._send_event(connection, subscription, "snapshot", data)
+        else:
+            for task_id in subscription.task_ids:
+                since = subscription.since.get(task_id)
+                subscription.pumps.append(
+                    asyncio.ensure_future(
+                        self._pump_logs(
+                            connection,
+                            subscription,
+                            task_id,
+                            int(since) if since is not None else None,
+                        )
+                    )
+                )
+
+    async def _pump_logs(
+        self,
+        connection: _Connection,
+        subscription: _TopicSubscription,
+        task_id: str,
+        since: Optional[int],
+    ):
+        """Forward the log lines of one task that pass the filters"""
+        log_subscription = await self.task_service.subscribe_to_logs(task_id, since)
+        subscription.log_subscriptions.append(log_subscription)
+        while True:
+            item = await log_subscription.get()
+            if subscription.matches_log(item):
+                data = item.to_dict() if hasattr(item, "to_dict") else dict(item)
+                data["task_id"] = task_id
+                self._send_event(connection, subscription, "log", data)
+
+    def _close_subscription(self, subscription: _TopicSubscription):
+        for pump in subscription.pumps:
+            pump.cancel()
+        for log_subscription in subscription.log_subscriptions:
+            self.task_service.unsubscribe_from_logs(log_subscription)
+
+    @staticmethod
+    def _send_event(
+        connection: _Connection,
+        subscription: _TopicSubscription,
+        event: str,
+        data: Any,
+    ):
+        connection.send(
+            {
+                "type": "event",
+                "id": subscription.id,
+                "topic": subscription.topic,
+                "event": event,
+                "data": data,
+            }
+        )
+
+    def _on_task_change(self, event: str, task: Dict, changes: Dict):
+        """Registry listener, may be called from any thread"""
+        if not self._connections or self._loop is None:
+            return
+        if threading.get_ident() == self._loop_thread:
+            self._dispatch(event, task, changes)
+        else:
+            self._loop.call_soon_threadsafe(self._dispatch, event, task, changes)
+
+    def _on_snapshot(self, task_id: str, snapshot: Dict[str, Any]):
+        """Status collector listener, may be called from any thread"""
+        if not self._connections or self._loop is None:
+            return
+        if threading.get_ident() == self._loop_thread:
+            self._dispatch_snapshot(task_id, snapshot)
+        else:
+            self._loop.call_soon_threadsafe(self._dispatch_snapshot, task_id, snapshot)
+
+    def _dispatch_snapshot(self, task_id: str, snapshot: Dict[str, Any]):
+        for connection in list(self._connections):
+            for subscription in connection.subscriptions.values():
+                if subscription.topic != "status":
+                    continue
+                if subscription.task_ids is not None and (
+                    task_id not in subscription.task_ids
+                ):
+                    continue
+                data = subscription.snapshot_of(task_id, snapshot)
+                if data is not None:
+                    self._send_event(connection, subscription, "metrics", data)
+
+    def _dispatch_task_list(
+        self,
+        connection: _Connection,
+        subscription: _TopicSubscription,
+        event: str,
+        task: Dict,
+    ):
+        """Keep a filtered task list in sync, tasks leave it when they stop
+        matching the filters"""
+        visible = subscription.visible
+        if event != "deleted" and subscription.matches_task(task):
+            if task["id"] not in visible:
+                event = "created"
+                visible.add(task["id"])
+            self._send_event(connection, subscription, event, task)
+        elif task["id"] in visible:
+            visible.discard(task["id"])
+            self._send_event(connection, subscription, "deleted", {"id": task["id"]})
+
+    def _dispatch(self, event: str, task: Dict, changes: Dict):
+        for connection in list(self._connections):
+            for subscription in connection.subscriptions.values():
+                if subscription.topic == "tasks":
+                    self._dispatch_task_list(connection, subscription, event, task)
+                elif subscription.topic == "status":
+                    if subscription.task_ids is not None and (
+                        task["id"] not in subscription.task_ids
+                    ):
+                        continue
+                    if event == "deleted":
+                        data = {"task_id": task["id"]}
+                    else:
+                        fields = subscription.fields.intersection(changes)
+                        if not fields:
+                            continue
+                        data = {field: changes[field] for field in fields}
+                        data["task_id"] = task["id"]
+                    self._send_event(connection, subscription, event, data)
@@ -0,0 +1,64 @@
+"""
+Tests for the live log broker
+"""
+
+import asyncio
+
+import pytest
+
+from app.services.log_broker import LogBroker
+
+
+def test_broker_coalesces_overflow():
+    """Test a full queue drops its oldest lines behind a skipped marker"""
+
+    async def run():
+        broker = LogBroker(maxsize=3)
+        slow = broker.subscribe("t1")
+        fast = broker.subscribe("t1", maxsize=10, policy="drop_oldest")
+        for i in range(5):
+            assert broker.publish("t1", {"message": f"line {i}"}) == 2
+
+        marker = await slow.get()
+        assert (marker["type"], marker["count"]) == ("skipped", 2)
+        assert [(await slow.get())["message"] for _ in range(3)] == [
+            "line 2",
+            "line 3",
+            "line 4",
+        ]
+        assert fast.lag == 5
+
+        stats = {s["policy"]: s for s in broker.stats("t1")}
+        assert stats["coalesce"]["dropped"] == 2
+        assert stats["coalesce"]["lag"] == 0
+        assert stats["drop_oldest"]["dropped"] == 0
+
+        # get() waits for the next published line
+        waiter = asyncio.ensure_future(slow.get())
+        await asyncio.sleep(0)
+        broker.publish("t1", {"message": "line 5"})
+        assert (await asyncio.wait_for(waiter, 1))["message"] == "line 5"
+
+        broker.unsubscribe(slow)
+        broker.unsubscribe(fast)
+        assert broker.publish("t1", {"message": "line 6"}) == 0
+        assert broker.stats() == []
+
+    asyncio.run(run())
+
+
+def test_broker_drop_oldest_without_marker():
+    """Test the drop_oldest policy only counts dropped lines"""
+
+    async def run():
+        broker = LogBroker(maxsize=2, policy="drop_oldest")
+        subscription = broker.subscribe("t1")
+        for i in range(4):
+            broker.publish("t1", i)
+        assert [subscription.get_nowait() for _ in range(3)] == [2, 3, None]
+        assert subscription.dropped == 2
+
+    asyncio.run(run())
+
+    with pytest.raises(ValueError):
+        LogBroker(policy="block")
@@ -0,0 +1,63 @@
+"""
+Tests for the live log ring buffer
+"""
+
+import pytest
+
+from app.services.log_buffer import LogRingBuffer
+
+
+def fill(buffer, count):
+    for i in range(count):
+        buffer.append(f"2025-01-01T00:00:{i:02d}", "INFO", f"line {i}", "stdout")
+
+
+def test_ring_buffer_overwrites_oldest():
+    """Test the buffer keeps the newest records with sequence numbers"""
+    buffer = LogRingBuffer(3)
+    fill(buffer, 5)
+
+    assert len(buffer) == 3
+    assert (buffer.first_seq, buffer.last_seq) == (3, 5)
+    records = list(buffer.snapshot())
+    assert [record.seq for record in records] == [3, 4, 5]
+    assert records[0]["message"] == "line 2"
+    assert records[0].get("source") == "stdout"
+    assert [record.seq for record in buffer.snapshot(since_seq=4)] == [5]
+
+    with pytest.raises(KeyError):
+        records[0]["missing"]
+
+
+def test_ring_buffer_snapshot_is_fixed_and_lazy():
+    """Test snapshots exclude later appends and skip overwritten records"""
+    buffer = LogRingBuffer(4)
+    fill(buffer, 2)
+    snapshot = buffer.snapshot()
+    fill(buffer, 1)
+    assert [record.seq for record in snapshot] == [1, 2]
+
+    snapshot = buffer.snapshot()
+    assert next(snapshot).seq == 1
+    fill(buffer, 3)  # Overwrites records 1 and 2
+    assert [record.seq for record in snapshot] == [3]
+
+
+def test_ring_buffer_resize():
+    """Test resizing keeps the newest records that fit"""
+    buffer = LogRingBuffer(5)
+    fill(buffer, 5)
+    buffer.resize(2)
+    assert [record.seq for record in buffer.snapshot()] == [4, 5]
+    fill(buffer, 1)
+    buffer.resize(4)
+    assert [record.seq for record in buffer.snapshot()] == [5, 6]
+
+
+def test_ring_buffer_continues_sequence():
+    """Test a buffer can continue the sequence of an earlier one"""
+    buffer = LogRingBuffer(3, last_seq=41)
+    assert len(buffer) == 0
+    assert list(buffer.snapshot()) == []
+    fill(buffer, 1)
+    assert (buffer.first_seq, buffer.last_seq, len(buffer)) == (42, 42, 1)
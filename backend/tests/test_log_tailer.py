@@ -0,0 +1,91 @@
+"""
+Tests for the log file tailer
+"""
+
+import asyncio
+import os
+
+import pytest
+
+from app.services.log_tailer import LogTailer
+
+
+async def wait_for(lines, count):
+    for _ in range(200):
+        if len(lines) >= count:
+            return
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.parametrize("use_inotify", [True, False])
+def test_log_tailer_follows_appends_and_rotation(tmp_path, use_inotify):
+    """Test new lines, truncation and rotation are picked up"""
+    log_file = tmp_path / "logs" / "task.log"
+
+    async def run():
+        tailer = LogTailer(poll_interval=0.02, use_inotify=use_inotify)
+        lines = []
+
+        async def on_line(line):
+            lines.append(line)
+
+        # The directory does not exist yet
+        tailer.watch(str(log_file), on_line)
+        await asyncio.sleep(0.05)
+        log_file.parent.mkdir()
+        with open(log_file, "w") as f:
+            f.write("first\nsec")
+        await wait_for(lines, 1)
+        with open(log_file, "a") as f:
+            f.write("ond\n")
+        await wait_for(lines, 2)
+
+        # Truncation restarts at the beginning of the file
+        with open(log_file, "w") as f:
+            f.write("third\n")
+        await wait_for(lines, 3)
+
+        # Rotation switches to the new file
+        os.rename(log_file, str(log_file) + ".1")
+        with open(log_file, "w") as f:
+            f.write("fourth\n")
+        await wait_for(lines, 4)
+
+        tailer.unwatch(str(log_file))
+        with open(log_file, "a") as f:
+            f.write("ignored\n")
+        await asyncio.sleep(0.05)
+        tailer.close()
+        return lines
+
+    assert asyncio.run(run()) == ["first", "second", "third", "fourth"]
+
+
+def test_log_tailer_resumes_from_position(tmp_path):
+    """Test following resumes after the last complete line of a previous run"""
+    log_file = tmp_path / "task.log"
+    log_file.write_text("first\nsecond\nthi")
+
+    async def run():
+        tailer = LogTailer(poll_interval=0.02, use_inotify=False)
+        lines = []
+
+        async def on_line(line):
+            lines.append(line)
+
+        tailer.watch(str(log_file), on_line)
+        await tailer.flush(str(log_file))
+        position = tailer.position(str(log_file))
+        tailer.close()
+
+        with open(log_file, "a") as f:
+            f.write("rd\nfourth\n")
+        resumed = LogTailer(poll_interval=0.02, use_inotify=False)
+        resumed.watch(str(log_file), on_line, position)
+        await resumed.flush(str(log_file))
+        resumed.close()
+        return lines, position
+
+    lines, position = asyncio.run(run())
+    assert position == (os.stat(log_file).st_ino, len("first\nsecond\n"))
+    assert lines == ["first", "second", "third", "fourth"]
@@ -0,0 +1,104 @@
+"""
+Tests for the batched log writer
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from app.repositories.sqlite_repository import SQLiteDatabase, SQLiteLogRepository
+from app.services.log_writer import LogWriter
+
+
+def make_log(task_id, index):
+    return {
+        "id": f"{task_id}-{index}",
+        "task_id": task_id,
+        "task_name": None,
+        "timestamp": f"2025-01-01T00:00:{index:02d}",
+        "level": "INFO",
+        "message": f"message {index}",
+        "source": "stdout",
+    }
+
+
+class FailingRepository(SQLiteLogRepository):
+    def append_many(self, logs, keep_per_task=None):
+        raise IOError("disk full")
+
+
+@pytest.fixture
+def sqlite_db(tmp_path):
+    db = SQLiteDatabase(str(tmp_path / "test.db"))
+    yield db
+    db.close()
+
+
+def test_log_writer_group_commit(sqlite_db):
+    """Test queued logs are written in batches sharing one future"""
+    repository = SQLiteLogRepository(sqlite_db)
+    writer = LogWriter(repository, flush_interval=60, batch_size=1000)
+
+    futures = [writer.submit(make_log("t1", i), keep_per_task=5) for i in range(10)]
+    assert len({id(future) for future in futures}) == 1
+    assert writer.metrics()["queue_depth"] == 10
+    assert repository.query() == []
+
+    writer.flush(timeout=5)
+    assert futures[0].result() == 10
+    assert [log["id"] for log in repository.query()] == [
+        f"t1-{i}" for i in range(9, 4, -1)
+    ]
+    metrics = writer.metrics()
+    assert metrics["queue_depth"] == 0
+    assert metrics["batches_flushed"] == 1
+    assert metrics["last_batch_size"] == 10
+    writer.close()
+
+
+def test_log_writer_awaitable_durability(sqlite_db):
+    """Test callers can await their batch and see write errors"""
+    writer = LogWriter(SQLiteLogRepository(sqlite_db), flush_interval=0.01)
+
+    async def write():
+        await asyncio.wrap_future(writer.submit(make_log("t1", 0)))
+
+    asyncio.run(write())
+    assert writer.metrics()["records_flushed"] == 1
+    writer.close()
+
+    failing = LogWriter(FailingRepository(sqlite_db), flush_interval=0.01)
+    with pytest.raises(IOError):
+        failing.submit(make_log("t1", 1)).result(timeout=5)
+    assert failing.metrics()["failed_batches"] == 1
+    failing.close()
+
+
+def test_log_writer_flush_async_keeps_loop_running(sqlite_db):
+    """Test awaiting a flush lets the event loop run during a slow commit"""
+
+    class SlowRepository(SQLiteLogRepository):
+        def append_many(self, logs, keep_per_task=None):
+            time.sleep(0.3)
+            super().append_many(logs, keep_per_task)
+
+    repository = SlowRepository(sqlite_db)
+    writer = LogWriter(repository, flush_interval=60)
+    ticks = []
+
+    async def ticker():
+        while True:
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.02)
+
+    async def run():
+        writer.submit(make_log("t1", 0))
+        ticking = asyncio.ensure_future(ticker())
+        await writer.flush_async()
+        ticking.cancel()
+
+    asyncio.run(run())
+    assert len(repository.query()) == 1
+    assert len(ticks) >= 5
+    writer.close()
@@ -0,0 +1,42 @@
+"""
+Tests for the task metrics time-series store
+"""
+
+import time
+
+from app.services.metrics_store import MetricsStore
+
+
+def test_metrics_store_rollups_and_query(tmp_path):
+    """Test samples roll up to minutes and queries downsample them"""
+    store = MetricsStore(str(tmp_path))
+    start = (int(time.time()) // 60 - 5) * 60  # Five minutes ago
+    for second in range(0, 180, 2):
+        store.record(
+            "t1",
+            {"read_count": second * 10, "read_ops": second, "cpu_percent": None},
+            timestamp=start + second,
+        )
+
+    # Raw points every 2 seconds
+    result = store.query("t1", start, start + 9, step=1)
+    assert result["resolution"] == 1
+    assert result["timestamps"] == [start, start + 2, start + 4, start + 6, start + 8]
+    assert result["series"]["read_ops"] == [0, 2, 4, 6, 8]
+    assert result["series"]["cpu_percent"] == [None] * 5
+
+    # Minute rollups: counters keep their last value, rates their mean
+    result = store.query("t1", start, start + 179, step=60)
+    assert result["resolution"] == 60
+    assert result["timestamps"] == [start, start + 60, start + 120]
+    assert result["series"]["read_count"] == [580, 1180, 1780]
+    assert result["series"]["read_ops"] == [29, 89, 149]
+
+    # Rollups are persisted and loaded back
+    store.flush()
+    reloaded = MetricsStore(str(tmp_path))
+    result = reloaded.query("t1", start, start + 119, step=60)
+    assert result["series"]["read_count"] == [580, 1180]
+
+    reloaded.remove("t1")
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,98 @@
+"""
+Tests for the status port allocator
+"""
+
+import json
+import socket
+
+import pytest
+
+from app.services.port_allocator import PortAllocator
+
+
+def _free_range(size):
+    """A range of currently free ports"""
+    for _ in range(20):
+        with socket.socket() as sock:
+            sock.bind(("", 0))
+            start = sock.getsockname()[1]
+        ports = range(start, start + size)
+        if start + size < 65536 and all(PortAllocator.is_free(p) for p in ports):
+            return start, start + size - 1
+    pytest.skip("No free port range")
+
+
+def test_allocator_leases_distinct_ports_and_persists(tmp_path):
+    """Test tasks get distinct ports which survive a restart"""
+    lease_file = str(tmp_path / "leases.json")
+    start, end = _free_range(3)
+    allocator = PortAllocator(lease_file, start, end)
+
+    ports = [allocator.acquire(f"t{index}") for index in range(3)]
+    assert sorted(ports) == [start, start + 1, start + 2]
+    with pytest.raises(ValueError):
+        allocator.acquire("t3")
+
+    restarted = PortAllocator(lease_file, start, end)
+    assert restarted.acquire("t1") == ports[1]
+    restarted.release("t1")
+    restarted.retain(["t0"])
+    assert json.loads((tmp_path / "leases.json").read_text()) == {"t0": ports[0]}
+
+
+def test_allocator_skips_bound_ports(tmp_path):
+    """Test ports other processes listen on are not leased"""
+    start, end = _free_range(2)
+    allocator = PortAllocator(str(tmp_path / "leases.json"), start, end)
+    with socket.socket() as sock:
+        sock.bind(("", start))
+        sock.listen()
+
+        assert allocator.acquire("t0") == start + 1
+        with pytest.raises(ValueError):
+            allocator.acquire("t1", requested=start)
+        with pytest.raises(ValueError):
+            allocator.acquire("t1", requested=start + 1)  # Leased to t0
+
+
+def test_dead_process_found_by_status_query_returns_its_lease(tmp_path, monkeypatch):
+    """Test a task whose process died unnoticed is stopped and frees its port"""
+    import asyncio
+    from types import SimpleNamespace
+
+    from app.repositories.json_repository import JsonTaskRepository
+    from app.services.task_registry import TaskRegistry
+    from app.services.task_service import TaskService
+
+    start, end = _free_range(1)
+    service = TaskService()
+    registry = TaskRegistry(
+        JsonTaskRepository(str(tmp_path / "sync_tasks.json")), flush_delay=60
+    )
+    allocator = PortAllocator(str(tmp_path / "leases.json"), start, end)
+    monkeypatch.setattr(service, "registry", registry)
+    monkeypatch.setattr(service, "port_allocator", allocator)
+    monkeypatch.setattr(
+        service, "log_service", SimpleNamespace(add_log=lambda *a, **k: None)
+    )
+    monkeypatch.setattr(
+        service.process_sampler, "get", lambda task_id: {"pid": 4242, "alive": False}
+    )
+    registry.insert(
+        {
+            "id": "dead",
+            "name": "dead",
+            "custom_config": "",
+            "status": "running",
+            "created_at": "2025-01-01T00:00:00",
+            "process_id": 4242,
+        }
+    )
+    allocator.assign("dead", start)
+
+    status = asyncio.run(service.get_task_status("dead"))
+
+    # Its exit status is unknown, so it is not counted as a failure
+    assert status["status"] == "stopped"
+    assert allocator.get("dead") is None
+    assert registry.get("dead")["error_message"]
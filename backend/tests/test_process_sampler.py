@@ -0,0 +1,49 @@
+"""
+Tests for the background process sampler
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+from types import SimpleNamespace
+
+from app.repositories.json_repository import JsonTaskRepository
+from app.services.process_sampler import ProcessSampler
+from app.services.task_registry import TaskRegistry
+
+
+def test_process_sampler_keeps_handles(tmp_path):
+    """Test CPU is measured from the second sample and exits are reported"""
+    registry = TaskRegistry(
+        JsonTaskRepository(str(tmp_path / "sync_tasks.json")), flush_delay=60
+    )
+    exited = subprocess.Popen([sys.executable, "-c", "pass"])
+    exited.wait()
+    registry.insert(
+        {"id": "t1", "name": "a", "status": "running", "process_id": os.getpid()}
+    )
+    registry.insert(
+        {"id": "t2", "name": "b", "status": "running", "process_id": exited.pid}
+    )
+    registry.insert({"id": "t3", "name": "c", "status": "stopped"})
+    sampler = ProcessSampler(SimpleNamespace(registry=registry))
+
+    async def run():
+        await sampler.sample_once()
+        first = sampler.get("t1")
+        assert first["alive"] and first["cpu_percent"] is None
+        assert first["rss_bytes"] > 0 and first["num_threads"] >= 1
+        assert sampler.get("t2")["alive"] is False
+        assert sampler.get("t3") is None
+
+        await sampler.sample_once()
+        assert sampler.get("t1")["cpu_percent"] is not None
+
+        # Stopped tasks are dropped with their handles
+        registry.update("t1", {"status": "stopped"})
+        await sampler.sample_once()
+        assert sampler.get("t1") is None
+        assert sampler._handles == {}
+
+    asyncio.run(run())
@@ -0,0 +1,86 @@
+"""
+Tests for the Prometheus metrics exporter
+"""
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.prometheus import Exposition, LatencyHistogram
+
+
+def test_latency_histogram_exposition():
+    """Test histogram buckets are cumulative and labels are escaped"""
+    histogram = LatencyHistogram(buckets=(0.1, 1.0))
+    histogram.observe("GET", '/a"b', 200, 0.05)
+    histogram.observe("GET", '/a"b', 200, 0.5)
+    histogram.observe("GET", '/a"b', 200, 5)
+
+    out = Exposition()
+    histogram.export(out, "latency_seconds", "Latency")
+    lines = out.render().splitlines()
+    labels = 'method="GET",route="/a\\"b",status="200"'
+    assert lines[:2] == [
+        "# HELP latency_seconds Latency",
+        "# TYPE latency_seconds histogram",
+    ]
+    assert f'latency_seconds_bucket{{le="0.1",{labels}}} 1' in lines
+    assert f'latency_seconds_bucket{{le="1.0",{labels}}} 2' in lines
+    assert f'latency_seconds_bucket{{le="+Inf",{labels}}} 3' in lines
+    assert f"latency_seconds_count{{{labels}}} 3" in lines
+
+
+def test_metrics_endpoint():
+    """Test /metrics reports tasks and labels requests by route template"""
+    with TestClient(app) as client:
+        client.get("/api/v1/tasks/missing-task")
+        # A parameter equal to a literal segment of the path
+        client.get("/api/v1/logs/task/logs")
+        response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    text = response.text
+    assert "# TYPE redis_shake_task_status gauge" in text
+    assert "# TYPE redis_shake_log_writer_records_total counter" in text
+    assert (
+        'redis_shake_web_request_duration_seconds_count{method="GET",'
+        'route="/api/v1/tasks/{task_id}",status="404"}'
+    ) in text
+    assert (
+        'redis_shake_web_request_duration_seconds_count{method="GET",'
+        'route="/api/v1/logs/task/{task_id}",status="200"}'
+    ) in text
+
+
+def test_log_lines_counter_counts_distributed_lines():
+    """Test the log line counter does not follow resumed sequence numbers"""
+    import asyncio
+
+    from app.services.log_buffer import LogRingBuffer
+    from app.services.prometheus import render_metrics
+    from app.services.task_service import TaskService
+
+    service = TaskService()
+    # Sequence numbers continue after those reserved before a restart
+    service.log_buffers["prom-task"] = LogRingBuffer(10, last_seq=1000)
+    service._reserved_log_seqs["prom-task"] = 2000
+    try:
+        for index in range(3):
+            asyncio.run(
+                service._distribute_log(
+                    "prom-task",
+                    {
+                        "timestamp": "2025-01-01T00:00:00",
+                        "level": "INFO",
+                        "message": f"line {index}",
+                        "source": "redis-shake",
+                    },
+                )
+            )
+        text = render_metrics(service, LatencyHistogram())
+    finally:
+        service.log_buffers.pop("prom-task", None)
+        service._reserved_log_seqs.pop("prom-task", None)
+        service.log_line_counts.pop("prom-task", None)
+
+    assert 'redis_shake_task_log_lines_total{task_id="prom-task"} 3' in text
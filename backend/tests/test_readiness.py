@@ -0,0 +1,177 @@
+"""
+Tests for the readiness probe of started processes
+"""
+
+import asyncio
+import socket
+import sys
+import time
+
+from app.services.readiness import ReadinessProbe
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("localhost", 0))
+        return sock.getsockname()[1]
+
+
+async def _spawn(code: str) -> asyncio.subprocess.Process:
+    return await asyncio.create_subprocess_exec(
+        sys.executable,
+        "-c",
+        code,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+
+
+def test_ready_when_status_port_accepts_connections():
+    """Test the probe returns once the status port listens"""
+    port = _free_port()
+
+    async def run():
+        process = await _spawn(
+            "import socket, time\n"
+            "time.sleep(0.3)\n"
+            "sock = socket.socket()\n"
+            f"sock.bind(('localhost', {port}))\n"
+            "sock.listen()\n"
+            "time.sleep(10)\n"
+        )
+        try:
+            return await ReadinessProbe(process, port, deadline=5).wait()
+        finally:
+            process.kill()
+            await process.wait()
+
+    result = asyncio.run(run())
+
+    assert result["ready"] is True
+    assert result["reason"] == "status_port"
+    assert 300 <= result["elapsed_ms"] < 5000
+
+
+def test_ready_on_matching_log_line():
+    """Test a matching log line marks the process as ready"""
+
+    async def run():
+        process = await _spawn("import time\ntime.sleep(10)\n")
+        probe = ReadinessProbe(process, None, log_pattern=r"start syncing", deadline=5)
+        asyncio.get_running_loop().call_later(
+            0.1, probe.on_log_line, "rdb: start syncing"
+        )
+        try:
+            return await probe.wait()
+        finally:
+            process.kill()
+            await process.wait()
+
+    result = asyncio.run(run())
+
+    assert result["ready"] is True
+    assert result["reason"] == "log"
+
+
+def test_fails_fast_when_process_exits():
+    """Test an exiting process ends the wait before the deadline"""
+
+    async def run():
+        process = await _spawn("import sys\nsys.exit(3)\n")
+        return await ReadinessProbe(process, _free_port(), deadline=30).wait()
+
+    result = asyncio.run(run())
+
+    assert result["ready"] is False
+    assert result["reason"] == "exited"
+    assert result["elapsed_ms"] < 5000
+
+
+def test_times_out_when_never_ready():
+    """Test the probe gives up after the deadline"""
+
+    async def run():
+        process = await _spawn("import time\ntime.sleep(10)\n")
+        try:
+            return await ReadinessProbe(process, _free_port(), deadline=0.3).wait()
+        finally:
+            process.kill()
+            await process.wait()
+
+    result = asyncio.run(run())
+
+    assert result["ready"] is False
+    assert result["reason"] == "timeout"
+
+
+STALE_LOG_SHAKE = """#!{python}
+import json, os, sys, time
+log_dir = os.path.join(os.path.dirname(sys.argv[1]), "logs")
+time.sleep(0.5)
+with open(os.path.join(log_dir, "task_stale.log"), "a") as log:
+    log.write(json.dumps({{"level": "info", "message": "start syncing..."}}) + "\\n")
+time.sleep(30)
+"""
+
+
+def test_stale_log_lines_do_not_mark_a_new_process_ready(tmp_path, monkeypatch):
+    """Test a restarted task only becomes ready on lines of its new process"""
+    from app.core.config import settings
+    from app.models.schemas import SyncTask
+    from app.services.log_tailer import LogTailer
+    from app.services.task_service import TaskService
+
+    binary = tmp_path / "redis-shake"
+    binary.write_text(STALE_LOG_SHAKE.format(python=sys.executable))
+    binary.chmod(0o755)
+    monkeypatch.setattr(settings, "redis_shake_bin_path", str(binary))
+    monkeypatch.setattr(settings, "redis_shake_data_dir", str(tmp_path / "data"))
+    monkeypatch.setattr(settings, "task_ready_timeout", 5.0)
+    service = TaskService()
+    # A watcher bound to this test's event loop
+    monkeypatch.setattr(service, "log_tailer", LogTailer(poll_interval=0.05))
+    task = SyncTask(id="stale", name="stale", custom_config="")
+
+    # Left behind by the previous run of the task
+    log_path = service._get_task_log_file_path(task.id)
+    (tmp_path / "data" / "task_stale" / "logs").mkdir(parents=True)
+    with open(log_path, "w") as log:
+        log.write('{"level": "info", "message": "start syncing..."}\n')
+
+    async def run():
+        spawned = await service._spawn_process(task, _free_port(), time.perf_counter())
+        process = spawned["process"]
+        service.process_streams[task.id]["stopping"] = True
+        process.kill()
+        await process.wait()
+        await service.process_streams[task.id]["reader"]
+        service.log_tailer.close()
+        return spawned
+
+    try:
+        spawned = asyncio.run(run())
+    finally:
+        service.log_buffers.pop(task.id, None)
+
+    assert spawned["ready"] is True
+    assert spawned["timings"]["ready_by"] == "log"
+    assert spawned["timings"]["ready_ms"] >= 500
+
+
+def test_default_pattern_needs_the_ready_message():
+    """Test the default pattern ignores other lines mentioning readiness"""
+    from app.core.config import settings
+
+    async def run():
+        process = await _spawn("import time\ntime.sleep(10)\n")
+        probe = ReadinessProbe(
+            process, None, log_pattern=settings.task_ready_log_pattern, deadline=0.3
+        )
+        probe.on_log_line("writer not ready, retrying")
+        try:
+            return await probe.wait()
+        finally:
+            process.kill()
+            await process.wait()
+
+    assert asyncio.run(run())["reason"] == "timeout"
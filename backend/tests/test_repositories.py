@@ -0,0 +1,253 @@
+"""
+Tests for the storage repositories
+"""
+
+import pytest
+
+from app.repositories.json_repository import JsonLogRepository, JsonTaskRepository
+from app.repositories.migrate import migrate_logs, migrate_tasks
+from app.repositories.segment_repository import SegmentLogRepository
+from app.repositories.sqlite_repository import (
+    SQLiteDatabase,
+    SQLiteLogRepository,
+    SQLiteTaskRepository,
+)
+
+
+def make_log(task_id, index, level="INFO", message=None):
+    return {
+        "id": f"{task_id}-{index}",
+        "task_id": task_id,
+        "task_name": None,
+        "timestamp": f"2025-01-01T00:00:{index:02d}",
+        "level": level,
+        "message": message or f"message {index}",
+        "source": "system",
+    }
+
+
+@pytest.fixture
+def sqlite_db(tmp_path):
+    db = SQLiteDatabase(str(tmp_path / "test.db"))
+    yield db
+    db.close()
+
+
+def test_sqlite_task_repository_row_updates(sqlite_db):
+    """Test only changed and deleted rows are written"""
+    repo = SQLiteTaskRepository(sqlite_db)
+    tasks = [{"id": "t1", "name": "first"}, {"id": "t2", "name": "second"}]
+    repo.save_changes(tasks, ["t1", "t2"], [])
+
+    tasks[0]["status"] = "running"
+    repo.save_changes(tasks, ["t1"], [])
+    repo.save_changes(tasks[:1], [], ["t2"])
+
+    assert repo.load_all() == [{"id": "t1", "name": "first", "status": "running"}]
+
+
+def test_sqlite_log_repository_queries(sqlite_db):
+    """Test indexed log queries, search and per-task limit"""
+    repo = SQLiteLogRepository(sqlite_db)
+    repo.append_many([make_log("t1", i) for i in range(10)], keep_per_task=5)
+    repo.append(make_log("t1", 10, level="ERROR", message="connection 100% lost"))
+    repo.append(dict(make_log("t2", 0), seq=7))
+
+    assert repo.query(task_id="t2")[0]["seq"] == 7
+    logs = repo.query(limit=3, task_id="t1")
+    assert [log["id"] for log in logs] == ["t1-10", "t1-9", "t1-8"]
+    assert [log["id"] for log in repo.query(level="error")] == ["t1-10"]
+    assert len(repo.query(task_id="t1")) == 6
+    assert [log["id"] for log in repo.search("100%")] == ["t1-10"]
+    assert repo.search("10_%") == []
+
+    assert repo.delete_by_task("t1") is True
+    assert [log["id"] for log in repo.query()] == ["t2-0"]
+
+
+def test_migrate_json_to_sqlite(tmp_path, sqlite_db):
+    """Test migrating tasks and logs from the legacy JSON backend"""
+    json_tasks = JsonTaskRepository(str(tmp_path / "sync_tasks.json"))
+    json_tasks.save_changes([{"id": "t1", "name": "first"}], ["t1"], [])
+    json_logs = JsonLogRepository(str(tmp_path / "task_logs.json"))
+    json_logs.append_many([make_log("t1", i) for i in range(3)])
+
+    sqlite_tasks = SQLiteTaskRepository(sqlite_db)
+    sqlite_logs = SQLiteLogRepository(sqlite_db)
+    assert migrate_tasks(json_tasks, sqlite_tasks) == 1
+    assert migrate_tasks(json_tasks, sqlite_tasks) == 0
+    assert migrate_logs(json_logs, sqlite_logs, batch_size=2) == 3
+
+    assert sqlite_tasks.load_all() == [{"id": "t1", "name": "first"}]
+    assert [log["id"] for log in sqlite_logs.query()] == ["t1-2", "t1-1", "t1-0"]
+
+
+@pytest.fixture
+def segment_repo(tmp_path):
+    repo = SegmentLogRepository(
+        str(tmp_path / "segments"), max_segment_bytes=512, compaction_interval=3600
+    )
+    yield repo
+    repo.close()
+
+
+def test_segment_repository_appends_and_rolls(tmp_path, segment_repo):
+    """Test appends roll segments and survive a reopen"""
+    for i in range(20):
+        segment_repo.append(make_log("t1", i, level="ERROR" if i % 5 == 0 else "INFO"))
+    segment_repo.append(make_log("t2", 0, message="Connection refused"))
+
+    assert len(list((tmp_path / "segments").glob("segment-*.jsonl"))) > 1
+    assert [log["id"] for log in segment_repo.query(limit=2)] == ["t2-0", "t1-19"]
+    assert [log["id"] for log in segment_repo.query(level="error", task_id="t1")] == [
+        "t1-15",
+        "t1-10",
+        "t1-5",
+        "t1-0",
+    ]
+    assert [log["id"] for log in segment_repo.search("refused")] == ["t2-0"]
+    segment_repo.close()
+
+    reopened = SegmentLogRepository(str(tmp_path / "segments"))
+    assert len(reopened.query(task_id="t1")) == 20
+    reopened.close()
+
+
+def test_segment_repository_compaction(segment_repo):
+    """Test compaction enforces the per-task limit and task deletion"""
+    segment_repo.append_many([make_log("t1", i) for i in range(30)], keep_per_task=10)
+    segment_repo.append_many([make_log("t2", i) for i in range(5)])
+    assert segment_repo.delete_by_task("t2") is True
+    assert segment_repo.query(task_id="t2") == []
+
+    segment_repo.compact()
+    ids = [log["id"] for log in segment_repo.iter_all()]
+    assert ids == [f"t1-{i}" for i in range(20, 30)]
+    assert segment_repo.delete_by_task("t2") is False
+
+
+def test_segment_repository_keeps_the_limit_across_a_restart(tmp_path):
+    """Test the per-task limit is enforced by compaction after a reopen"""
+    directory = str(tmp_path / "segments")
+    repo = SegmentLogRepository(directory, max_segment_bytes=512)
+    repo.append_many([make_log("t1", i) for i in range(5)], keep_per_task=10)
+    repo.close()
+
+    reopened = SegmentLogRepository(directory, max_segment_bytes=512)
+    reopened.append_many([make_log("t1", i) for i in range(5, 30)])
+    reopened.compact()
+    ids = [log["id"] for log in reopened.iter_all()]
+    assert ids == [f"t1-{i}" for i in range(20, 30)]
+    reopened.close()
+
+
+def test_segment_repository_offset_index(tmp_path, segment_repo):
+    """Test indexed queries stay correct across compaction and reopen"""
+    for i in range(30):
+        segment_repo.append(
+            make_log("t1" if i % 2 else "t2", i, level="ERROR" if i % 3 else "INFO"),
+            keep_per_task=5,
+        )
+    segment_repo.compact()
+
+    assert [log["id"] for log in segment_repo.query(limit=3)] == [
+        "t1-29",
+        "t2-28",
+        "t1-27",
+    ]
+    assert [log["id"] for log in segment_repo.query(task_id="t1", level="info")] == [
+        "t1-27",
+        "t1-21",
+    ]
+    # Older INFO logs (e.g. t2-18) were dropped by the per-task limit
+    assert [log["id"] for log in segment_repo.query(limit=4, level="INFO")] == [
+        "t1-27",
+        "t2-24",
+        "t1-21",
+    ]
+    segment_repo.close()
+
+    # A lost sidecar is rebuilt from its segment on reopen
+    for index_file in (tmp_path / "segments").glob("*.idx"):
+        index_file.unlink()
+    reopened = SegmentLogRepository(str(tmp_path / "segments"))
+    assert [log["id"] for log in reopened.query(limit=2, task_id="t2")] == [
+        "t2-28",
+        "t2-26",
+    ]
+    reopened.close()
+
+
+def test_segment_repository_search(tmp_path, segment_repo):
+    """Test indexed search with term, task, level and time filters"""
+    for i in range(30):
+        message = f"Sync error on shard {i % 3}" if i % 2 else f"sync ok {i}"
+        segment_repo.append(
+            make_log(
+                "t1" if i < 20 else "t2",
+                i,
+                level="ERROR" if i % 2 else "INFO",
+                message=message,
+            )
+        )
+
+    ids = [log["id"] for log in segment_repo.search("ERROR shard", limit=3)]
+    assert ids == ["t2-29", "t2-27", "t2-25"]
+    assert [
+        log["id"] for log in segment_repo.search("error shard 1", task_id="t1")
+    ] == [
+        "t1-19",
+        "t1-13",
+        "t1-7",
+        "t1-1",
+    ]
+    assert [
+        log["id"] for log in segment_repo.search("sync", level="info", limit=2)
+    ] == [
+        "t2-28",
+        "t2-26",
+    ]
+    ids = [
+        log["id"]
+        for log in segment_repo.search(
+            "shard",
+            start_time="2025-01-01T00:00:10",
+            end_time="2025-01-01T00:00:15",
+        )
+    ]
+    assert ids == ["t1-15", "t1-13", "t1-11"]
+    assert segment_repo.search("missing") == []
+
+    # Postings follow compaction and task deletion, and survive a reopen
+    segment_repo.delete_by_task("t2")
+    assert segment_repo.search("shard", limit=1)[0]["id"] == "t1-19"
+    segment_repo.compact()
+    segment_repo.close()
+    reopened = SegmentLogRepository(str(tmp_path / "segments"))
+    assert [log["id"] for log in reopened.search("shard 2", limit=2)] == [
+        "t1-17",
+        "t1-11",
+    ]
+    reopened.close()
+
+
+def test_segment_repository_search_matches_substrings(segment_repo):
+    """Test indexed search keeps the substring semantics of the other backends"""
+    messages = [
+        "connect to 10.0.0.127:1 ok",
+        "Connection refused by 127.0.0.1",
+        "reconnecting to 127.0.0.10 :: retry",
+    ]
+    for index, message in enumerate(messages):
+        segment_repo.append(make_log("t1", index, message=message))
+
+    def search(keyword):
+        return [log["id"] for log in segment_repo.search(keyword)]
+
+    assert search("127.0.0.1") == ["t1-2", "t1-1"]
+    assert search("127.0.0.1 refused") == ["t1-1"]
+    assert search("connect") == ["t1-2", "t1-1", "t1-0"]
+    assert search("CONN") == ["t1-2", "t1-1", "t1-0"]
+    assert search("0.127:") == ["t1-0"]
+    assert search("::") == ["t1-2"]
+    assert search("ok connection") == []
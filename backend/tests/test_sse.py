@@ -0,0 +1,128 @@
+"""
+Tests for the pre-encoded live log stream
+"""
+
+import json
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.log_buffer import LogRingBuffer
+from app.services.sse import encode_event, encode_log_event, to_frame
+
+
+def test_encode_log_event_with_id():
+    """Test log lines are encoded once into complete SSE frames"""
+    buffer = LogRingBuffer(10)
+    record = buffer.append("2025-01-01T00:00:00", "INFO", "hello", "stdout")
+    frame = encode_log_event("t1", record, record.seq)
+
+    assert frame.endswith(b"\n\n")
+    data_line, id_line = frame.decode().strip().split("\n")
+    assert id_line == "id: 1"
+    assert json.loads(data_line[len("data: ") :]) == {
+        "type": "log",
+        "timestamp": "2025-01-01T00:00:00",
+        "level": "INFO",
+        "message": "hello",
+        "source": "stdout",
+        "task_id": "t1",
+    }
+    record.frame = frame
+    assert to_frame("t1", record) is frame
+    assert encode_event({"type": "heartbeat"}) == b'data: {"type": "heartbeat"}\n\n'
+
+
+def test_stream_unknown_task():
+    """Test the stream reports a missing task and ends"""
+    client = TestClient(app)
+    response = client.get("/api/v1/logs/task/missing/stream")
+    events = [
+        json.loads(line[len("data: ") :])
+        for line in response.text.split("\n")
+        if line.startswith("data: ")
+    ]
+    assert [event["type"] for event in events] == ["connected", "error"]
+
+
+def event_ids(items):
+    frames = [to_frame("replay", item) for item in items]
+    return [
+        frame.decode().split("\nid: ")[1].strip() if b"\nid: " in frame else "-"
+        for frame in frames
+    ]
+
+
+def test_replay_after_last_event_id(monkeypatch):
+    """Test a resumed stream only replays missed lines, older ones from storage"""
+    from app.models.schemas import TaskLog
+    from app.services.task_service import TaskService
+
+    service = TaskService()
+    buffer = LogRingBuffer(3, last_seq=10)
+    for i in range(5):  # Lines 11-15, the buffer keeps 13-15
+        record = buffer.append("2025-01-01T00:00:00", "INFO", f"line {i}", "stdout")
+        record.frame = encode_log_event("replay", record, record.seq)
+    monkeypatch.setitem(service.log_buffers, "replay", buffer)
+
+    persisted = [
+        TaskLog(
+            task_id="replay",
+            timestamp="2025-01-01T00:00:00",
+            level="INFO",
+            message="stored",
+            seq=seq,
+        )
+        for seq in (9, 12)
+    ]
+
+    def replay(since):
+        stored = [log for log in persisted if since is not None and log.seq > since]
+        return service._replay_items("replay", since, stored)
+
+    assert event_ids(replay(13)) == ["14", "15"]
+    assert event_ids(replay(None)) == ["13", "14", "15"]
+    assert event_ids(replay(99)) == ["13", "14", "15"]
+    # Line 11 was not persisted and is reported as skipped
+    frames = replay(10)
+    assert event_ids(frames) == ["-", "12", "13", "14", "15"]
+    assert frames[0]["count"] == 1
+
+
+def test_sequence_numbers_survive_a_crash(tmp_path, monkeypatch):
+    """Test log file lines, which are not persisted, keep their numbers unique
+    when the server dies without a clean shutdown"""
+    import asyncio
+
+    from app.core.config import settings
+    from app.repositories.json_repository import JsonTaskRepository
+    from app.services.task_registry import TaskRegistry
+    from app.services.task_service import TaskService
+
+    service = TaskService()
+    repository = JsonTaskRepository(str(tmp_path / "sync_tasks.json"))
+    registry = TaskRegistry(repository, flush_delay=60)
+    registry.insert({"id": "restart", "name": "restart", "status": "running"})
+    monkeypatch.setattr(service, "registry", registry)
+    monkeypatch.setattr(settings, "log_seq_reserve_block", 2)
+
+    async def log(message):
+        await service._handle_log_file_line("restart", message)
+
+    try:
+        for i in range(3):
+            asyncio.run(log(f"before {i}"))
+
+        # A new server instance, nothing was flushed on the way out
+        service.log_buffers.pop("restart")
+        monkeypatch.setattr(
+            service, "registry", TaskRegistry(repository, flush_delay=60)
+        )
+        asyncio.run(log("after"))
+        buffer = service.log_buffers["restart"]
+        # Lines 1-3 were handed out, 4 was reserved but not used
+        assert [record.seq for record in buffer.snapshot()] == [5]
+        assert event_ids(service._replay_items("restart", 3))[-1] == "5"
+    finally:
+        service.log_buffers.pop("restart", None)
+        service._reserved_log_seqs.pop("restart", None)
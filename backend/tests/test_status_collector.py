@@ -0,0 +1,126 @@
+"""
+Tests for the background realtime status collector
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+from aiohttp import web
+
+from app.repositories.json_repository import JsonTaskRepository
+from app.services.metrics_store import MetricsStore
+from app.services.process_sampler import ProcessSampler
+from app.services.status_collector import StatusCollector
+from app.services.task_registry import TaskRegistry
+
+
+def test_status_collector_caches_and_throttles_counters(tmp_path):
+    """Test running tasks are scraped into the cache over one session and
+    counters are persisted only every persist interval"""
+    registry = TaskRegistry(
+        JsonTaskRepository(str(tmp_path / "sync_tasks.json")), flush_delay=60
+    )
+    metrics_store = MetricsStore(str(tmp_path / "metrics"))
+    task_service = SimpleNamespace(registry=registry, metrics_store=metrics_store)
+    task_service.process_sampler = ProcessSampler(task_service)
+    requests = []
+
+    async def handle(request):
+        requests.append(request)
+        count = len(requests)
+        return web.json_response(
+            {"total_entries_count": {"read_count": count * 10, "write_count": count}}
+        )
+
+    async def run():
+        app = web.Application()
+        app.router.add_get("/", handle)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "localhost", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+
+        registry.insert({"id": "t1", "name": "a", "status": "running"})
+        registry.update("t1", {"status_port": port})
+        registry.insert({"id": "t2", "name": "b", "status": "stopped"})
+
+        collector = StatusCollector(task_service, interval=60, persist_interval=60)
+        try:
+            await collector.collect_once()
+            await collector.collect_once()
+            assert len(requests) == 2
+            snapshot = collector.get("t1")
+            assert snapshot["data"]["total_entries_count"]["write_count"] == 2
+            assert collector.get("t2") is None
+            history = metrics_store.query("t1", time.time() - 60, time.time())
+            assert history["series"]["write_count"][-1] == 2
+            # Not persisted yet
+            assert registry.get("t1").get("processed_keys") is None
+
+            collector.persist_counters()
+            assert registry.get("t1")["processed_keys"] == 2
+            assert registry.get("t1")["total_keys"] == 20
+
+            # Stopped tasks are dropped from the cache
+            registry.update("t1", {"status": "stopped"})
+            await collector.collect_once()
+            assert collector.get("t1") is None
+        finally:
+            await collector.stop()
+            await runner.cleanup()
+
+    asyncio.run(run())
+
+
+def test_status_collector_times_out_slow_tasks(tmp_path):
+    """Test a hanging status port fails on its own without delaying others"""
+    registry = TaskRegistry(
+        JsonTaskRepository(str(tmp_path / "sync_tasks.json")), flush_delay=60
+    )
+    task_service = SimpleNamespace(
+        registry=registry, metrics_store=MetricsStore(str(tmp_path / "metrics"))
+    )
+
+    async def fast(request):
+        return web.json_response({"consistent": True})
+
+    async def slow(request):
+        await asyncio.sleep(1)
+        return web.json_response({})
+
+    async def run():
+        app = web.Application()
+        app.router.add_get("/", fast)
+        slow_app = web.Application()
+        slow_app.router.add_get("/", slow)
+        runners, ports = [], []
+        for application in (app, slow_app):
+            runner = web.AppRunner(application)
+            await runner.setup()
+            site = web.TCPSite(runner, "localhost", 0)
+            await site.start()
+            runners.append(runner)
+            ports.append(site._server.sockets[0].getsockname()[1])
+
+        collector = StatusCollector(task_service, timeout=0.2, max_concurrency=2)
+        try:
+            started = time.monotonic()
+            fast_snapshot, slow_snapshot = await asyncio.gather(
+                collector.get_fresh("fast", ports[0]),
+                collector.get_fresh("slow", ports[1]),
+            )
+            assert time.monotonic() - started < 2
+            assert fast_snapshot["data"] == {"consistent": True}
+            assert slow_snapshot["data"] is None
+            assert slow_snapshot["error"]
+
+            # Fresh snapshots are served from the cache
+            assert await collector.get_fresh("fast", ports[0]) is fast_snapshot
+        finally:
+            await collector.stop()
+            for runner in runners:
+                await runner.cleanup()
+
+    asyncio.run(run())
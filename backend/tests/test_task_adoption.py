@@ -0,0 +1,234 @@
+"""
+Tests for adopting task processes that survived a restart
+"""
+
+import asyncio
+import os
+import sys
+
+from app.core.config import settings
+from app.models.schemas import SyncTask, TaskStatus
+from app.services.task_service import TaskService
+
+FAKE_SHAKE = """#!{python}
+import sys, time
+print("adopted line", flush=True)
+time.sleep(30)
+"""
+
+
+def make_task(service, tmp_path, monkeypatch, pid=None):
+    binary = tmp_path / "redis-shake"
+    binary.write_text(FAKE_SHAKE.format(python=sys.executable))
+    binary.chmod(0o755)
+    monkeypatch.setattr(settings, "redis_shake_bin_path", str(binary))
+    monkeypatch.setattr(settings, "redis_shake_data_dir", str(tmp_path / "data"))
+    task = SyncTask(
+        id="adopt-me",
+        name="adopt me",
+        custom_config="",
+        status=TaskStatus.RUNNING,
+        process_id=pid,
+    )
+    config_path = service._get_task_config_path(task.id)
+    os.makedirs(os.path.join(os.path.dirname(config_path), "logs"))
+    open(config_path, "w").close()
+    return task, str(binary), config_path
+
+
+def test_only_our_redis_shake_is_recognised(tmp_path, monkeypatch):
+    """Test PIDs are only adopted when they run the binary with the task config"""
+    service = TaskService()
+    task, binary, config_path = make_task(service, tmp_path, monkeypatch)
+
+    async def run():
+        ours = await asyncio.create_subprocess_exec(binary, config_path)
+        other = await asyncio.create_subprocess_exec(binary, str(tmp_path / "x.toml"))
+        try:
+            return [
+                service._is_task_process(task.model_copy(update={"process_id": pid}))
+                for pid in (ours.pid, other.pid, os.getpid())
+            ]
+        finally:
+            for process in (ours, other):
+                process.kill()
+                await process.wait()
+
+    assert asyncio.run(run()) == [True, False, False]
+
+
+def test_adopted_process_output_is_followed(tmp_path, monkeypatch):
+    """Test an adopted process streams its output and is stopped by PID"""
+    service = TaskService()
+    task, binary, config_path = make_task(service, tmp_path, monkeypatch)
+    stdout_path = service._get_task_output_paths(task.id)["stdout"]
+    updates = []
+
+    async def update_task(task_id, task_update):
+        updates.append(task_update)
+
+    async def get_task(task_id):
+        return task
+
+    monkeypatch.setattr(service, "update_task", update_task)
+    monkeypatch.setattr(service, "get_task", get_task)
+    monkeypatch.setattr(settings, "task_stop_timeout", 5.0)
+
+    async def run():
+        # Started by a previous server instance, writing to the output file
+        with open(stdout_path, "wb") as stdout:
+            process = await asyncio.create_subprocess_exec(
+                binary, config_path, stdout=stdout
+            )
+        task.process_id = process.pid
+        service._adopt_task(task)
+        for _ in range(200):
+            buffer = service.log_buffers.get(task.id)
+            if buffer is not None and len(buffer):
+                break
+            await asyncio.sleep(0.02)
+        messages = [record.message for record in buffer.snapshot(0)]
+        result = await service.stop_task(task.id)
+        await process.wait()
+        return messages, result
+
+    try:
+        messages, result = asyncio.run(run())
+    finally:
+        service.log_buffers.pop(task.id, None)
+
+    assert "adopted line" in messages
+    assert result["success"] is True
+    assert task.id not in service.process_streams
+    assert updates[-1].status == TaskStatus.STOPPED
+
+
+def test_cancelled_follower_leaves_the_task_running(tmp_path, monkeypatch):
+    """Test shutting down stops following a process without failing its task"""
+    from types import SimpleNamespace
+
+    from app.repositories.json_repository import JsonTaskRepository
+    from app.services.log_tailer import LogTailer
+    from app.services.port_allocator import PortAllocator
+    from app.services.task_registry import TaskRegistry
+
+    service = TaskService()
+    task, binary, config_path = make_task(service, tmp_path, monkeypatch)
+    registry = TaskRegistry(
+        JsonTaskRepository(str(tmp_path / "sync_tasks.json")), flush_delay=60
+    )
+    allocator = PortAllocator(str(tmp_path / "leases.json"), 40000, 40010)
+    logs = []
+    monkeypatch.setattr(service, "registry", registry)
+    monkeypatch.setattr(service, "port_allocator", allocator)
+    monkeypatch.setattr(service, "log_tailer", LogTailer(poll_interval=0.05))
+    monkeypatch.setattr(
+        service, "log_service", SimpleNamespace(add_log=lambda *a, **k: logs.append(a))
+    )
+
+    async def run():
+        process = await asyncio.create_subprocess_exec(binary, config_path)
+        try:
+            registry.insert(
+                {
+                    "id": task.id,
+                    "name": task.name,
+                    "custom_config": "",
+                    "status": "running",
+                    "created_at": "2025-01-01T00:00:00",
+                    "process_id": process.pid,
+                    "status_port": 40000,
+                }
+            )
+            service._adopt_task(
+                task.model_copy(
+                    update={"process_id": process.pid, "status_port": 40000}
+                )
+            )
+            reader = service.process_streams[task.id]["reader"]
+            await asyncio.sleep(0.1)
+
+            # Cancelled by the event loop teardown
+            reader.cancel()
+            await asyncio.gather(reader, return_exceptions=True)
+            assert reader.cancelled()
+        finally:
+            service.log_tailer.close()
+            process.kill()
+            await process.wait()
+
+    try:
+        asyncio.run(run())
+    finally:
+        service.log_buffers.pop(task.id, None)
+
+    assert registry.get(task.id)["status"] == "running"
+    assert allocator.get(task.id) == 40000
+    assert task.id not in service.process_streams
+    assert logs == []
+
+
+def test_foreign_exit_status_is_read_when_available():
+    """Test the exit code of an adopted process is used when it can be read"""
+    import subprocess
+
+    import psutil
+
+    service = TaskService()
+
+    async def run():
+        # A child of this process, whose exit status the kernel reports here
+        child = subprocess.Popen(
+            [sys.executable, "-c", "import sys, time; time.sleep(0.2); sys.exit(3)"]
+        )
+        child_code = await service._wait_foreign_exit(psutil.Process(child.pid))
+        # An orphan reparented to init, whose exit status is lost
+        shell = subprocess.run(
+            ["sh", "-c", "sleep 0.2 & echo $!"], capture_output=True, text=True
+        )
+        orphan = psutil.Process(int(shell.stdout))
+        orphan_code = await service._wait_foreign_exit(orphan)
+        return child_code, orphan_code
+
+    assert asyncio.run(run()) == (3, None)
+
+
+def test_unknown_exit_status_does_not_fail_the_task(tmp_path, monkeypatch):
+    """Test an exit without a readable status stops the task with a warning"""
+    from types import SimpleNamespace
+
+    from app.repositories.json_repository import JsonTaskRepository
+    from app.services.port_allocator import PortAllocator
+    from app.services.task_registry import TaskRegistry
+
+    service = TaskService()
+    registry = TaskRegistry(
+        JsonTaskRepository(str(tmp_path / "sync_tasks.json")), flush_delay=60
+    )
+    logs = []
+    monkeypatch.setattr(service, "registry", registry)
+    monkeypatch.setattr(
+        service, "port_allocator", PortAllocator(str(tmp_path / "leases.json"))
+    )
+    monkeypatch.setattr(
+        service,
+        "log_service",
+        SimpleNamespace(add_log=lambda log, **k: logs.append(log)),
+    )
+    registry.insert(
+        {
+            "id": "gone",
+            "name": "gone",
+            "custom_config": "",
+            "status": "running",
+            "created_at": "2025-01-01T00:00:00",
+            "process_id": 4242,
+        }
+    )
+
+    asyncio.run(service._handle_process_exit("gone", 4242, None))
+
+    task = registry.get("gone")
+    assert task["status"] == "stopped"
+    assert "unknown" in task["error_message"]
+    assert logs[0].level == "WARNING"
@@ -0,0 +1,51 @@
+"""
+Tests for the task throughput analytics
+"""
+
+import pytest
+
+from app.services.task_analytics import ThroughputTracker
+
+
+def status(read, write, received=0, size=0):
+    data = {"total_entries_count": {"read_count": read, "write_count": write}}
+    if size:
+        data["reader"] = [{"rdb_file_size_bytes": size, "rdb_received_bytes": received}]
+    return data
+
+
+def test_tracker_rates_backlog_and_eta():
+    """Test smoothed rates, backlog and the RDB ETA"""
+    tracker = ThroughputTracker(tau=1e-9)  # No smoothing
+    tracker.update(status(0, 0, received=0, size=1000), 100.0)
+    summary = tracker.update(status(200, 100, received=100, size=1000), 110.0)
+
+    assert summary["read_rate"] == pytest.approx(20.0)
+    assert summary["write_rate"] == pytest.approx(10.0)
+    assert summary["backlog"] == 100
+    assert summary["rdb_progress"] == pytest.approx(0.1)
+    assert summary["rdb_eta_seconds"] == pytest.approx(90.0)
+    assert not summary["stalled"]
+
+
+def test_tracker_detects_stall_and_regression():
+    """Test no progress with a backlog is a stall and a drop is a regression"""
+    tracker = ThroughputTracker(tau=1.0, baseline_tau=1000.0, stall_after=30)
+    write = 0
+    for second in range(0, 60, 2):
+        write += 200
+        summary = tracker.update(status(write + 50, write), float(second))
+    assert not summary["regression"]
+
+    # Writes slow down to a trickle
+    for second in range(60, 80, 2):
+        write += 10
+        summary = tracker.update(status(write + 50, write), float(second))
+    assert summary["regression"]
+    assert not summary["stalled"]
+
+    # Writes stop with keys pending
+    for second in range(80, 120, 2):
+        summary = tracker.update(status(write + 50, write), float(second))
+    assert summary["stalled"]
+    assert summary["stalled_for_seconds"] >= 30
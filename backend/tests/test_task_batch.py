@@ -0,0 +1,119 @@
+"""
+Tests for the batch task lifecycle operations
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+from app.models.schemas import SyncTaskCreate
+from app.repositories.json_repository import JsonTaskRepository
+from app.services.task_registry import TaskRegistry
+from app.services.task_service import TaskService
+
+CONFIG = '[sync_reader]\naddress = "a:1"\n[redis_writer]\naddress = "b:2"\n'
+
+
+class CountingRepository(JsonTaskRepository):
+    """Task repository counting its writes"""
+
+    def __init__(self, tasks_file):
+        super().__init__(tasks_file)
+        self.writes = 0
+
+    def save_changes(self, tasks, changed_ids, deleted_ids):
+        self.writes += 1
+        super().save_changes(tasks, changed_ids, deleted_ids)
+
+
+def make_service(tmp_path, monkeypatch):
+    service = TaskService()
+    repository = CountingRepository(str(tmp_path / "sync_tasks.json"))
+    registry = TaskRegistry(repository, flush_delay=60)
+    monkeypatch.setattr(service, "registry", registry)
+    monkeypatch.setattr(
+        service, "log_service", SimpleNamespace(add_log=lambda *a, **k: None)
+    )
+    return service, repository
+
+
+def test_create_many_tasks_with_one_write(tmp_path, monkeypatch):
+    """Test creating 100 tasks costs a single persistence write"""
+    service, repository = make_service(tmp_path, monkeypatch)
+    creates = [
+        SyncTaskCreate(name=f"task {index}", custom_config=CONFIG)
+        for index in range(100)
+    ]
+
+    result = asyncio.run(service.create_tasks(creates))
+    service.registry.flush()
+
+    assert result["created"] == 100
+    assert all(item["success"] for item in result["results"])
+    assert len(service.registry) == 100
+    assert repository.writes == 1
+
+
+def test_create_batch_with_invalid_item_creates_nothing(tmp_path, monkeypatch):
+    """Test one invalid config or duplicate name rejects the whole batch"""
+    service, repository = make_service(tmp_path, monkeypatch)
+    creates = [
+        SyncTaskCreate(name="ok", custom_config=CONFIG),
+        SyncTaskCreate(name="broken", custom_config="[sync_reader]\n"),
+        SyncTaskCreate(name="ok", custom_config=CONFIG),
+    ]
+
+    result = asyncio.run(service.create_tasks(creates))
+
+    assert result["created"] == 0
+    assert len(service.registry) == 0
+    errors = [item["error"] for item in result["results"]]
+    assert errors[0] == "Not created, the batch has invalid items"
+    assert "[redis_writer]" in errors[1]
+    assert errors[2] == "task 'ok' "
+
+
+def test_delete_many_tasks(tmp_path, monkeypatch):
+    """Test batch deletes skip running and unknown tasks"""
+    service, repository = make_service(tmp_path, monkeypatch)
+    creates = [
+        SyncTaskCreate(name=f"task {index}", custom_config=CONFIG) for index in range(3)
+    ]
+    created = asyncio.run(service.create_tasks(creates))
+    ids = [item["task"].id for item in created["results"]]
+    service.registry.update(ids[1], {"status": "running"})
+
+    results = asyncio.run(service.delete_tasks([ids[0], ids[1], ids[2], "missing"]))
+
+    assert [result["success"] for result in results] == [True, False, True, False]
+    assert results[3]["error"] == "tasknot found"
+    assert [task["id"] for task in service.registry.all()] == [ids[1]]
+
+
+def test_bulk_stop_needs_task_ids():
+    """Test a bulk stop without task IDs is rejected instead of stopping all"""
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    client = TestClient(app)
+    assert client.post("/api/v1/tasks/batch/stop", json={}).status_code == 422
+    response = client.post("/api/v1/tasks/batch/stop", json={"task_ids": []})
+    assert response.status_code == 422
+    assert client.post("/api/v1/tasks/stop").status_code in (404, 405)
+
+
+def test_bulk_start_runs_each_task_once(monkeypatch):
+    """Test repeated IDs in a bulk start start the task once, in order"""
+    service = TaskService()
+    started = []
+
+    async def start_task(task_id):
+        started.append(task_id)
+        return {"success": True, "task_id": task_id}
+
+    monkeypatch.setattr(service, "start_task", start_task)
+
+    results = asyncio.run(service.start_tasks(["a", "b", "a", "c", "b"]))
+
+    assert sorted(started) == ["a", "b", "c"]
+    assert [result["task_id"] for result in results] == ["a", "b", "c"]
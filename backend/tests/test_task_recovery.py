@@ -0,0 +1,95 @@
+"""
+Tests for the startup recovery of interrupted tasks
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+from app.core.config import settings
+from app.models.schemas import SyncTask, TaskStatus
+from app.services.task_service import TaskService
+
+
+def test_recovery_runs_in_parallel_with_a_cap(monkeypatch):
+    """Test tasks are restarted concurrently, at most the configured number"""
+    service = TaskService()
+    tasks = [
+        SyncTask(
+            id=f"recover-{index}",
+            name=f"recover {index}",
+            custom_config="",
+            status=TaskStatus.RUNNING,
+        )
+        for index in range(6)
+    ]
+    active = []
+    peak = []
+
+    async def get_all_tasks():
+        return tasks
+
+    async def restart(task):
+        active.append(task.id)
+        peak.append(len(active))
+        await asyncio.sleep(0.05)
+        active.remove(task.id)
+        if task.id == "recover-5":
+            raise ValueError("boom")
+
+    async def update_task(task_id, task_update):
+        return None
+
+    monkeypatch.setattr(settings, "recovery_concurrency", 2)
+    monkeypatch.setattr(service, "get_all_tasks", get_all_tasks)
+    monkeypatch.setattr(service, "_restart_task", restart)
+    monkeypatch.setattr(service, "update_task", update_task)
+
+    result = asyncio.run(service.recover_running_tasks())
+
+    assert max(peak) == 2
+    assert result["recovered_count"] == 5
+    assert result["failed_tasks"][0]["task_id"] == "recover-5"
+    progress = service.recovery_progress
+    assert progress["state"] == "completed"
+    assert progress["tasks"]["recover-0"]["state"] == "recovered"
+    assert progress["tasks"]["recover-5"] == {
+        "task_name": "recover 5",
+        "state": "failed",
+        "error": "boom",
+    }
+
+
+def test_restart_marks_the_task_running(monkeypatch):
+    """Test a recovered task is recorded with its new process"""
+    service = TaskService()
+    task = SyncTask(
+        id="recover-restart",
+        name="recover restart",
+        custom_config="",
+        status=TaskStatus.RUNNING,
+    )
+    updates = []
+
+    async def spawn_task(task):
+        return {
+            "process": SimpleNamespace(pid=4321),
+            "ready": True,
+            "status_port": 9100,
+            "timings": {},
+        }
+
+    async def update_task(task_id, task_update):
+        updates.append((task_id, task_update))
+
+    monkeypatch.setattr(service, "_spawn_task", spawn_task)
+    monkeypatch.setattr(service, "update_task", update_task)
+
+    asyncio.run(service._restart_task(task))
+
+    assert [task_id for task_id, _ in updates] == ["recover-restart"]
+    update = updates[0][1]
+    assert (update.status, update.process_id, update.status_port) == (
+        TaskStatus.RUNNING,
+        4321,
+        9100,
+    )
@@ -0,0 +1,82 @@
+"""
+Tests for the in-memory task registry
+"""
+
+import json
+
+import pytest
+
+from app.repositories.json_repository import JsonTaskRepository
+from app.services.task_registry import TaskRegistry
+
+
+def make_task(task_id, name):
+    return {"id": task_id, "name": name, "status": "pending"}
+
+
+def test_registry_loads_existing_tasks(tmp_path):
+    """Test tasks are loaded from the tasks file"""
+    tasks_file = tmp_path / "sync_tasks.json"
+    tasks_file.write_text(json.dumps([make_task("t1", "first")]))
+
+    registry = TaskRegistry(JsonTaskRepository(str(tasks_file)))
+    assert registry.get("t1")["name"] == "first"
+    assert registry.find_id_by_name("first") == "t1"
+
+
+def test_registry_rejects_duplicate_names(tmp_path):
+    """Test the name index rejects duplicate task names"""
+    registry = TaskRegistry(
+        JsonTaskRepository(str(tmp_path / "sync_tasks.json")), flush_delay=60
+    )
+    registry.insert(make_task("t1", "first"))
+    registry.insert(make_task("t2", "second"))
+
+    with pytest.raises(ValueError):
+        registry.insert(make_task("t3", "first"))
+    with pytest.raises(ValueError):
+        registry.update("t2", {"name": "first"})
+
+    registry.update("t2", {"name": "renamed"})
+    assert registry.find_id_by_name("renamed") == "t2"
+    assert registry.find_id_by_name("second") is None
+
+
+def test_registry_write_behind(tmp_path):
+    """Test changes reach disk only when flushed"""
+    tasks_file = tmp_path / "sync_tasks.json"
+    registry = TaskRegistry(JsonTaskRepository(str(tasks_file)), flush_delay=60)
+    registry.insert(make_task("t1", "first"))
+    registry.update("t1", {"status": "running"})
+    assert json.loads(tasks_file.read_text()) == []
+
+    registry.flush()
+    saved = json.loads(tasks_file.read_text())
+    assert saved == [{"id": "t1", "name": "first", "status": "running"}]
+
+    registry.remove("t1")
+    registry.close()
+    assert json.loads(tasks_file.read_text()) == []
+    assert list(tmp_path.glob("*.tmp")) == []
+
+
+def test_registry_insert_many_is_all_or_nothing(tmp_path):
+    """Test a batch with a duplicate name inserts nothing"""
+    registry = TaskRegistry(
+        JsonTaskRepository(str(tmp_path / "sync_tasks.json")), flush_delay=60
+    )
+    registry.insert(make_task("t1", "first"))
+
+    with pytest.raises(ValueError):
+        registry.insert_many([make_task("t2", "second"), make_task("t3", "first")])
+    with pytest.raises(ValueError):
+        registry.insert_many([make_task("t2", "second"), make_task("t3", "second")])
+    assert len(registry) == 1
+
+    registry.insert_many([make_task("t2", "second"), make_task("t3", "third")])
+    removed = registry.remove_many(["t1", "t3", "missing"])
+    assert [task["id"] for task in removed] == ["t1", "t3"]
+    assert registry.find_id_by_name("third") is None
+    registry.close()
+    saved = json.loads((tmp_path / "sync_tasks.json").read_text())
+    assert [task["id"] for task in saved] == ["t2"]
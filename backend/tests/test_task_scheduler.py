@@ -0,0 +1,121 @@
+"""
+Tests for the task start scheduler
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+from app.repositories.json_repository import JsonTaskRepository
+from app.services.task_registry import TaskRegistry
+from app.services.task_scheduler import TaskScheduler
+
+
+def make_service(tmp_path, count):
+    registry = TaskRegistry(
+        JsonTaskRepository(str(tmp_path / "sync_tasks.json")), flush_delay=60
+    )
+    for index in range(count):
+        registry.insert(
+            {"id": f"t{index}", "name": f"task {index}", "status": "pending"}
+        )
+
+    async def launch(task_id):
+        await asyncio.sleep(0)
+        registry.update(task_id, {"status": "running"})
+        return {"success": True, "task_id": task_id}
+
+    return SimpleNamespace(registry=registry, _launch_task=launch)
+
+
+def test_scheduler_queues_by_priority_and_admits_on_stop(tmp_path):
+    """Test starts beyond the limit are queued and admitted in order"""
+    service = make_service(tmp_path, 5)
+    registry = service.registry
+    scheduler = TaskScheduler(service, max_running=2)
+
+    async def run():
+        assert (await scheduler.request_start("t0"))["success"]
+        await scheduler.request_start("t1")
+        queued = await scheduler.request_start("t2")
+        assert queued["queued"] and queued["queue_position"] == 1
+        await scheduler.request_start("t3", priority=5)
+        await scheduler.request_start("t4")
+
+        assert registry.get("t2")["status"] == "queued"
+        assert [item["task_id"] for item in scheduler.queue()] == ["t3", "t2", "t4"]
+        assert scheduler.position("t4") == 3
+
+        # A queued task leaves the queue when it is stopped
+        registry.update("t4", {"status": "stopped"})
+        assert scheduler.position("t4") is None
+
+        # A freed slot admits the highest priority
+        registry.update("t0", {"status": "failed"})
+        for _ in range(5):
+            await asyncio.sleep(0)
+        assert registry.get("t3")["status"] == "running"
+        assert registry.get("t2")["status"] == "queued"
+        assert scheduler.stats()["running"] == 2
+
+        registry.remove("t1")
+        for _ in range(5):
+            await asyncio.sleep(0)
+        assert registry.get("t2")["status"] == "running"
+        assert scheduler.queue() == []
+
+    asyncio.run(run())
+
+
+def test_scheduler_restores_queue(tmp_path):
+    """Test tasks queued before a restart are admitted in their order"""
+    service = make_service(tmp_path, 3)
+    registry = service.registry
+    registry.update("t0", {"status": "running"})
+    registry.update("t1", {"status": "queued", "queued_at": "2024-01-01T00:00:02"})
+    registry.update("t2", {"status": "queued", "queued_at": "2024-01-01T00:00:01"})
+    scheduler = TaskScheduler(service, max_running=2)
+
+    async def run():
+        await scheduler.start()
+        for _ in range(5):
+            await asyncio.sleep(0)
+        assert registry.get("t2")["status"] == "running"
+        assert scheduler.position("t1") == 1
+
+    asyncio.run(run())
+
+
+def test_scheduler_rejects_a_second_start_of_a_starting_task(tmp_path):
+    """Test a task already starting or queued is not launched twice"""
+    service = make_service(tmp_path, 2)
+    launches = []
+    launch = service._launch_task
+
+    async def counting_launch(task_id):
+        launches.append(task_id)
+        return await launch(task_id)
+
+    service._launch_task = counting_launch
+    scheduler = TaskScheduler(service, max_running=1)
+
+    async def run():
+        results = await asyncio.gather(
+            scheduler.request_start("t0"),
+            scheduler.request_start("t0"),
+            return_exceptions=True,
+        )
+        assert results[0]["success"]
+        assert isinstance(results[1], ValueError)
+
+        await scheduler.request_start("t1")
+        try:
+            await scheduler.request_start("t1")
+        except ValueError as e:
+            assert "queued" in str(e)
+        else:
+            raise AssertionError("a queued task was queued again")
+
+    asyncio.run(run())
+
+    assert launches == ["t0"]
+    assert scheduler.position("t1") == 1
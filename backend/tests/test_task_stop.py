@@ -0,0 +1,139 @@
+"""
+Tests for stopping task processes
+"""
+
+import asyncio
+import subprocess
+import sys
+import time
+from types import SimpleNamespace
+
+from app.core.config import settings
+from app.repositories.json_repository import JsonTaskRepository
+from app.services.task_registry import TaskRegistry
+from app.services.task_service import TaskService
+
+IGNORE_SIGTERM = (
+    "import signal, time\n"
+    "signal.signal(signal.SIGTERM, signal.SIG_IGN)\n"
+    "print('ready', flush=True)\n"
+    "time.sleep(30)\n"
+)
+
+
+def test_terminate_escalates_without_blocking_the_loop(monkeypatch):
+    """Test a process ignoring SIGTERM is killed while the loop keeps running"""
+    service = TaskService()
+    monkeypatch.setattr(settings, "task_stop_timeout", 0.3)
+    ticks = []
+
+    async def ticker():
+        while True:
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.05)
+
+    async def run():
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, "-c", IGNORE_SIGTERM, stdout=asyncio.subprocess.PIPE
+        )
+        await process.stdout.readline()  # SIGTERM is ignored from here on
+        ticking = asyncio.ensure_future(ticker())
+        killed = await service._terminate_process(process)
+        ticking.cancel()
+        return killed, process.returncode
+
+    killed, returncode = asyncio.run(run())
+
+    assert killed is True
+    assert returncode == -9
+    assert len(ticks) >= 4
+
+
+def test_terminate_pid_of_foreign_process(monkeypatch):
+    """Test processes without an asyncio handle are stopped by polling"""
+    service = TaskService()
+    monkeypatch.setattr(settings, "task_stop_timeout", 5.0)
+    process = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    try:
+        killed = asyncio.run(service._terminate_pid(process.pid))
+    finally:
+        process.kill()
+        process.wait()
+
+    assert killed is False
+    assert process.returncode == -15
+
+
+def test_stop_tasks_runs_in_parallel(monkeypatch):
+    """Test bulk stops run concurrently and report errors per task"""
+    service = TaskService()
+    active = []
+    peak = []
+
+    async def stop_task(task_id):
+        active.append(task_id)
+        peak.append(len(active))
+        await asyncio.sleep(0.05)
+        active.remove(task_id)
+        if task_id == "missing":
+            raise ValueError("tasknot found")
+        return {"success": True, "task_id": task_id}
+
+    monkeypatch.setattr(service, "stop_task", stop_task)
+
+    results = asyncio.run(service.stop_tasks(["a", "b", "missing"]))
+
+    assert max(peak) == 3
+    assert [result["task_id"] for result in results] == ["a", "b", "missing"]
+    assert results[2]["success"] is False
+    assert results[2]["error"] == "tasknot found"
+
+
+def test_stop_during_launch_terminates_the_spawned_process(tmp_path, monkeypatch):
+    """Test a task stopped while its process spawns stays stopped"""
+    service = TaskService()
+    registry = TaskRegistry(
+        JsonTaskRepository(str(tmp_path / "sync_tasks.json")), flush_delay=60
+    )
+    registry.insert(
+        {
+            "id": "launching",
+            "name": "launching",
+            "status": "pending",
+            "custom_config": "[sync_reader]\n",
+        }
+    )
+    monkeypatch.setattr(service, "registry", registry)
+    monkeypatch.setattr(
+        service, "log_service", SimpleNamespace(add_log=lambda *a, **k: None)
+    )
+    spawned = []
+
+    async def spawn_task(task):
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, "-c", "import time; time.sleep(30)"
+        )
+        spawned.append(process)
+        service.process_streams[task.id] = {"process": process, "pid": process.pid}
+        await asyncio.sleep(0.1)  # Waiting for readiness
+        return {"process": process, "ready": True, "status_port": 1, "timings": {}}
+
+    monkeypatch.setattr(service, "_spawn_task", spawn_task)
+
+    async def run():
+        starting = asyncio.ensure_future(service.start_task("launching"))
+        await asyncio.sleep(0.05)
+        stopped = await service.stop_task("launching")
+        started = await starting
+        return stopped, started
+
+    try:
+        stopped, started = asyncio.run(run())
+    finally:
+        service.process_streams.pop("launching", None)
+
+    assert stopped["success"] is True
+    assert started["success"] is False
+    assert spawned[0].returncode == -15
+    assert registry.get("launching")["status"] == "stopped"
+    assert registry.get("launching").get("process_id") is None
@@ -0,0 +1,149 @@
+"""
+Tests for the multiplexed WebSocket channel
+"""
+
+from aiohttp import web
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.task_service import TaskService
+
+
+def receive_until(websocket, predicate):
+    for _ in range(20):
+        message = websocket.receive_json()
+        if predicate(message):
+            return message
+    raise AssertionError("message not received")
+
+
+def test_websocket_topics():
+    """Test task list, status and log subscriptions over one socket"""
+    service = TaskService()
+    task = {"id": "ws-task", "name": "ws-task", "status": "pending"}
+    service.registry.insert(task)
+    try:
+        client = TestClient(app)
+        with client.websocket_connect("/api/v1/ws") as websocket:
+            websocket.send_json({"action": "subscribe", "id": "s1", "topic": "x"})
+            assert websocket.receive_json()["type"] == "error"
+
+            websocket.send_json(
+                {
+                    "action": "subscribe",
+                    "id": "tasks",
+                    "topic": "tasks",
+                    "filters": {"statuses": ["pending"], "name_contains": "WS"},
+                }
+            )
+            assert websocket.receive_json()["type"] == "subscribed"
+            snapshot = websocket.receive_json()
+            assert snapshot["event"] == "snapshot"
+            assert [t["id"] for t in snapshot["data"]] == ["ws-task"]
+
+            websocket.send_json(
+                {
+                    "action": "subscribe",
+                    "id": "status",
+                    "topic": "status",
+                    "filters": {"task_ids": ["ws-task"], "fields": ["status"]},
+                }
+            )
+            receive_until(websocket, lambda m: m.get("event") == "snapshot")
+
+            websocket.send_json(
+                {
+                    "action": "subscribe",
+                    "id": "logs",
+                    "topic": "logs",
+                    "filters": {"task_ids": ["ws-task"], "levels": ["error"]},
+                }
+            )
+            receive_until(websocket, lambda m: m.get("type") == "subscribed")
+
+            # A status change leaves the filtered task list and is a delta
+            websocket.send_json({"action": "ping"})
+            receive_until(websocket, lambda m: m["type"] == "pong")
+            service.registry.update("ws-task", {"status": "running"})
+            removed = receive_until(websocket, lambda m: m.get("id") == "tasks")
+            assert (removed["event"], removed["data"]) == ("deleted", {"id": "ws-task"})
+            delta = receive_until(websocket, lambda m: m.get("id") == "status")
+            assert delta["data"] == {"status": "running", "task_id": "ws-task"}
+
+            # Only log lines passing the filters are pushed
+            for level in ("INFO", "ERROR"):
+                # Publish on the event loop serving the socket
+                websocket.portal.call(
+                    service._distribute_log,
+                    "ws-task",
+                    {
+                        "timestamp": "2025-01-01T00:00:00",
+                        "level": level,
+                        "message": f"{level} line",
+                        "source": "redis-shake",
+                    },
+                )
+            log = receive_until(websocket, lambda m: m.get("id") == "logs")
+            assert log["data"]["message"] == "ERROR line"
+            assert log["data"]["task_id"] == "ws-task"
+
+            websocket.send_json({"action": "unsubscribe", "id": "logs"})
+            receive_until(websocket, lambda m: m["type"] == "unsubscribed")
+    finally:
+        service.registry.remove("ws-task")
+        # Reserving log sequence numbers wrote the task to disk
+        service.registry.flush()
+        service.log_buffers.pop("ws-task", None)
+        service._reserved_log_seqs.pop("ws-task", None)
+
+
+def test_status_topic_pushes_collector_snapshots():
+    """Test each status collector snapshot reaches the socket with analytics"""
+    service = TaskService()
+    collector = service.status_collector
+    service.registry.insert({"id": "ws-metrics", "name": "ws-metrics"})
+    status = {"total_entries_count": {"read_count": 10, "write_count": 8}}
+
+    async def collect():
+        async def handler(request):
+            return web.json_response(status)
+
+        application = web.Application()
+        application.router.add_get("/", handler)
+        runner = web.AppRunner(application)
+        await runner.setup()
+        site = web.TCPSite(runner, "localhost", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        try:
+            await collector.collect_task("ws-metrics", port)
+        finally:
+            await collector._session.close()
+            collector._session = None
+            await runner.cleanup()
+
+    try:
+        client = TestClient(app)
+        with client.websocket_connect("/api/v1/ws") as websocket:
+            websocket.send_json(
+                {
+                    "action": "subscribe",
+                    "id": "status",
+                    "topic": "status",
+                    "filters": {"task_ids": ["ws-metrics"]},
+                }
+            )
+            receive_until(websocket, lambda m: m.get("event") == "snapshot")
+
+            websocket.portal.call(collect)
+            event = receive_until(websocket, lambda m: m.get("event") == "metrics")
+            assert event["id"] == "status"
+            assert event["data"]["task_id"] == "ws-metrics"
+            assert event["data"]["metrics"] == status
+            assert event["data"]["collect_error"] is None
+            assert "analytics" in event["data"]
+    finally:
+        collector._snapshots.pop("ws-metrics", None)
+        collector._trackers.pop("ws-metrics", None)
+        service.registry.remove("ws-metrics")
+        service.registry.flush()
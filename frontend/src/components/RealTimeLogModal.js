@@ -99,6 +99,7 @@ const RealTimeLogModal = ({ visible, onClose, taskId, taskName }) => {
         setError(null);
         break;
         
+      case 'skipped':
       case 'log':
         const newLog = {
           id: `${data.timestamp}-${Math.random()}`,
@@ -132,6 +132,7 @@ target_mbbloom_version = 20603`;
   const getStatusTag = (status) => {
     const statusMap = {
       pending: { color: 'default', text: '待处理' },
+      queued: { color: 'gold', text: '排队中' },
       running: { color: 'processing', text: '运行中' },
       completed: { color: 'success', text: '已完成' },
       failed: { color: 'error', text: '失败' },
@@ -379,7 +380,7 @@ target_mbbloom_version = 20603`;
               }}
               title="查看日志"
             />
-            {record.status === 'running' ? (
+            {['running', 'queued'].includes(record.status) ? (
               <Button
                 size="small"
                 icon={<PauseCircleOutlined />}